@@ -2,11 +2,16 @@
 Set up pytest fixtures for convenient testing.
 """
 
+# Standard library imports
+import json
+
 # Third-party library imports
 import pathlib
 import pytest
 
 # Local imports
+from ugc.cache import CACHE_DIR_ENV
+from ugc.cohort import Cohort
 from ugc.config import Config
 from ugc.grades import Grades
 
@@ -15,6 +20,13 @@ FIXTURE_CONFIG_PATH = (
 )
 
 
+@pytest.fixture(autouse=True)
+def isolated_result_cache(tmp_path, monkeypatch):
+    """Keep the results cached by the commands away from the home directory
+    of the user running the tests."""
+    monkeypatch.setenv(CACHE_DIR_ENV, str(tmp_path / "ugc-cache"))
+
+
 @pytest.fixture(scope="module")
 def local_grades(config_path=FIXTURE_CONFIG_PATH):
     """Return an instance of the Grades class as a fixture available
@@ -37,3 +49,57 @@ def local_bad_config():
         pathlib.Path().absolute() / "tests/fixtures/json/bad_config.json"
     )
     return Config(config_path=config_path)
+
+
+def make_student_data(index: int) -> dict:
+    """Return the grades of a fictional student: the scores vary with
+    `index` so that every student of a cohort is different."""
+    with open(FIXTURE_CONFIG_PATH, encoding="utf-8") as template:
+        data = json.load(template)
+    finished = {
+        "Algorithms and Data Structures I": (60 + 4 * index, "2020-10"),
+        "Computational Mathematics": (55 + 3 * index, "2020-10"),
+        "Discrete Mathematics": (70 - 2 * index, "2021-03"),
+        "Fundamentals of Computer Science": (65 + index, "2021-03"),
+        "Agile Software Projects": (50 + 5 * index, "2021-10"),
+    }
+    for module, (score, date) in finished.items():
+        data[module]["module_score"] = score
+        data[module]["completion_date"] = date
+    if index == 0:
+        data["How Computers Work"]["module_score"] = -1  # RPL
+    data["Algorithms and Data Structures II"]["midterm_score"] = 60 + 3 * index
+    return data
+
+
+@pytest.fixture(name="student_index")
+def fixture_student_index():
+    """Return the index of the student whose grades `config_file` holds. A
+    test module can override this fixture, or a test parametrize it."""
+    return 0
+
+
+@pytest.fixture(name="config_file")
+def fixture_config_file(tmp_path, student_index):
+    """Return the path, as a string, of a config file holding the grades
+    given by `make_student_data(student_index)`."""
+    path = tmp_path / "grades.json"
+    path.write_text(json.dumps(make_student_data(student_index)), "utf-8")
+    return str(path)
+
+
+@pytest.fixture(scope="module")
+def cohort_dir(tmp_path_factory):
+    """Return a directory containing the config files of six students,
+    named `student0.json` to `student5.json`."""
+    directory = tmp_path_factory.mktemp("cohort")
+    for index in range(6):
+        path = directory / f"student{index}.json"
+        path.write_text(json.dumps(make_student_data(index)), "utf-8")
+    return directory
+
+
+@pytest.fixture(name="cohort")
+def fixture_cohort(cohort_dir):
+    """Return the cohort made of the students found in `cohort_dir`."""
+    return Cohort.from_directory(cohort_dir)
@@ -0,0 +1,54 @@
+"""
+Test benchmark.py
+"""
+# Local imports
+from ugc import benchmark
+from ugc.grades import Grades
+
+
+def test_synthetic_data_is_valid_and_reproducible():
+    config = benchmark.get_synthetic_config(seed=1)
+    grades = Grades.from_config(config)
+    assert grades.get_list_of_finished_modules()
+    assert grades.get_list_of_modules_in_progress()
+    assert config.data == benchmark.get_synthetic_data(seed=1)
+    assert config.data != benchmark.get_synthetic_data(seed=2)
+
+
+def test_get_percentile_uses_the_nearest_rank():
+    durations = [5, 1, 4, 2, 3]
+    assert benchmark.get_percentile(durations, 50) == 3
+    assert benchmark.get_percentile(durations, 95) == 5
+    assert benchmark.get_percentile(durations, 0) == 1
+
+
+def test_time_stage_only_times_the_runs_after_the_warmup():
+    calls = []
+    durations = benchmark.time_stage(lambda: calls.append(1), 3, warmup=2)
+    assert len(calls) == 5
+    assert len(durations) == 3
+    assert all(duration >= 0 for duration in durations)
+
+
+def test_stages_without_modules_done_skip_the_plots(local_config):
+    local_config.load()
+    names = [name for name, _ in benchmark.get_stages(local_config)]
+    assert names[:2] == ["Config.load", "Config.verify"]
+    assert "Grades.weighted_average" in names
+    assert "get_modules_done_dataframe" not in names
+    assert names[-1] == "summarize all"
+
+
+def test_run_stages_reports_each_stage(capsys):
+    config = benchmark.get_synthetic_config()
+    records = benchmark.run_stages(
+        benchmark.get_stages(config, dpis=(100,)), repeat=2
+    )
+    names = [record["stage"] for record in records]
+    assert "get_modules_done_dataframe" in names
+    assert names[-1] == "plot modules (dpi=100)"
+    for record in records:
+        assert record["min_ms"] <= record["median_ms"] <= record["p95_ms"]
+
+    # The output of the commands is never printed
+    assert capsys.readouterr().out == ""
@@ -0,0 +1,84 @@
+"""
+Test cache.py
+"""
+# Standard library imports
+from unittest.mock import Mock, patch
+import os
+
+# Local imports
+from ugc.cache import ResultCache, get_cache_directory, get_key
+
+
+def test_get_cache_directory(tmp_path):
+    assert get_cache_directory() == str(tmp_path / "ugc-cache")
+
+
+def test_get_key_depends_on_the_version():
+    key = get_key("fingerprint", "summarize", {"only": True})
+    assert key == get_key("fingerprint", "summarize", {"only": True})
+    assert key != get_key("fingerprint", "summarize", {"only": False})
+    with patch("ugc.cache.__version__", "0.0.0"):
+        assert key != get_key("fingerprint", "summarize", {"only": True})
+
+
+def test_results_are_stored_as_json(tmp_path):
+    cache = ResultCache(tmp_path / "cache")
+    assert cache.get("key", "missing") == "missing"
+    assert len(cache) == 0
+    assert not (tmp_path / "cache").exists()
+
+    cache.set("key", ({"modules": [1, 2]}, "summary"))
+    assert cache.get("key") == [{"modules": [1, 2]}, "summary"]
+    assert len(cache) == 1
+    cache.clear()
+    assert cache.get("key") is None
+
+
+def test_get_or_compute_only_computes_once(tmp_path):
+    cache = ResultCache(tmp_path)
+    compute = Mock(return_value={"weighted_average": 57.14})
+    assert cache.get_or_compute("key", compute) == compute.return_value
+    assert cache.get_or_compute("key", compute) == compute.return_value
+    compute.assert_called_once_with()
+
+
+def test_directory_that_cannot_be_created_is_not_used(tmp_path):
+    not_a_directory = tmp_path / "file"
+    not_a_directory.write_text("", "utf-8")
+    cache = ResultCache(not_a_directory / "cache")
+    compute = Mock(return_value={"weighted_average": 57.14})
+    assert not cache.set("key", "result")
+    assert cache.get_or_compute("key", compute) == compute.return_value
+    assert cache.get_or_compute("key", compute) == compute.return_value
+    assert compute.call_count == 2
+    assert len(cache) == 0
+    cache.clear()
+
+
+def test_results_that_cannot_be_written_leave_nothing_behind(tmp_path):
+    cache = ResultCache(tmp_path)
+    with patch("ugc.cache.os.replace", side_effect=PermissionError):
+        assert not cache.set("key", "result")
+    assert not list(tmp_path.iterdir())
+
+
+def test_unreadable_results_are_removed(tmp_path):
+    cache = ResultCache(tmp_path)
+    (tmp_path / "key.json").write_text("{", "utf-8")
+    assert cache.get("key") is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_results_are_evicted(tmp_path):
+    cache = ResultCache(tmp_path, max_bytes=30)
+    for index, key in enumerate(("a", "b", "c")):
+        cache.set(key, "x" * 8)  # 10 bytes as JSON
+        os.utime(tmp_path / f"{key}.json", ns=(index, index))
+    cache.get("a")  # now the most recently used
+
+    cache.set("d", "x" * 8)
+    assert cache.get("b") is None
+    assert [cache.get(key) for key in ("a", "c", "d")] == ["x" * 8] * 3
+
+    cache.max_bytes = 0
+    assert cache.evict() == 3
@@ -0,0 +1,394 @@
+"""
+Test cli.py
+"""
+
+# Standard library imports
+from pathlib import Path
+from unittest.mock import patch
+import csv
+import io
+import json
+import subprocess
+import sys
+
+# Third-party library imports
+from click.testing import CliRunner
+import pytest
+
+# Local imports
+from ugc.cli import cli, load_grades
+from tests.conftest import make_student_data
+
+# Seconds that `import ugc.cli` may take, which is only met when plotting
+# and DataFrame libraries are not imported along with it
+IMPORT_TIME_BUDGET = 0.5
+
+
+@pytest.fixture(name="student_index")
+def fixture_student_index():
+    return 1
+
+
+def run(*args):
+    return CliRunner().invoke(cli, list(args))
+
+
+def test_summarize_as_of(config_file):
+    result = run("--config", config_file, "summarize", "--as-of", "2021-3")
+    assert result.exit_code == 0
+    assert "Averages as of 2021-03 (4 modules done)" in result.output
+
+
+@pytest.mark.parametrize(
+    "args,message",
+    [
+        (["--as-of", "March 2021"], "expected a month as YYYY-MM"),
+        (["--as-of", "2021-03", "done"], "cannot be used with a command"),
+    ],
+)
+def test_summarize_as_of_usage_errors(config_file, args, message):
+    result = run("--config", config_file, "summarize", *args)
+    assert result.exit_code == 2
+    assert message in result.output
+
+
+def test_summarize_without_a_command_prints_help(config_file):
+    result = run("--config", config_file, "summarize")
+    assert result.exit_code == 0
+    assert "Commands:" in result.output
+
+
+def test_summarize_done_pages_through_modules(config_file):
+    args = ["--config", config_file, "summarize", "done", "--limit", "2"]
+    result = run(*args, "--offset", "1")
+    assert result.exit_code == 0
+    lines = result.output.splitlines()
+    assert lines[2].split("\t")[2] == "Computational Mathematics"
+    assert lines[3].split("\t")[2] == "Discrete Mathematics"
+    assert lines[4] == ""
+
+    result = run("--format", "json", *args, "--offset", "4")
+    assert len(json.loads(result.stdout)["modules"]) == 1
+
+
+def test_summarize_as_of_without_config(tmp_path):
+    result = run(
+        "--config",
+        str(tmp_path / "missing.json"),
+        "summarize",
+        "--as-of",
+        "2021-03",
+    )
+    assert "Configuration file not found" in result.output
+
+
+def test_bench_as_json(tmp_path):
+    missing = str(tmp_path / "missing.json")
+    args = ["--format", "json", "--config", missing, "bench", "-r", "1"]
+    result = run(*args, "--warmup", "0", "--synthetic", "-d", "100")
+    assert result.exit_code == 0
+    output = json.loads(result.stdout)
+    assert output["repeat"] == 1
+    assert output["modules"][-1]["stage"] == "plot modules (dpi=100)"
+
+
+def test_bench_without_config(tmp_path):
+    result = run("--config", str(tmp_path / "missing.json"), "bench")
+    assert "Configuration file not found" in result.output
+    assert "Durations in ms" not in result.output
+
+
+def test_diff(config_file, tmp_path):
+    new = make_student_data(1)
+    new["Algorithms and Data Structures I"]["module_score"] = 100
+    new_file = tmp_path / "new.json"
+    new_file.write_text(json.dumps(new), "utf-8")
+    result = run("--config", config_file, "diff", config_file, str(new_file))
+    assert result.exit_code == 0
+    assert "(module_score): 64 -> 100" in result.output
+
+
+def test_diff_with_an_invalid_config(config_file, tmp_path):
+    new_file = tmp_path / "new.json"
+    new_file.write_text("{}", "utf-8")
+    result = run("--config", config_file, "diff", config_file, str(new_file))
+    assert "The configuration file contains errors" in result.output
+
+
+def test_batch_runs_commands_in_order(config_file, tmp_path):
+    script = tmp_path / "script.txt"
+    script.write_text(
+        "# weekly report\n"
+        "summarize --as-of 2021-03\n"
+        "\n"
+        "check score-accuracy\n"
+        "summarize --as-of 2021-10  # cached timeline\n",
+        "utf-8",
+    )
+    result = run("--config", config_file, "batch", str(script))
+    assert result.exit_code == 0
+    output = result.output
+    assert output.index("$ ugc summarize --as-of 2021-03") < output.index(
+        "All module scores are accurate!"
+    )
+    assert "Averages as of 2021-10 (5 modules done)" in output
+
+
+def test_batch_reads_commands_from_stdin(config_file):
+    result = CliRunner().invoke(
+        cli,
+        ["--config", config_file, "batch", "-"],
+        input="summarize\nsummarize --help\n",
+    )
+    assert result.exit_code == 0
+    assert result.output.count("Commands:") == 2
+
+
+@pytest.mark.parametrize(
+    "line,message",
+    [
+        ("diff a.json b.json", "diff cannot be run in a batch."),
+        ("summarize --as-of 2021", "expected a month as YYYY-MM"),
+        ("plot modules --path {tmp_path} --filename plot", "already exists"),
+    ],
+)
+def test_batch_reports_lines_that_fail(config_file, tmp_path, line, message):
+    script = tmp_path / "script.txt"
+    (tmp_path / "plot.png").touch()  # answering no to overwrite it aborts
+    line = line.format(tmp_path=tmp_path)
+    script.write_text(f"{line}\ncheck score-accuracy\n", "utf-8")
+    result = run("--config", config_file, "batch", str(script))
+    assert result.exit_code == 1
+    assert message in result.output
+    assert "Line 1 failed." in result.output
+    assert "All module scores are accurate!" in result.output
+
+
+def test_plot_result_as_json(config_file, tmp_path):
+    args = ["--format", "json", "--config", config_file, "plot", "modules"]
+    result = run(*args, "--path", str(tmp_path), "--filename", "plot")
+    assert json.loads(result.stdout) == {
+        "modules": [],
+        "ok": True,
+        "path": str(tmp_path / "plot.png"),
+    }
+
+    result = run(*args, "--path", str(tmp_path / "missing"))
+    assert not json.loads(result.stdout)["ok"]
+
+
+def test_batch_as_ndjson(config_file, tmp_path):
+    script = tmp_path / "script.txt"
+    script.write_text("summarize --as-of 2021-03\ndiff\n", "utf-8")
+    result = run(
+        "--format", "ndjson", "--config", config_file, "batch", str(script)
+    )
+    assert result.exit_code == 1
+    assert json.loads(result.stdout)["modules_done"] == 4
+    assert "Line 2 failed." in result.stderr
+
+
+def test_batch_as_json_prints_a_single_array(config_file, tmp_path):
+    script = tmp_path / "script.txt"
+    script.write_text(
+        "summarize --as-of 2021-03\ndiff\ncheck score-accuracy\n", "utf-8"
+    )
+    result = run(
+        "--format", "json", "--config", config_file, "batch", str(script)
+    )
+    assert result.exit_code == 1
+    output = json.loads(result.stdout)
+    assert [len(output), output[0]["modules_done"]] == [2, 4]
+    assert output[1]["accurate"]
+
+
+def test_summarize_done_as_csv_keeps_the_summary(config_file):
+    args = ["--format", "csv", "--config", config_file, "summarize", "done"]
+    rows = list(csv.DictReader(io.StringIO(run(*args).stdout)))
+    assert {row["kind"] for row in rows[:-1]} == {"module"}
+    assert rows[-1]["kind"] == "summary"
+    assert rows[-1]["weighted_average"] == "60.14"
+
+
+def test_summaries_are_cached_unless_told_otherwise(config_file, tmp_path):
+    cache_dir = tmp_path / "ugc-cache"
+    run("--no-cache", "--config", config_file, "summarize", "done")
+    assert not cache_dir.exists()
+
+    result = run("--config", config_file, "summarize", "done")
+    assert len(list(cache_dir.iterdir())) == 1
+    replayed = run("--config", config_file, "summarize", "done")
+    assert replayed.output == result.output
+
+
+def test_summaries_run_when_the_cache_cannot_be_written(
+    config_file, tmp_path, monkeypatch
+):
+    (tmp_path / "file").write_text("", "utf-8")
+    monkeypatch.setenv("UGC_CACHE_DIR", str(tmp_path / "file" / "cache"))
+    result = run("--config", config_file, "summarize", "done")
+    assert result.exit_code == 0
+    assert "Weighted average" in result.output
+
+
+def test_watch_runs_the_command_again_after_changes(config_file):
+    edits = [
+        lambda data: data["Algorithms and Data Structures I"].update(
+            module_score=100
+        ),
+        None,  # nothing changed
+        "{",
+    ]
+
+    def edit_config(interval):
+        if not edits:
+            raise KeyboardInterrupt
+        edit = edits.pop(0)
+        if isinstance(edit, str):
+            Path(config_file).write_text(edit, "utf-8")
+        elif edit is not None:
+            data = json.loads(Path(config_file).read_text("utf-8"))
+            edit(data)
+            Path(config_file).write_text(json.dumps(data), "utf-8")
+
+    with patch("ugc.cli.time.sleep", side_effect=edit_config):
+        result = run(
+            "--config", config_file, "watch", "summarize", "--as-of", "2021-03"
+        )
+    assert result.exit_code == 0
+    output = result.output
+    assert output.count("Averages as of 2021-03") == 2
+    assert "(module_score): 64 -> 100" in output
+    assert "Could not load grades as a valid JSON input." in output
+    assert output.endswith("Stopped watching.\n")
+
+
+def test_watch_overwrites_plots_without_asking(config_file, tmp_path):
+    def edit_config(interval):
+        data = json.loads(Path(config_file).read_text("utf-8"))
+        if data["Discrete Mathematics"]["module_score"] == 100:
+            raise KeyboardInterrupt
+        data["Discrete Mathematics"]["module_score"] = 100
+        Path(config_file).write_text(json.dumps(data), "utf-8")
+
+    (tmp_path / "plot.png").write_bytes(b"")
+    args = ["plot", "modules", "--path", str(tmp_path), "--filename", "plot"]
+    with patch("ugc.cli.time.sleep", side_effect=edit_config):
+        result = run("--config", config_file, "watch", *args)
+    assert result.exit_code == 0
+    assert "Would you like to overwrite" not in result.output
+    assert result.output.count("Plot saved to") == 2
+
+
+@pytest.mark.parametrize(
+    "args,message",
+    [
+        (["watch", "diff"], "diff cannot be watched."),
+        (["watch", "plot"], "plot needs a subcommand"),
+        (["watch", "plot", "--dpi", "100"], "plot needs a subcommand"),
+        (
+            ["--json", json.dumps(make_student_data(1)), "watch"],
+            "--json cannot be watched",
+        ),
+    ],
+)
+def test_watch_usage_errors(config_file, args, message):
+    result = run("--config", config_file, *args)
+    assert result.exit_code == 2
+    assert message in result.output
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        ["--help"],
+        ["summarize", "--help"],
+        ["watch", "--help"],
+        ["generate-sample"],
+    ],
+)
+def test_grades_are_only_loaded_by_commands_needing_them(tmp_path, args):
+    path = tmp_path / "grades.json"
+    with patch("ugc.cli.load_grades") as load:
+        result = run("--config", str(path), *args)
+    assert result.exit_code == 0
+    assert not load.called
+    assert "Configuration file not found" not in result.output
+
+
+def test_grades_are_loaded_once_per_invocation(config_file, tmp_path):
+    script = tmp_path / "script.txt"
+    script.write_text("summarize done\ncheck score-accuracy\n", "utf-8")
+    with patch("ugc.cli.load_grades", side_effect=load_grades) as load:
+        result = run("--config", config_file, "batch", str(script))
+    assert result.exit_code == 0
+    assert load.call_count == 1
+
+
+def test_load_grades_keeps_grades_until_the_config_changes(config_file):
+    grades_cache = {}
+    grades = load_grades(config_file, grades_cache=grades_cache)
+    assert load_grades(config_file, grades_cache=grades_cache) is grades
+
+    with open(config_file, "a", encoding="utf-8") as cfile:
+        cfile.write("\n")
+    reloaded = load_grades(config_file, grades_cache=grades_cache)
+    assert reloaded is not grades
+    assert list(grades_cache.values()) == [reloaded]
+
+
+def test_load_grades_keys_relative_paths_by_directory(tmp_path, monkeypatch):
+    grades_cache = {}
+    for index in range(2):
+        directory = tmp_path / f"student{index}"
+        directory.mkdir()
+        (directory / "grades.json").write_text(
+            json.dumps(make_student_data(index)), "utf-8"
+        )
+        monkeypatch.chdir(directory)
+        grades = load_grades("grades.json", grades_cache=grades_cache)
+        assert grades.data == make_student_data(index)
+    assert len(grades_cache) == 2
+
+
+def test_load_grades_drops_the_least_recently_used_grades(tmp_path):
+    grades_cache = {}
+    paths = []
+    for index in range(3):
+        paths.append(str(tmp_path / f"student{index}.json"))
+        with open(paths[-1], "w", encoding="utf-8") as cfile:
+            json.dump(make_student_data(index), cfile)
+    with patch("ugc.cli.GRADES_CACHE_SIZE", 2):
+        first = load_grades(paths[0], grades_cache=grades_cache)
+        load_grades(paths[1], grades_cache=grades_cache)
+        assert load_grades(paths[0], grades_cache=grades_cache) is first
+        load_grades(paths[2], grades_cache=grades_cache)
+    assert [key[0] for key in grades_cache] == [paths[0], paths[2]]
+
+
+def test_load_grades_only_caches_config_files(config_file, tmp_path):
+    grades_cache = {}
+    missing = load_grades(str(tmp_path / "missing.json"), None, grades_cache)
+    assert not missing.config_exists
+    assert load_grades(config_file, "{}", grades_cache).error
+    assert not grades_cache
+
+
+def test_cli_starts_without_heavy_libraries():
+    code = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        "import ugc.cli\n"
+        "print(time.perf_counter() - start)\n"
+        "print(sorted({'adjustText', 'matplotlib', 'numpy', 'pandas'}"
+        " & set(sys.modules)))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    import_time, heavy_modules = result.stdout.splitlines()
+    assert heavy_modules == "[]"
+    assert float(import_time) < IMPORT_TIME_BUDGET
@@ -0,0 +1,75 @@
+"""
+Test client.py
+"""
+# Standard library imports
+from pathlib import Path
+from unittest.mock import patch
+
+# Third-party library imports
+import pytest
+
+# Local imports
+from ugc import __version__
+from ugc import client
+
+
+@pytest.fixture(name="socket_path")
+def fixture_socket_path(tmp_path, monkeypatch):
+    socket_path = str(tmp_path / "ugc.sock")
+    monkeypatch.setenv(client.SOCKET_ENV, socket_path)
+    monkeypatch.delenv(client.NO_DAEMON_ENV, raising=False)
+    return socket_path
+
+
+def test_get_socket_path(socket_path, monkeypatch):
+    assert client.get_socket_path() == socket_path
+    monkeypatch.delenv(client.SOCKET_ENV)
+    assert client.get_socket_path() == f"{Path.home()}/.ugc-daemon.sock"
+
+
+def test_should_forward(socket_path, monkeypatch):
+    assert not client.should_forward(["summarize"], socket_path)
+    Path(socket_path).touch()
+    assert client.should_forward(["summarize"], socket_path)
+    assert not client.should_forward(["daemon"], socket_path)
+    assert not client.should_forward(["watch", "plot"], socket_path)
+    assert not client.should_forward(["batch", "-"], socket_path)
+    monkeypatch.setenv(client.NO_DAEMON_ENV, "1")
+    assert not client.should_forward(["summarize"], socket_path)
+
+
+def test_send_request_without_daemon(socket_path):
+    assert client.send_request({"args": []}, socket_path) is None
+    Path(socket_path).touch()
+    assert client.send_request({"args": []}, socket_path) is None
+
+
+def test_forward_sends_the_terminal(socket_path, monkeypatch):
+    monkeypatch.setenv("NO_COLOR", "1")
+    monkeypatch.setenv("COLUMNS", "123")
+    with patch("ugc.client.send_request", return_value=None) as send:
+        assert client.forward(["summarize"], socket_path) is None
+    request = send.call_args.args[0]
+    assert request["args"] == ["summarize"]
+    assert request["terminal"]["is_terminal"] is False
+    assert request["terminal"]["width"] == 123
+    assert request["terminal"]["environ"]["NO_COLOR"] == "1"
+
+
+def test_main_forwards_to_daemon(socket_path, capsys):
+    Path(socket_path).touch()
+    response = {"output": "forwarded\n", "exit_code": 3}
+    with patch("ugc.client.forward", return_value=response) as forward:
+        with pytest.raises(SystemExit) as error:
+            client.main(["summarize"])
+    forward.assert_called_once_with(["summarize"], socket_path)
+    assert error.value.code == 3
+    assert capsys.readouterr().out == "forwarded\n"
+
+
+def test_main_runs_commands_in_process_without_daemon(socket_path, capsys):
+    Path(socket_path).touch()  # left behind by a daemon no longer running
+    with pytest.raises(SystemExit) as error:
+        client.main(["--version"])
+    assert error.value.code == 0
+    assert capsys.readouterr().out == f"{__version__}\n"
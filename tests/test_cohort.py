@@ -0,0 +1,269 @@
+"""
+Test cohort.py
+"""
+
+# Standard library imports
+from unittest.mock import patch
+import json
+import os
+
+# Third-party library imports
+import numpy as np
+import pytest
+
+# Local imports
+from ugc.cohort import (
+    Cohort,
+    CohortManifest,
+    get_column_value,
+    get_module_names,
+)
+from ugc.grades import Grades
+from ugc.regression import FinalScorePredictor
+from ugc.utils import grades_helpers
+from tests.conftest import make_student_data
+
+
+def test_cohort_is_loaded_from_a_directory(cohort):
+    assert len(cohort) == 6
+    student_ids = [student_id for student_id, _ in cohort.iter_grades()]
+    assert student_ids == [f"student{index}" for index in range(6)]
+
+
+def test_iter_column_of_a_module(cohort):
+    assert list(cohort.iter_column("Algorithms and Data Structures I")) == [
+        60,
+        64,
+        68,
+        72,
+        76,
+        80,
+    ]
+    # RPL is not a score and modules not taken have none
+    assert not list(cohort.iter_column("How Computers Work"))
+    assert not list(cohort.iter_column("Not a module"))
+
+
+def test_iter_column_of_an_aggregate(cohort):
+    expected = [grades.weighted_average for _, grades in cohort.iter_grades()]
+    assert list(cohort.iter_column("weighted_average")) == expected
+
+
+def test_get_column_value_skips_students_without_scores(local_grades):
+    assert get_column_value(local_grades, "weighted_average") is None
+    assert (
+        get_column_value(local_grades, "weighted_average_in_progress") is None
+    )
+
+
+def test_score_quantiles(cohort):
+    quantiles = cohort.score_quantiles("Agile Software Projects", seed=0)
+    assert quantiles == {0.5: 60, 0.9: 75, 0.99: 75}
+    custom = cohort.score_quantiles(
+        "Discrete Mathematics", quantiles=(0, 1), error=0.05
+    )
+    assert custom == {0: 60, 1: 70}
+
+
+def test_sketches_of_two_cohorts_can_be_merged(cohort_dir):
+    first = Cohort.from_directory(cohort_dir, pattern="student[0-2].json")
+    second = Cohort.from_directory(cohort_dir, pattern="student[3-5].json")
+    sketch = first.sketch_column("weighted_average").merge(
+        second.sketch_column("weighted_average")
+    )
+    assert len(sketch) == 6
+
+
+def test_refresh_only_recomputes_what_changed(cohort_dir, tmp_path):
+    directory = tmp_path / "students"
+    directory.mkdir()
+    for path in cohort_dir.glob("*.json"):
+        (directory / path.name).write_bytes(path.read_bytes())
+    manifest_path = tmp_path / "manifest.json"
+
+    manifest = CohortManifest.load(manifest_path)
+    changes = Cohort.from_directory(directory).refresh(manifest)
+    assert changes["added"] == [f"student{index}" for index in range(6)]
+    manifest.save()
+
+    # Nothing changed, even when a file is touched
+    os.utime(directory / "student1.json", ns=(0, 0))
+    manifest = CohortManifest.load(manifest_path)
+    changes = Cohort.from_directory(directory).refresh(manifest)
+    assert changes == {"added": [], "changed": [], "removed": [], "failed": {}}
+
+    data = make_student_data(2)
+    data["Discrete Mathematics"]["module_score"] = 100
+    (directory / "student2.json").write_text(json.dumps(data), "utf-8")
+    (directory / "student4.json").unlink()
+    changes = Cohort.from_directory(directory).refresh(manifest)
+    assert changes == {
+        "added": [],
+        "changed": ["student2"],
+        "removed": ["student4"],
+        "failed": {},
+    }
+
+    expected = CohortManifest()
+    Cohort.from_directory(directory).refresh(expected)
+    assert manifest.students == expected.students
+    assert manifest.totals == expected.totals
+
+
+def test_refresh_reports_students_that_cannot_be_loaded(cohort_dir, tmp_path):
+    directory = tmp_path / "students"
+    directory.mkdir()
+    for path in cohort_dir.glob("student[0-2].json"):
+        (directory / path.name).write_bytes(path.read_bytes())
+    manifest = CohortManifest()
+    Cohort.from_directory(directory).refresh(manifest)
+    entry = manifest.students["student1"]
+
+    (directory / "student1.json").write_text("{not json", "utf-8")
+    (directory / "student3.json").write_bytes(b"\xff")
+    cohort = Cohort.from_directory(directory)
+    cohort.paths["student4"] = directory / "missing.json"
+    changes = cohort.refresh(manifest)
+    assert sorted(changes["failed"]) == ["student1", "student3", "student4"]
+    assert "valid JSON" in changes["failed"]["student1"]
+    assert manifest.students["student1"] == entry
+    assert sorted(manifest.students) == ["student0", "student1", "student2"]
+
+
+def test_manifest_totals_do_not_drift():
+    manifest = CohortManifest()
+    for index in range(1000):
+        manifest.set_student(
+            f"student{index % 7}",
+            {"aggregates": {"weighted_average": round(index * 0.37 % 100, 2)}},
+        )
+    expected = CohortManifest()
+    for student_id, entry in manifest.students.items():
+        expected.set_student(student_id, entry)
+    assert manifest.totals == expected.totals
+
+
+def test_manifest_mean_without_values():
+    assert CohortManifest().mean("weighted_average") is None
+
+
+def test_manifest_without_a_path_cannot_be_saved():
+    with pytest.raises(ValueError, match="without a path"):
+        CohortManifest().save()
+
+
+def test_iter_score_matrices_in_chunks(cohort):
+    chunks = list(cohort.iter_score_matrices(chunk_size=4))
+    assert [len(student_ids) for student_ids, _ in chunks] == [4, 2]
+    assert chunks[0][1].shape == (4, len(get_module_names()))
+
+
+def test_module_score_correlation(cohort):
+    modules = [
+        "Algorithms and Data Structures I",
+        "Discrete Mathematics",
+        "Agile Software Projects",
+        "Final Project",
+    ]
+    names, matrix = cohort.module_score_correlation(modules, chunk_size=4)
+    assert names == modules
+    assert matrix[0, 1] == pytest.approx(-1)
+    assert matrix[0, 2] == pytest.approx(1)
+    assert np.isnan(matrix[3]).all()  # nobody completed the final project
+    _, default = cohort.module_score_correlation()
+    assert default.shape == (31, 31)
+
+
+@pytest.mark.parametrize(
+    "targets",
+    [
+        {"target_module_score": 75},
+        {"target_average": 70},
+        {"target_classification": "Second Class Honours [Upper Division]"},
+    ],
+)
+def test_batched_required_final_scores_match_grades(cohort, targets):
+    results = cohort.required_final_scores(chunk_size=4, **targets)
+    assert len(results) == 6
+    for student_id, grades in cohort.iter_grades():
+        expected = grades.get_required_final_scores(**targets)
+        assert results[student_id] == pytest.approx(expected)
+    assert results["student5"]["Algorithms and Data Structures II"] is not None
+
+
+def test_batched_required_final_scores_use_the_predictor(tmp_path):
+    # The other module in progress counts for its predicted score
+    for index in range(3):
+        data = make_student_data(index)
+        data["Object Oriented Programming"]["midterm_score"] = 50 + index
+        path = tmp_path / f"student{index}.json"
+        path.write_text(json.dumps(data), "utf-8")
+    cohort = Cohort.from_directory(tmp_path)
+    predictor = FinalScorePredictor()
+    for midterm, final in ((50, 80), (70, 95)):
+        predictor.update("Algorithms and Data Structures II", midterm, final)
+        predictor.update("Object Oriented Programming", midterm, final)
+
+    without_predictor = cohort.required_final_scores(target_average=55)
+    with patch.object(Grades, "final_score_predictor", predictor):
+        results = cohort.required_final_scores(target_average=55)
+        assert results != without_predictor
+        for student_id, grades in cohort.iter_grades():
+            expected = grades.get_required_final_scores(target_average=55)
+            assert results[student_id] == pytest.approx(expected)
+
+
+def test_batched_required_final_scores_need_one_target(cohort):
+    with pytest.raises(ValueError):
+        cohort.required_final_scores()
+
+
+def test_boundary_sensitivity_report(cohort):
+    rows = cohort.boundary_sensitivity_report(chunk_size=4)
+    distances = [row["marks_to_next_classification"] for row in rows]
+    assert distances == [2, 3, 6, 9, None, None]  # first classes last
+
+    by_student = {row["student_id"]: row for row in rows}
+    for student_id, grades in cohort.iter_grades():
+        row = by_student[student_id]
+        average = grades.weighted_average_in_progress
+        assert row["weighted_average"] == average
+        assert row["classification"] == grades_helpers.get_classification(
+            average
+        )
+        boundary = grades_helpers.CLASSIFICATION_BOUNDARIES.get(
+            row["next_classification"], average
+        )
+        assert (row["marks_to_next_classification"] or 0) == round(
+            boundary - average, 2
+        )
+        assert grades_helpers.get_us_gpa(
+            average + row["marks_to_next_us_gpa"]
+        ) > grades_helpers.get_us_gpa(average)
+        if row["marks_to_next_uk_gpa"] is not None:  # not at the top yet
+            assert grades_helpers.get_uk_gpa(
+                average + row["marks_to_next_uk_gpa"]
+            ) > grades_helpers.get_uk_gpa(average)
+
+        # One more mark in the module in progress moves the average by the
+        # marginal effect reported
+        module = "Algorithms and Data Structures II"
+        grades.data[module]["midterm_score"] += 1
+        moved = grades.weighted_average_in_progress - average
+        assert moved == pytest.approx(
+            row["marginal_effects"][module], abs=0.01
+        )
+
+
+def test_boundary_sensitivity_report_at_the_top(tmp_path):
+    data = make_student_data(0)
+    for values in data.values():
+        if values.get("module_score") not in (None, -1):
+            values["module_score"] = 100
+    data["Algorithms and Data Structures II"]["midterm_score"] = None
+    (tmp_path / "top.json").write_text(json.dumps(data), "utf-8")
+    (row,) = Cohort.from_directory(tmp_path).boundary_sensitivity_report()
+    assert row["classification"] == "First Class Honours"
+    assert row["next_classification"] is None
+    assert row["marks_to_next_us_gpa"] is None
+    assert row["marginal_effects"] == {}
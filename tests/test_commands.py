@@ -3,14 +3,22 @@ Test commands.py
 """
 
 # Standard library imports
+from unittest.mock import patch
+import io
+import json
 import os
 
 # Third-party library imports
+from rich.console import Console
+import matplotlib.pyplot as plt
 import pytest
 
 # Local imports
 from ugc import commands
-from ugc.utils import commands_helpers
+from ugc.cache import ResultCache
+from ugc.grades import Grades
+from ugc.utils import commands_helpers, grades_helpers
+from tests.conftest import make_student_data
 
 
 def test_generate_sample_does_not_overwrite_existing_location(
@@ -145,3 +153,352 @@ No modules in progress.
     commands.summarize_all(local_grades)
     captured = capsys.readouterr()
     assert captured.out == expected_output
+
+
+def test_summarize_as_of_prints_the_averages_up_to_a_month(local_grades):
+    with patch.dict(
+        local_grades.data,
+        {
+            "Module 1": {
+                "module_score": 80,
+                "level": 4,
+                "completion_date": "2020-10",
+            },
+            "Module 2": {
+                "module_score": 60,
+                "level": 5,
+                "completion_date": "2021-03",
+            },
+        },
+        clear=True,
+    ):
+        assert commands.summarize_as_of(local_grades, "2020-09") == {}
+        assert commands.summarize_as_of(local_grades, "2020-12") == {
+            "as_of": "2020-12",
+            "modules_done": 1,
+            "weighted_average": 80,
+            "unweighted_average": 80,
+            "weighted_class": "First Class Honours",
+        }
+        result = commands.summarize_as_of(local_grades, "2021-03")
+        assert result["weighted_average"] == 65
+
+
+def test_bench_prints_a_row_per_stage(local_config, capsys):
+    local_config.load()
+    result = commands.bench(local_config, repeat=3, warmup=0)
+    output = capsys.readouterr().out
+    assert "Durations in ms — 3 runs, 0 warm-up runs" in output
+    for record in result["stages"]:
+        assert record["stage"] in output
+    assert f"Python {result['python_version']}" in output
+
+
+def test_diff_prints_the_changes_and_their_effect(capsys):
+    old = make_student_data(0)
+    assert not commands.diff(old, old)["changes"]
+    assert "No differences found." in capsys.readouterr().out
+
+    new = make_student_data(0)
+    new["Algorithms and Data Structures I"]["module_score"] = 62
+    commands.diff(old, new)
+    output = capsys.readouterr().out
+    assert (
+        "Algorithms and Data Structures I (module_score): 60 -> 62" in output
+    )
+    assert "Weighted average: 57.14 -> 57.43 (+0.29)" in output
+    assert "Total credits: 90 -> 90 (+0)" in output
+    assert "(unchanged)" in output
+
+    new["Algorithms and Data Structures I"]["module_score"] = 100
+    commands.diff(old, new)
+    output = capsys.readouterr().out
+    assert "Classification: Second Class Honours [Lower Division] ->" in output
+
+
+def test_daemon_listens_until_interrupted(tmp_path, capsys):
+    socket_path = str(tmp_path / "ugc.sock")
+    with patch("ugc.commands.warm_up"), patch(
+        "ugc.daemon.DaemonServer.serve_forever", side_effect=KeyboardInterrupt
+    ):
+        assert commands.daemon(socket_path) == {"ok": True}
+    output = capsys.readouterr().out
+    assert "Listening on" in output
+    assert "Daemon stopped." in output
+    assert not os.path.exists(socket_path)
+
+
+def test_daemon_does_not_start_twice(tmp_path):
+    with patch(
+        "ugc.commands.create_server", side_effect=FileExistsError("running")
+    ):
+        assert commands.daemon(str(tmp_path / "ugc.sock")) == {
+            "ok": False,
+            "error": "running",
+        }
+
+
+@pytest.fixture(name="student_grades")
+def fixture_student_grades():
+    data = make_student_data(0)
+    data["Object Oriented Programming"]["final_score"] = 70.5
+    data["Web Development"]["module_score"] = 72.5
+    return Grades(json_str=json.dumps(data))
+
+
+def test_get_modules_done_rows(student_grades):
+    modules = grades_helpers.get_grades_list_as_list_of_dicts(
+        student_grades.get_list_of_finished_modules()
+    )
+    rows = commands_helpers.get_modules_done_rows(student_grades, modules)
+    assert [row[2] for row in rows] == [
+        "Algorithms and Data Structures I",
+        "Computational Mathematics",
+        "Discrete Mathematics",
+        "Fundamentals of Computer Science",
+        "Agile Software Projects",
+        "How Computers Work",  # no completion date: last
+        "Web Development",
+    ]
+    assert rows[0] == (
+        "2020-10",
+        4,
+        "Algorithms and Data Structures I",
+        60,
+        "B",
+        "D-",
+    )
+    assert rows[5] == (None, 4, "How Computers Work", -1, "N/A", "N/A")
+
+
+def test_get_modules_in_progress_table(student_grades, local_grades):
+    records, in_progress = commands_helpers.get_modules_in_progress_records(
+        student_grades
+    )
+    columns, rows = commands_helpers.get_modules_in_progress_table(records)
+    assert [header for header, _ in columns] == [
+        "Module name",
+        "Level",
+        "Midterm",
+        "Final",
+        "ECTS",
+        "US",
+    ]
+    assert rows == [
+        ("Algorithms and Data Structures II", 5, 60, None, "B", "D-"),
+        ("Object Oriented Programming", 5, None, 70.5, "A", "C-"),
+    ]
+    assert len(in_progress) == 2
+
+    with patch.dict(
+        local_grades.data,
+        {"Module 1": {"final_score": 80, "final_weight": 100, "level": 4}},
+        clear=True,
+    ):
+        records, _ = commands_helpers.get_modules_in_progress_records(
+            local_grades
+        )
+        columns, rows = commands_helpers.get_modules_in_progress_table(records)
+        assert "Midterm" not in [header for header, _ in columns]
+        assert rows == [("Module 1", 4, 80, "A", "B-")]
+
+
+def test_summarize_prints_missing_values_as_empty_cells(
+    student_grades, capsys
+):
+    commands.summarize_done(student_grades)
+    commands.summarize_progress(student_grades)
+    output = capsys.readouterr().out
+    assert "N/A" in output
+    assert "nan" not in output
+
+
+def read_json(capsys) -> dict:
+    return json.loads(capsys.readouterr().out)
+
+
+def test_paginate_and_iter_chunks():
+    assert list(commands_helpers.paginate(range(10), 3, 2)) == [2, 3, 4]
+    assert list(commands_helpers.paginate(range(4), offset=2)) == [2, 3]
+    assert list(commands_helpers.iter_chunks(range(5), 2)) == [
+        [0, 1],
+        [2, 3],
+        [4],
+    ]
+
+
+def test_pprint_table_prints_plain_rows_when_not_a_terminal(capsys):
+    columns = [("Module name", {}), ("Score", {})]
+    rows = ((f"Module {index}", index - 1) for index in range(5))
+    commands_helpers.pprint_table(columns, rows, "Scores", limit=2, offset=0)
+    assert capsys.readouterr().out == (
+        "Scores\nModule name\tScore\nModule 0\tN/A\nModule 1\t0\n"
+    )
+
+
+def test_pprint_table_does_not_crop_plain_rows(capsys):
+    columns = [("Module name", {}), ("Score", {})]
+    name = "Module " * 20
+    commands_helpers.pprint_table(columns, [(name, 50)], "Scores")
+    assert capsys.readouterr().out.splitlines()[-1] == f"{name}\t50"
+
+
+def test_pprint_table_streams_rows_in_chunks_on_a_terminal():
+    terminal = Console(
+        file=io.StringIO(), force_terminal=True, color_system=None, width=80
+    )
+    columns = [("Module name", {}), ("Score", {})]
+    rows = ((f"Module {index}", index) for index in range(5))
+    with patch.object(commands_helpers, "console", terminal), patch.object(
+        commands_helpers, "TABLE_CHUNK_ROWS", 2
+    ), patch.object(
+        commands_helpers, "get_table", wraps=commands_helpers.get_table
+    ) as get_table:
+        commands_helpers.pprint_table(columns, rows, "Scores", offset=1)
+    output = terminal.file.getvalue()
+    assert get_table.call_count == 2
+    assert output.count("Module name") == 1
+    assert "Module 0" not in output
+    assert all(f"Module {index}" in output for index in range(1, 5))
+
+
+@pytest.mark.parametrize(
+    "as_list, expected", [(True, "Databases and Advanced Data"), (False, "…")]
+)
+def test_pprint_table_sizes_the_chunks_to_fit(as_list, expected):
+    terminal = Console(
+        file=io.StringIO(), force_terminal=True, color_system=None, width=80
+    )
+    columns = [("Module name", {}), ("Score", {})]
+    rows = (
+        (name, 70)
+        for name in ["Web Dev", "Graphics", "Databases and Advanced Data"]
+    )
+    if as_list:
+        rows = list(rows)
+    with patch.object(commands_helpers, "console", terminal), patch.object(
+        commands_helpers, "TABLE_CHUNK_ROWS", 2
+    ):
+        commands_helpers.pprint_table(columns, rows, "Scores")
+    output = terminal.file.getvalue()
+    assert expected in output
+    assert ("…" in output) is not as_list
+
+
+def test_summaries_as_json(student_grades, capsys):
+    result = commands.summarize_done(student_grades, "json")
+    output = read_json(capsys)
+    assert output["modules"][0] == {
+        "completion_date": "2020-10",
+        "level": 4,
+        "module_name": "Algorithms and Data Structures I",
+        "module_score": 60,
+        "ECTS": "B",
+        "US": "D-",
+    }
+    assert output["weighted_average"] == result["weighted_average"]
+
+    result = commands.summarize_progress(student_grades, "json")
+    output = read_json(capsys)
+    assert [module["final_score"] for module in output["modules"]] == [
+        None,
+        70.5,
+    ]
+    assert output["weighted_average_in_progress"] == (
+        result["weighted_average"]
+    )
+
+    commands.summarize_progress_avg_progress_only(student_grades, "json")
+    assert "unweighted_average_in_progress_only" in read_json(capsys)
+
+    commands.summarize_all(student_grades, output_format="json")
+    output = read_json(capsys)
+    assert [module["status"] for module in output["modules"]] == [
+        *["done"] * 7,
+        *["in progress"] * 2,
+    ]
+    assert {"credits_done", "weighted_average_in_progress"} <= set(output)
+
+
+def test_summaries_as_csv_without_modules(local_grades, capsys):
+    assert not commands.summarize_all(local_grades, output_format="csv")[
+        "done"
+    ]
+    assert commands.summarize_done(local_grades, "csv") == {}
+    assert commands.summarize_progress(local_grades, "csv") == {}
+    assert (
+        commands.summarize_progress_avg_progress_only(local_grades, "csv")
+        == {}
+    )
+    assert commands.summarize_as_of(local_grades, "2021-03", "csv") == {}
+    assert capsys.readouterr().out == ""
+
+
+def test_summarize_as_of_as_ndjson(student_grades, capsys):
+    result = commands.summarize_as_of(student_grades, "2021-03", "ndjson")
+    assert read_json(capsys) == result
+
+
+def test_check_score_accuracy_as_ndjson(student_grades, capsys):
+    with patch.dict(
+        student_grades.data["Algorithms and Data Structures I"],
+        {
+            "final_score": 99,
+            "final_weight": 50,
+            "midterm_score": 78.5,
+            "midterm_weight": 50,
+        },
+    ):
+        commands.check_score_accuracy(student_grades, "ndjson")
+    lines = capsys.readouterr().out.splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {
+            "module_name": "Algorithms and Data Structures I",
+            "actual": 60,
+            "expected": 89,
+        },
+        {"accurate": False},
+    ]
+
+
+def test_summaries_are_replayed_from_the_result_cache(
+    student_grades, tmp_path, capsys
+):
+    cache = ResultCache(tmp_path)
+    with patch.object(student_grades, "result_cache", cache):
+        commands.summarize_all(student_grades)
+        output = capsys.readouterr().out
+        assert len(cache) == 2
+
+        with patch(
+            "ugc.utils.commands_helpers.get_modules_done_rows",
+            side_effect=AssertionError("computed again"),
+        ):
+            commands.summarize_all(student_grades)
+        assert capsys.readouterr().out == output
+
+        commands.summarize_progress_avg_progress_only(student_grades)
+        assert len(cache) == 3
+
+
+def test_cached_summaries_keep_the_values_as_written(
+    student_grades, tmp_path, capsys
+):
+    module = student_grades.data["Algorithms and Data Structures I"]
+    with patch.object(student_grades, "result_cache", ResultCache(tmp_path)):
+        for score in (60, 60.0):
+            with patch.dict(module, {"module_score": score}):
+                commands.summarize_done(student_grades, "ndjson")
+            record = capsys.readouterr().out.splitlines()[0]
+            assert f'"module_score": {score},' in record
+
+
+def test_plot_modules_draws_on_the_same_figure(student_grades):
+    plt.close("all")
+    for dpi in (100, 150):
+        result = commands.plot_modules(
+            student_grades, api=True, options={"dpi": dpi}
+        )
+        assert result["src"].startswith("data:image/png;base64,")
+    assert plt.get_figlabels() == [commands_helpers.PLOT_FIGURE]
+    assert plt.gcf().dpi == 150
@@ -4,6 +4,7 @@ Test config.py
 
 # Standard library imports
 from pathlib import Path
+import json
 
 # Third-party library imports
 from hypothesis import given
@@ -11,7 +12,15 @@ from hypothesis.strategies import text
 import pytest
 
 # Local imports
-from ugc.config import Config, ConfigValidationError
+from ugc.config import (
+    Config,
+    ConfigValidationError,
+    get_fingerprint,
+    get_fingerprint_salt,
+)
+from ugc.rules import DEFAULT_RULES_PATH, DegreeRules
+
+DEFAULT_DEFINITION = json.loads(DEFAULT_RULES_PATH.read_text("utf-8"))
 
 
 def test_self_path_is_set_to_custom_path():
@@ -245,3 +254,41 @@ def test_all_modules_have_valid_float_scores_and_weights_raises_ConfigValidation
             "module_score": module_score,
         }
         local_config.all_modules_have_valid_float_scores_and_weights()
+
+
+def test_fingerprint_ignores_formatting_and_key_order():
+    configs = [
+        Config(json_str=json_str)
+        for json_str in (
+            '{"Module 1": {"level": 4, "module_score": 70}, "Module 2": {}}',
+            '{"Module 2": {},\n "Module 1": {"module_score": 70.0, "level": 4}}',
+            '{"Module 2": {"final_score": null},'
+            ' "Module 1": {"module_score": 70, "level": 4}}',
+        )
+    ]
+    for config in configs:
+        config.data = json.loads(config.json)
+    fingerprints = {config.fingerprint() for config in configs}
+    assert len(fingerprints) == 1
+    assert len(fingerprints.pop()) == 32
+
+
+def test_fingerprint_changes_with_the_data_the_rules_and_the_salt():
+    config = Config()
+    config.data = {"Module 1": {"level": 4, "module_score": 70}}
+    fingerprint = config.fingerprint()
+    assert config.fingerprint(salt="other") != fingerprint
+    rules = DegreeRules({**DEFAULT_DEFINITION, "total_credits": 480})
+    assert config.fingerprint(rules) != fingerprint
+    config.data["Module 1"]["module_score"] = 71
+    assert config.fingerprint() != fingerprint
+
+
+def test_fingerprint_loads_the_grades_first():
+    data = Config().default
+    config = Config(json_str=json.dumps(data))
+    fingerprint = config.fingerprint()
+    assert config.data == data
+    assert fingerprint == get_fingerprint(config.data, get_fingerprint_salt())
+    with pytest.raises(FileNotFoundError):
+        Config(config_path="missing.json").fingerprint()
@@ -0,0 +1,94 @@
+"""
+Test daemon.py
+"""
+# Standard library imports
+from unittest.mock import patch
+import socket
+import sys
+import threading
+
+# Third-party library imports
+import pytest
+
+# Local imports
+from ugc.client import forward
+from ugc.daemon import create_server, run_command, warm_up
+from ugc.utils import console
+
+
+@pytest.fixture(name="server")
+def fixture_server(tmp_path):
+    server = create_server(str(tmp_path / "ugc.sock"))
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def test_forwarded_commands_share_loaded_grades(server, config_file):
+    args = ["--config", config_file, "summarize", "done"]
+    response = forward(args, server.socket_path)
+    assert response["exit_code"] == 0
+    assert "Weighted average: 57.14" in response["output"]
+    (grades,) = server.grades_cache.values()
+
+    assert forward(args, server.socket_path) == response
+    assert list(server.grades_cache.values()) == [grades]
+
+
+def test_forwarded_commands_return_their_exit_code(server):
+    response = forward(["no-such-command"], server.socket_path)
+    assert response["exit_code"] == 2
+    assert "No such command" in response["output"]
+
+
+def test_only_one_daemon_listens_on_a_socket(server):
+    with pytest.raises(FileExistsError):
+        create_server(server.socket_path)
+
+
+def test_socket_left_behind_is_replaced(tmp_path):
+    socket_path = str(tmp_path / "ugc.sock")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stale:
+        stale.bind(socket_path)
+    server = create_server(socket_path)
+    server.server_close()
+
+
+def test_run_command_reports_unexpected_errors(tmp_path):
+    with patch("ugc.cli.cli.main", side_effect=RuntimeError("boom")):
+        response = run_command(["summarize"], str(tmp_path), {})
+    assert response["exit_code"] == 1
+    assert "RuntimeError: boom" in response["output"]
+
+
+def test_run_command_renders_for_the_terminal_of_the_client(config_file):
+    args = ["--config", config_file, "summarize", "done"]
+    terminal = {
+        "is_terminal": True,
+        "width": 120,
+        "environ": {"TERM": "xterm-256color"},
+    }
+    output = run_command(args, "/", {}, terminal)["output"]
+    assert "\x1b[" in output
+    assert "\t" not in output
+    plain = run_command(args, "/", {}, {**terminal, "is_terminal": False})
+    assert "\x1b[" not in plain["output"]
+    assert "Module name\t" in plain["output"]
+    assert not console.is_terminal
+
+
+def test_run_command_reads_an_empty_standard_input(tmp_path):
+    def read_stdin(*args, **kwargs):
+        print(repr(sys.stdin.read()))
+
+    with patch("ugc.cli.cli.main", side_effect=read_stdin):
+        response = run_command(["summarize"], str(tmp_path), {})
+    assert response["output"] == "''\n"
+
+
+def test_warm_up_imports_plotting_libraries():
+    warm_up()
+    assert "matplotlib.pyplot" in sys.modules
@@ -0,0 +1,95 @@
+"""
+Test diff.py
+"""
+
+# Standard library imports
+import json
+
+# Third-party library imports
+import pytest
+
+# Local imports
+from ugc.diff import GradeTotals, diff_configs, get_field_changes
+from ugc.grades import Grades
+from tests.conftest import make_student_data
+
+ADS1 = "Algorithms and Data Structures I"
+
+
+@pytest.mark.parametrize("index", range(4))
+def test_totals_match_grades(index):
+    data = make_student_data(index)
+    data["Final Project"].update({"module_score": 80, "level": 6})
+    grades = Grades(json_str=json.dumps(data))
+    aggregates = GradeTotals.from_data(data).aggregates()
+    assert aggregates["weighted_average"] == grades.weighted_average
+    assert aggregates["unweighted_average"] == grades.unweighted_average
+    assert aggregates["total_credits"] == grades.total_credits
+
+
+def test_totals_without_modules_done():
+    assert GradeTotals().aggregates() == {
+        "weighted_average": 0,
+        "unweighted_average": 0,
+        "total_credits": 0,
+        "classification": "Fail",
+    }
+
+
+def test_get_field_changes():
+    old = {"Module 1": {"level": 4, "module_score": 50}, "Module 2": {}}
+    new = {"Module 1": {"level": 4, "module_score": 60}, "Module 3": {"a": 1}}
+    assert get_field_changes(old, new) == [
+        {"module": "Module 1", "field": "module_score", "old": 50, "new": 60},
+        {"module": "Module 3", "field": "a", "old": None, "new": 1},
+    ]
+    assert not get_field_changes(old, old)
+
+
+def test_diff_configs():
+    old = make_student_data(0)
+    new = make_student_data(0)
+    new[ADS1]["module_score"] = 100
+    new["Agile Software Projects"]["module_score"] = 38
+    new["Graphics Programming"]["module_score"] = 75
+    result = diff_configs(old, new)
+    assert [(c["module"], c["field"]) for c in result["changes"]] == [
+        (ADS1, "module_score"),
+        ("Agile Software Projects", "module_score"),
+        ("Graphics Programming", "module_score"),
+    ]
+
+    old_grades = Grades(json_str=json.dumps(old))
+    new_grades = Grades(json_str=json.dumps(new))
+    assert result["before"]["weighted_average"] == old_grades.weighted_average
+    assert result["after"]["weighted_average"] == new_grades.weighted_average
+    assert result["after"]["total_credits"] == new_grades.total_credits
+    assert result["delta"] == {
+        "weighted_average": round(
+            new_grades.weighted_average - old_grades.weighted_average, 2
+        ),
+        "unweighted_average": round(
+            new_grades.unweighted_average - old_grades.unweighted_average, 2
+        ),
+        "total_credits": 0,  # one module passed, another one failed
+    }
+
+
+def test_diff_configs_reuses_known_totals():
+    old = make_student_data(0)
+    new = make_student_data(0)
+    new[ADS1]["module_score"] = 100
+    totals = GradeTotals.from_data(old)
+    assert diff_configs(old, new, totals) == diff_configs(old, new)
+    # The totals given are left untouched
+    assert totals.aggregates() == GradeTotals.from_data(old).aggregates()
+
+
+def test_totals_update_only_looks_at_modules_given():
+    old = make_student_data(0)
+    new = make_student_data(0)
+    new[ADS1]["module_score"] = 100
+    del new["Computational Mathematics"]
+    totals = GradeTotals.from_data(old)
+    totals.update(old, new, [ADS1, "Computational Mathematics"])
+    assert totals.aggregates() == GradeTotals.from_data(new).aggregates()
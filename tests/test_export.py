@@ -0,0 +1,59 @@
+"""
+Test export.py
+"""
+
+# Standard library imports
+import csv
+
+# Third-party library imports
+import numpy as np
+
+# Local imports
+from ugc import export
+from ugc.utils import commands_helpers
+
+
+def read_csv(path):
+    with open(path, newline="", encoding="utf-8") as cfile:
+        return list(csv.DictReader(cfile))
+
+
+def test_export_csv_writes_every_row_in_chunks(cohort, tmp_path):
+    students_path = tmp_path / "students.csv"
+    modules_path = tmp_path / "modules.csv"
+    counts = export.export_csv(
+        cohort, students_path, modules_path, chunk_size=4
+    )
+    # 5 modules done per student, plus one RPL for the first student
+    assert counts == {"students": 6, "modules": 31}
+
+    students = read_csv(students_path)
+    assert [row["student_id"] for row in students] == [
+        f"student{index}" for index in range(6)
+    ]
+    _, grades = next(cohort.iter_grades())
+    summary = commands_helpers.get_summary_done(grades)
+    assert (
+        float(students[0]["weighted_average"]) == summary["weighted_average"]
+    )
+    assert students[0]["weighted_class"] == summary["weighted_class"]
+
+    modules = read_csv(modules_path)
+    assert len(modules) == 31
+    assert modules[0]["student_id"] == "student0"
+    assert modules[0]["midterm_score"] == ""
+
+
+def test_export_npz_writes_column_arrays(cohort, tmp_path):
+    path = tmp_path / "cohort.npz"
+    assert export.export_npz(cohort, path) == {"students": 6, "modules": 31}
+    with np.load(path) as arrays:
+        assert set(arrays.files) == {
+            f"students.{column}" for column in export.STUDENT_COLUMNS
+        } | {f"modules.{column}" for column in export.MODULE_COLUMNS}
+        averages = arrays["students.weighted_average"]
+        expected = [g.weighted_average for _, g in cohort.iter_grades()]
+        assert averages.tolist() == expected
+        assert np.isnan(arrays["modules.final_score"]).all()
+        assert -1 in arrays["modules.module_score"]  # RPL is kept as is
+        assert arrays["modules.module_name"].dtype.kind == "U"
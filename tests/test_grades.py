@@ -1,12 +1,19 @@
 """
 Test grades.py
 """
+
 # Standard library imports
 from unittest.mock import patch
 
 # Third-party library imports
 import pytest
 
+# Local imports
+from ugc.config import Config
+from ugc.grades import Grades
+from ugc.regression import FinalScorePredictor
+from tests.conftest import FIXTURE_CONFIG_PATH
+
 
 class TestDataIsRetrievedCorrectly:
     @staticmethod
@@ -681,3 +688,145 @@ class TestDataIsCalculatedWell:
             local_grades.get_percentage_degree_done(num_credits)
             == exp_percentage
         )
+
+
+class TestRequiredFinalScores:
+    @staticmethod
+    def test_required_final_scores(local_grades):
+        with patch.dict(
+            local_grades.data,
+            {
+                "Module 1": {"module_score": 70, "level": 4},
+                "Module 2": {
+                    "midterm_score": 80,
+                    "midterm_weight": 50,
+                    "final_weight": 50,
+                    "level": 4,
+                },
+                "Module 3": {
+                    "midterm_score": 30,
+                    "midterm_weight": 50,
+                    "final_weight": 50,
+                    "level": 5,
+                },
+                "Module 4": {
+                    "midterm_score": 80,
+                    "midterm_weight": 50,
+                    "final_weight": 50,
+                    "level": 3,  # no weight in the average
+                },
+            },
+            clear=True,
+        ):
+            assert local_grades.get_required_final_scores(
+                target_module_score=70
+            ) == {"Module 2": 60, "Module 3": None, "Module 4": 60}
+
+            # Modules in progress count for their midterm score: the
+            # current average is (70 + 80 + 30 * 3) / 5 = 48
+            required = local_grades.get_required_final_scores(
+                target_average=45
+            )
+            assert required == {
+                "Module 2": 50,
+                "Module 3": 0,
+                "Module 4": None,
+            }
+            required = local_grades.get_required_final_scores(
+                target_classification="Third Class Honours"
+            )
+            assert required["Module 2"] == 35  # at least 35 to pass
+            assert required["Module 3"] == 0
+
+    @staticmethod
+    def test_required_final_scores_reach_the_target_average(local_grades):
+        with patch.dict(
+            local_grades.data,
+            {
+                "Module 1": {"module_score": 65, "level": 5},
+                "Final Project": {
+                    "midterm_score": 62,
+                    "midterm_weight": 30,
+                    "final_weight": 70,
+                    "level": 6,
+                },
+            },
+            clear=True,
+        ):
+            required = local_grades.get_required_final_scores(
+                target_average=68
+            )["Final Project"]
+            local_grades.data["Final Project"]["final_score"] = required
+            assert local_grades.weighted_average_in_progress == 68
+
+
+class TestFinalScorePredictor:
+    @staticmethod
+    def test_modules_in_progress_use_the_predicted_final_scores(local_grades):
+        predictor = FinalScorePredictor()
+        predictor.update("Module 1", 50, 70)
+        predictor.update("Module 1", 70, 90)
+        with patch.dict(
+            local_grades.data,
+            {
+                "Module 1": {
+                    "midterm_score": 60,
+                    "midterm_weight": 40,
+                    "level": 4,
+                },
+                "Module 2": {  # no prediction for this module
+                    "midterm_score": 60,
+                    "midterm_weight": 50,
+                    "level": 4,
+                },
+            },
+            clear=True,
+        ):
+            assert local_grades.weighted_average_in_progress == 60
+            with patch.object(
+                local_grades, "final_score_predictor", predictor
+            ):
+                # Module 1: 60 * 40% + 80 (predicted final) * 60% = 72
+                assert local_grades.weighted_average_in_progress == 66
+                assert local_grades.unweighted_average_in_progress_only == 66
+                assert local_grades.get_scores_of_modules_in_progress() == [
+                    72,
+                    60,
+                ]
+
+
+class TestLoading:
+    @staticmethod
+    def test_config_file_is_loaded_once():
+        with patch.object(
+            Config, "load", autospec=True, side_effect=Config.load
+        ) as load:
+            grades = Grades(config_path=FIXTURE_CONFIG_PATH)
+        assert load.call_count == 1
+        assert grades.data == grades.config.data
+
+
+class TestFingerprint:
+    @staticmethod
+    def test_fingerprint_matches_the_config(local_grades):
+        assert local_grades.fingerprint() == local_grades.config.fingerprint()
+
+    @staticmethod
+    def test_fingerprint_changes_with_the_predictor(local_grades):
+        fingerprint = local_grades.fingerprint()
+        predictor = FinalScorePredictor()
+        with patch.object(local_grades, "final_score_predictor", predictor):
+            with_predictor = local_grades.fingerprint()
+            assert with_predictor != fingerprint
+            predictor.update("Module 1", 50, 60)
+            assert local_grades.fingerprint() != with_predictor
+
+
+class TestTimeline:
+    @staticmethod
+    def test_timeline_is_built_once_with_a_cache(local_grades):
+        assert local_grades.get_timeline() is not local_grades.get_timeline()
+        with patch.object(local_grades, "cache", {}):
+            timeline = local_grades.get_timeline()
+            assert local_grades.get_timeline() is timeline
+            assert local_grades.cache == {"timeline": timeline}
@@ -2,6 +2,7 @@
 import pytest
 
 # Local imports
+from ugc.regression import FinalScorePredictor
 from ugc.utils import grades_helpers
 
 
@@ -283,3 +284,81 @@ def test_get_grades_as_list_of_dicts():
         grades_helpers.get_grades_list_as_list_of_dicts(grades)
         == expected_list
     )
+
+
+@pytest.mark.parametrize(
+    "midterm_score,midterm_weight,final_weight,target,expected",
+    [
+        (80, 50, 50, 70, 60),
+        (80, 30, 70, 70, 65.71428571428571),
+        (90, 50, 50, 40, 35),  # both scores must be at least 35
+        (60, 50, 50, 90, None),  # 120 needed in the final
+        (34, 50, 50, 40, None),  # automatic fail
+        (34, 50, 50, 39, 0),  # any final score reaches 39
+        (None, 50, 50, 70, None),
+        (80, 50, None, 70, None),
+    ],
+)
+def test_get_required_final_score(
+    midterm_score, midterm_weight, final_weight, target, expected
+):
+    module = {
+        "midterm_score": midterm_score,
+        "midterm_weight": midterm_weight,
+        "final_weight": final_weight,
+    }
+    result = grades_helpers.get_required_final_score(module, target)
+    assert result == (None if expected is None else pytest.approx(expected))
+    if result:
+        module["final_score"] = result
+        assert grades_helpers.get_module_score(module) >= target - 1e-9
+
+
+@pytest.mark.parametrize(
+    "targets,expected",
+    [
+        ({"target_module_score": 60}, None),
+        ({"target_average": 65}, 65),
+        ({"target_classification": "Third Class Honours"}, 40),
+    ],
+)
+def test_get_target_average(targets, expected):
+    assert grades_helpers.get_target_average(**targets) == expected
+
+
+@pytest.mark.parametrize(
+    "targets", [{}, {"target_module_score": 60, "target_average": 65}]
+)
+def test_get_target_average_requires_exactly_one_target(targets):
+    with pytest.raises(ValueError):
+        grades_helpers.get_target_average(**targets)
+
+
+@pytest.mark.parametrize(
+    "values,expected",
+    [
+        ({"midterm_score": 60, "midterm_weight": 40}, 72),
+        ({"midterm_score": 60, "midterm_weight": 40, "final_weight": 50}, 64),
+        ({"midterm_score": 60}, None),  # no weight to combine the scores
+        ({"midterm_score": 30, "midterm_weight": 40}, 39),  # automatic fail
+    ],
+)
+def test_get_predicted_module_score(values, expected):
+    predictor = FinalScorePredictor()
+    predictor.update("Module 1", 50, 70)
+    predictor.update("Module 1", 70, 90)
+    assert (
+        grades_helpers.get_predicted_module_score(
+            "Module 1", values, predictor
+        )
+        == expected
+    )
+    assert (
+        grades_helpers.get_predicted_module_score("Module 1", values) is None
+    )
+    assert (
+        grades_helpers.get_predicted_module_score(
+            "Module 2", values, predictor
+        )
+        is None
+    )
@@ -0,0 +1,139 @@
+"""
+Test history.py
+"""
+
+# Standard library imports
+from datetime import datetime, timedelta, timezone
+
+# Third-party library imports
+import pytest
+
+# Local imports
+from ugc.grades import Grades
+from ugc.history import GradeHistory, get_timestamp
+from tests.conftest import make_student_data
+
+ADS1 = "Algorithms and Data Structures I"
+
+
+@pytest.mark.parametrize(
+    "timestamp,expected",
+    [
+        ("2021-03-01T10:00:00", "2021-03-01T10:00:00"),
+        ("2021-03-01", "2021-03-01T00:00:00"),
+        ("2021-03-01T10:00:00.5+02:00", "2021-03-01T08:00:00"),
+        ("2021-03-01T10:00:00Z", "2021-03-01T10:00:00"),
+        (datetime(2021, 3, 1, 10, 0, 0, 5), "2021-03-01T10:00:00"),
+        (
+            datetime(2021, 3, 1, 10, tzinfo=timezone(timedelta(hours=2))),
+            "2021-03-01T08:00:00",
+        ),
+    ],
+)
+def test_get_timestamp(timestamp, expected):
+    assert get_timestamp(timestamp) == expected
+
+
+def test_get_timestamp_defaults_to_now():
+    assert get_timestamp() >= "2021-01-01T00:00:00"
+
+
+def fill_history(history):
+    history.record("Module 1", "level", 4, "2021-01-01T00:00:00")
+    history.record("Module 1", "midterm_score", 50, "2021-01-02T00:00:00")
+    history.record("Module 1", "midterm_score", 55, "2021-01-03T00:00:00")
+    history.record("Module 2", "level", 5, "2021-01-03T00:00:00")
+    history.remove("Module 1", "level", "2021-01-04T00:00:00")
+    history.remove("Module 2", timestamp="2021-01-05T00:00:00")
+    history.remove("Module 3", "level", "2021-01-05T00:00:00")
+
+
+@pytest.mark.parametrize(
+    "timestamp,expected",
+    [
+        ("2020-12-31T00:00:00", {}),
+        ("2021-01-01T00:00:00", {"Module 1": {"level": 4}}),
+        ("2021-01-01", {"Module 1": {"level": 4}}),
+        ("2021-01-01T02:00:00+02:00", {"Module 1": {"level": 4}}),
+        (
+            "2021-01-03T00:00:00",
+            {
+                "Module 1": {"level": 4, "midterm_score": 55},
+                "Module 2": {"level": 5},
+            },
+        ),
+        (
+            "2021-01-04T12:00:00",
+            {"Module 1": {"midterm_score": 55}, "Module 2": {"level": 5}},
+        ),
+        ("2021-01-05T00:00:00", {"Module 1": {"midterm_score": 55}}),
+    ],
+)
+@pytest.mark.parametrize("snapshot_every", [1, 2, 3, 100])
+def test_state_as_of(tmp_path, snapshot_every, timestamp, expected):
+    history = GradeHistory(tmp_path, snapshot_every)
+    fill_history(history)
+    assert history.state_as_of(timestamp) == expected
+    assert len(history.snapshots) == 7 // snapshot_every
+
+    # The same history is found when opening the directory again
+    reopened = GradeHistory(tmp_path, snapshot_every)
+    assert reopened.state_as_of(timestamp) == expected
+    assert reopened.state == {"Module 1": {"midterm_score": 55}}
+    assert reopened.last_timestamp == "2021-01-05T00:00:00"
+    assert reopened.changes_since_snapshot == 7 % snapshot_every
+
+
+def test_timestamps_cannot_go_back_in_time(tmp_path):
+    history = GradeHistory(tmp_path)
+    history.record("Module 1", "level", 4, "2021-01-02T00:00:00")
+    with pytest.raises(ValueError):
+        history.record("Module 1", "level", 5, "2021-01-01T00:00:00")
+    with pytest.raises(ValueError):
+        history.snapshot("2021-01-01T00:00:00")
+
+
+def test_config_without_changes_does_not_move_time_forward(tmp_path):
+    history = GradeHistory(tmp_path)
+    history.record("Module 1", "level", 4, "2021-01-01T00:00:00")
+    assert history.record_config(history.state, "2021-02-01") == 0
+    assert history.last_timestamp == "2021-01-01T00:00:00"
+    history.record("Module 1", "level", 5, "2021-01-15T00:00:00")
+    assert history.last_timestamp == "2021-01-15T00:00:00"
+
+
+def test_iter_changes(tmp_path):
+    history = GradeHistory(tmp_path)
+    fill_history(history)
+    changes = history.iter_changes(
+        "Module 1", since="2021-01-02T00:00:00", until="2021-01-04T00:00:00"
+    )
+    assert [(c["field"], c.get("value")) for c in changes] == [
+        ("midterm_score", 50),
+        ("midterm_score", 55),
+        ("level", None),
+    ]
+    assert len(list(history.iter_changes())) == 7
+
+
+def test_grades_as_of_a_timestamp(tmp_path):
+    history = GradeHistory(tmp_path, snapshot_every=10)
+    data = make_student_data(0)
+    assert history.record_config(data, "2021-01-01T00:00:00") > 10
+    assert history.record_config(data, "2021-02-01T00:00:00") == 0
+
+    data[ADS1]["module_score"] = 90
+    del data[ADS1]["completion_date"]
+    assert history.record_config(data, "2021-03-01T00:00:00") == 2
+    data["Extra module"] = {"level": 4}
+    history.record_config(data, "2021-03-02T00:00:00")
+    del data["Extra module"]
+    assert history.record_config(data, "2021-04-01T00:00:00") == 1
+
+    before = Grades.from_history(history, "2021-02-15T00:00:00")
+    after = Grades.from_history(history)
+    assert before.data[ADS1]["module_score"] == 60
+    assert before.data[ADS1]["completion_date"] == "2020-10"
+    assert after.data == data
+    assert after.weighted_average > before.weighted_average
+    assert after.config.path == f"{tmp_path}@2021-04-01T00:00:00"
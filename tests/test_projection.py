@@ -0,0 +1,209 @@
+"""
+Test projection.py
+"""
+
+# Standard library imports
+from unittest.mock import patch
+
+# Third-party library imports
+import numpy as np
+import pytest
+
+# Local imports
+from ugc import projection
+from ugc.regression import FinalScorePredictor
+from ugc.utils import cohort_helpers
+
+IN_PROGRESS = {
+    "Module 1": {"module_score": 72, "level": 4},
+    "Module 2": {
+        "midterm_score": 60,
+        "midterm_weight": 30,
+        "final_weight": 70,
+        "level": 5,
+    },
+    "Final Project": {
+        "final_score": 68,
+        "midterm_weight": 50,
+        "final_weight": 50,
+        "level": 6,
+    },
+}
+
+
+def test_projection_without_modules_in_progress(local_grades):
+    with patch.dict(
+        local_grades.data,
+        {"Module 1": {"module_score": 65, "level": 4}},
+        clear=True,
+    ):
+        result = projection.project_classification(local_grades, samples=10)
+    assert result["weighted_average"]["mean"] == 65
+    assert result["classifications"] == {
+        "First Class Honours": 0,
+        "Second Class Honours [Upper Division]": 1,
+        "Second Class Honours [Lower Division]": 0,
+        "Third Class Honours": 0,
+        "Fail": 0,
+    }
+
+
+def test_projection_without_any_module(local_grades):
+    with patch.dict(local_grades.data, {}, clear=True):
+        result = projection.project_classification(local_grades, samples=10)
+    assert result["classifications"]["Fail"] == 1
+
+
+def test_degenerate_distribution_matches_grades(local_grades):
+    distribution = {"kind": "uniform", "low": 80, "high": 80}
+    with patch.dict(local_grades.data, IN_PROGRESS, clear=True):
+        result = projection.project_classification(
+            local_grades, samples=5, distribution=distribution
+        )
+        local_grades.data["Module 2"]["final_score"] = 80
+        local_grades.data["Final Project"]["midterm_score"] = 80
+        expected = local_grades.weighted_average_in_progress
+        del local_grades.data["Module 2"]["final_score"]
+        del local_grades.data["Final Project"]["midterm_score"]
+    assert result["weighted_average"]["std"] == 0
+    assert result["weighted_average"]["p50"] == expected
+
+
+@pytest.mark.parametrize(
+    "distribution",
+    [
+        None,
+        {"kind": "normal", "mean": 55, "std": 20},
+        {"kind": "triangular", "low": 30, "high": 90},
+    ],
+)
+def test_projection_is_reproducible(local_grades, distribution):
+    with patch.dict(local_grades.data, IN_PROGRESS, clear=True):
+        first = projection.project_classification(
+            local_grades, samples=2_000, distribution=distribution, seed=1
+        )
+        second = projection.project_classification(
+            local_grades, samples=2_000, distribution=distribution, seed=1
+        )
+    assert first == second
+    assert sum(first["classifications"].values()) == pytest.approx(1)
+    average = first["weighted_average"]
+    assert average["p5"] <= average["p50"] <= average["p95"]
+
+
+def test_unknown_distribution_raises_ValueError():
+    with pytest.raises(ValueError):
+        projection.sample_scores(
+            {"kind": "poisson"}, 50, (2, 2), np.random.default_rng()
+        )
+
+
+def test_vectorized_helpers_match_grades_helpers():
+    midterm = np.array([80, 30, 50])
+    final = np.array([60, 90, 34])
+    assert cohort_helpers.get_module_scores(
+        midterm, 50, final, 50
+    ).tolist() == [70, 39, 39]
+    assert cohort_helpers.get_classifications(
+        [39.99, 40, 65, 70]
+    ).tolist() == [
+        "Fail",
+        "Third Class Honours",
+        "Second Class Honours [Upper Division]",
+        "First Class Honours",
+    ]
+
+
+def test_project_cohort_is_the_same_in_a_process_pool(cohort):
+    serial = projection.project_cohort(cohort, samples=500, seed=3)
+    parallel = projection.project_cohort(
+        cohort, samples=500, seed=3, processes=2
+    )
+    assert list(serial) == [f"student{index}" for index in range(6)]
+    assert serial == parallel
+
+
+def test_what_if_grid_matches_grades(local_grades):
+    midterms = [30, 50, 90]
+    finals = [40, 70]
+    with patch.dict(local_grades.data, IN_PROGRESS, clear=True):
+        grid = projection.evaluate_what_if_grid(
+            local_grades,
+            {
+                "Module 2": {"final_score": finals},
+                "Final Project": {"midterm_score": midterms},
+            },
+        )
+        assert grid["weighted_average"].shape == (2, 3)
+        for i, final in enumerate(finals):
+            for j, midterm in enumerate(midterms):
+                local_grades.data["Module 2"]["final_score"] = final
+                local_grades.data["Final Project"]["midterm_score"] = midterm
+                expected = local_grades.weighted_average_in_progress
+                assert grid["weighted_average"][i, j] == expected
+        del local_grades.data["Module 2"]["final_score"]
+        del local_grades.data["Final Project"]["midterm_score"]
+
+    rows = projection.get_what_if_rows(grid)
+    assert len(rows) == 6
+    assert rows[0]["Module 2 (final_score)"] == 40
+    assert rows[0]["Final Project (midterm_score)"] == 30
+    assert rows[0]["classification"] == "Third Class Honours"
+
+
+def test_what_if_grid_without_scenarios(local_grades):
+    with patch.dict(local_grades.data, IN_PROGRESS, clear=True):
+        grid = projection.evaluate_what_if_grid(local_grades, {})
+        expected = local_grades.weighted_average_in_progress
+    assert projection.get_what_if_rows(grid) == [
+        {
+            "weighted_average": expected,
+            "classification": "Second Class Honours [Upper Division]",
+        }
+    ]
+
+
+def test_projections_use_the_final_score_predictor(local_grades):
+    predictor = FinalScorePredictor()
+    for module_name in ("Module 2", "Module 3"):
+        predictor.update(module_name, 50, 70)
+        predictor.update(module_name, 70, 90)
+    data = {
+        **IN_PROGRESS,
+        "Module 3": {"midterm_score": 50, "midterm_weight": 40, "level": 4},
+    }
+    with patch.dict(local_grades.data, data, clear=True), patch.object(
+        local_grades, "final_score_predictor", predictor
+    ):
+        expected = local_grades.weighted_average_in_progress
+        with patch.object(local_grades, "final_score_predictor", None):
+            assert local_grades.weighted_average_in_progress != expected
+        grid = projection.evaluate_what_if_grid(local_grades, {})
+        assert grid["weighted_average"] == expected
+        result = projection.project_classification(
+            local_grades, samples=5, distribution={"std": 0}
+        )
+        assert result["weighted_average"]["p50"] == expected
+
+        midterms = [40, 90]
+        grid = projection.evaluate_what_if_grid(
+            local_grades, {"Module 2": {"midterm_score": midterms}}
+        )
+        for index, midterm in enumerate(midterms):
+            local_grades.data["Module 2"]["midterm_score"] = midterm
+            expected = local_grades.weighted_average_in_progress
+            assert grid["weighted_average"][index] == expected
+        local_grades.data["Module 2"]["midterm_score"] = 60
+
+
+@pytest.mark.parametrize(
+    "scenarios",
+    [
+        {"Module 1": {"final_score": [50]}},  # already done
+        {"Module 2": {"module_score": [50]}},
+    ],
+)
+def test_what_if_grid_rejects_invalid_scenarios(local_grades, scenarios):
+    with patch.dict(local_grades.data, IN_PROGRESS, clear=True):
+        with pytest.raises(ValueError):
+            projection.evaluate_what_if_grid(local_grades, scenarios)
@@ -0,0 +1,105 @@
+"""
+Test regression.py
+"""
+
+# Standard library imports
+import json
+
+# Third-party library imports
+import pytest
+
+# Local imports
+from ugc.cohort import Cohort
+from ugc.regression import FinalScorePredictor
+from tests.conftest import make_student_data
+
+
+def make_predictor(results, min_count=2):
+    predictor = FinalScorePredictor(min_count)
+    for midterm_score, final_score in results:
+        predictor.update("Module 1", midterm_score, final_score)
+    return predictor
+
+
+def test_predict_follows_the_least_squares_line():
+    predictor = make_predictor([(50, 60), (60, 64), (70, 80), (80, 84)])
+    slope, intercept = predictor.coefficients("Module 1")
+    assert slope == pytest.approx(0.88)
+    assert intercept == pytest.approx(14.8)
+    assert predictor.predict("Module 1", 75) == pytest.approx(80.8)
+
+
+@pytest.mark.parametrize(
+    "results,midterm_score,expected",
+    [
+        ([(50, 60)], 50, None),  # not enough results
+        ([(50, 60), (50, 70)], 80, 65),  # no variance in the midterm
+        ([(40, 60), (50, 90)], 70, 100),  # clipped to [0, 100]
+        ([(40, 60), (50, 30)], 80, 0),
+    ],
+)
+def test_predict_edge_cases(results, midterm_score, expected):
+    predictor = make_predictor(results)
+    assert predictor.predict("Module 1", midterm_score) == expected
+    assert predictor.predict("Module 2", midterm_score) is None
+
+
+def test_remove_undoes_update():
+    predictor = make_predictor([(50, 60), (60, 64), (70, 80)])
+    predictor.update("Module 2", 50, 60)
+    predictor.remove("Module 1", 70, 80)
+    predictor.remove("Module 2", 50, 60)
+    assert len(predictor) == 1
+    assert (
+        predictor.statistics == make_predictor([(50, 60), (60, 64)]).statistics
+    )
+
+
+def test_remove_a_result_never_added():
+    predictor = make_predictor([(50, 60)])
+    predictor.remove("Module 1", 50, 60)
+    for module_name in ("Module 1", "Module 2"):
+        with pytest.raises(ValueError, match=module_name):
+            predictor.remove(module_name, 50, 60)
+    assert not predictor.statistics
+
+
+def test_merge_is_the_same_as_a_single_fit():
+    results = [(50, 60), (60, 64), (70, 80), (80, 84)]
+    merged = make_predictor(results[:1])
+    merged.merge(make_predictor(results[1:]))
+    merged.merge(FinalScorePredictor())
+    assert merged.statistics == make_predictor(results).statistics
+
+
+def test_save_and_load(tmp_path):
+    path = tmp_path / "predictor.json"
+    assert len(FinalScorePredictor.load(path)) == 0
+    predictor = make_predictor([(50, 60), (60, 64)], min_count=3)
+    predictor.save(path)
+    loaded = FinalScorePredictor.load(path)
+    assert loaded.to_dict() == predictor.to_dict()
+    assert loaded.predict("Module 1", 55) is None
+
+
+def test_update_from_cohort(tmp_path):
+    paths = {}
+    for index, (midterm_score, final_score) in enumerate([(50, 60), (70, 80)]):
+        data = make_student_data(index)
+        data["Algorithms and Data Structures I"].update(
+            {
+                "midterm_score": midterm_score,
+                "midterm_weight": 50,
+                "final_score": final_score,
+                "final_weight": 50,
+            }
+        )
+        paths[f"student{index}"] = tmp_path / f"student{index}.json"
+        paths[f"student{index}"].write_text(json.dumps(data), "utf-8")
+
+    predictor = FinalScorePredictor()
+    assert predictor.update_from_cohort(Cohort(paths)) == 2
+    assert list(predictor.statistics) == ["Algorithms and Data Structures I"]
+    assert predictor.predict(
+        "Algorithms and Data Structures I", 60
+    ) == pytest.approx(70)
@@ -0,0 +1,106 @@
+"""
+Test rules.py
+"""
+
+# Standard library imports
+from unittest.mock import patch
+
+# Third-party library imports
+import pytest
+
+# Local imports
+from ugc.config import Config
+from ugc.diff import GradeTotals
+from ugc.rules import DegreeRules, get_default_rules
+from ugc.store import GradeStore, get_weight_sql
+
+OTHER_PROGRAMME = {
+    "total_credits": 180,
+    "level_weights": {"4": 1, "5": 1, "6": 2},
+    "module_credits": 20,
+    "modules": {
+        "Capstone's Project": {"credits": 40, "multiplier": 3},
+        "Seminar": {"credits": 10},
+    },
+}
+
+
+@pytest.fixture(name="rules")
+def fixture_rules():
+    return DegreeRules(OTHER_PROGRAMME)
+
+
+def test_default_rules():
+    rules = get_default_rules()
+    assert rules is get_default_rules()  # only loaded once
+    assert rules.total_credits == 360
+    assert [rules.level_weight(level) for level in (3, 4, 5, 6)] == [
+        0,
+        1,
+        3,
+        5,
+    ]
+    assert rules.weight("Final Project", 6) == 10
+    assert rules.weight("final project", 6) == 10
+    assert rules.credits("Final Project") == 30
+    assert rules.weight("Databases, Networks and the Web", 5) == 3
+    assert rules.credits("Databases, Networks and the Web") == 15
+
+
+def test_fingerprint_depends_on_the_definition(rules):
+    assert rules.fingerprint() == DegreeRules(OTHER_PROGRAMME).fingerprint()
+    assert rules.fingerprint() != get_default_rules().fingerprint()
+
+
+@pytest.mark.parametrize(
+    "module_name,level,weight,credits",
+    [
+        ("Capstone's Project", 6, 6, 40),
+        ("CAPSTONE'S PROJECT", 6, 6, 40),
+        ("Seminar", 5, 1, 10),
+        ("Module 1", 4, 1, 20),
+        ("Module 1", "4", 0, 20),
+    ],
+)
+def test_custom_rules(rules, module_name, level, weight, credits):
+    assert rules.weight(module_name, level) == weight
+    assert rules.credits(module_name) == credits
+    assert module_name in rules._modules  # pylint: disable=protected-access
+
+
+def test_grades_follow_custom_rules(local_grades, rules):
+    with patch.dict(
+        local_grades.data,
+        {
+            "Module 1": {"module_score": 80, "level": 4},
+            "Capstone's Project": {"module_score": 60, "level": 6},
+        },
+        clear=True,
+    ):
+        assert local_grades.weighted_average == 63.33
+        assert local_grades.total_credits == 30
+        assert local_grades.get_percentage_degree_done(45) == 12.5
+        with patch.object(local_grades, "degree_rules", rules):
+            assert local_grades.weighted_average == 62.86  # (80 + 60 * 6) / 7
+            assert local_grades.total_credits == 60
+            assert local_grades.get_percentage_degree_done(45) == 25
+            assert GradeTotals.from_data(
+                local_grades.data, rules
+            ).aggregates()["weighted_average"] == pytest.approx(62.86)
+
+
+def test_store_follows_custom_rules(rules):
+    config = Config()
+    with GradeStore(rules=rules) as store:
+        config.data = {
+            "Module 1": {"module_score": 80, "level": 4},
+            "Capstone's Project": {"module_score": 50, "level": 6},
+            "Seminar": {"module_score": 50, "level": 3},
+        }
+        store.import_config("student", config)
+        assert store.weighted_averages() == {"student": 54.29}
+
+
+def test_weight_sql_without_special_modules():
+    rules = DegreeRules({**OTHER_PROGRAMME, "modules": {}})
+    assert "module_name" not in get_weight_sql(rules)
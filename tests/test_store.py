@@ -0,0 +1,78 @@
+"""
+Test store.py
+"""
+
+# Third-party library imports
+import pytest
+
+# Local imports
+from ugc.cohort import Cohort
+from ugc.config import Config, ConfigValidationError
+from ugc.grades import Grades
+from ugc.store import GradeStore
+
+
+@pytest.fixture(name="store")
+def fixture_store(cohort_dir):
+    with GradeStore() as store:
+        store.import_cohort(Cohort.from_directory(cohort_dir))
+        yield store
+
+
+def test_import_cohort_stores_every_student(store):
+    assert store.student_ids() == [f"student{index}" for index in range(6)]
+
+
+def test_get_module_is_a_point_lookup(store):
+    assert store.get_module("student1", "Discrete Mathematics") == {
+        "level": 4,
+        "completion_date": "2021-03",
+        "final_score": None,
+        "final_weight": 50,
+        "midterm_score": None,
+        "midterm_weight": 50,
+        "module_score": 68,
+    }
+    assert store.get_module("student1", "Not a module") is None
+
+
+def test_grades_loaded_from_the_store_match_the_config_file(store, cohort):
+    for student_id, grades in cohort.iter_grades():
+        from_store = Grades.from_store(store, student_id)
+        assert from_store.data == grades.data
+        assert from_store.weighted_average == grades.weighted_average
+
+
+def test_averages_are_computed_in_sql(store, cohort):
+    weighted = store.weighted_averages()
+    unweighted = store.unweighted_averages()
+    for student_id, grades in cohort.iter_grades():
+        assert weighted[student_id] == grades.weighted_average
+        assert unweighted[student_id] == grades.unweighted_average
+
+
+def test_averages_can_be_filtered(store):
+    assert store.weighted_averages(level=5, student_id="student1") == {
+        "student1": 55
+    }
+    averages = store.unweighted_averages(
+        completed_from="2021-03", completed_to="2021-03"
+    )
+    assert averages["student0"] == 67.5
+    assert not store.weighted_averages(module_name="Final Project")
+    with pytest.raises(ValueError):
+        store.weighted_averages(semester="2021-03")
+
+
+def test_import_config_replaces_previous_modules(store, local_config):
+    assert store.import_config("student0", local_config) == 30
+    assert store.weighted_averages(student_id="student0") == {}
+
+
+def test_invalid_data_in_the_store_is_rejected(store):
+    store.connection.execute(
+        "UPDATE modules SET level = 7 WHERE student_id = 'student3'"
+    )
+    with pytest.raises(ConfigValidationError):
+        Grades.from_store(store, "student3")
+    assert isinstance(store.load_config("student2"), Config)
@@ -0,0 +1,78 @@
+"""
+Test timeline.py
+"""
+
+# Standard library imports
+from unittest.mock import patch
+
+# Third-party library imports
+import pytest
+
+# Local imports
+from ugc.timeline import Timeline
+
+MODULES = {
+    "Module 1": {"module_score": 80, "level": 4, "completion_date": "2020-10"},
+    "Module 2": {"module_score": 61, "level": 4, "completion_date": "2020-10"},
+    "Module 3": {"module_score": -1, "level": 4, "completion_date": "2020-10"},
+    "Module 4": {"module_score": 70, "level": 5, "completion_date": "2021-03"},
+    "Module 5": {"module_score": 90, "level": 5},  # no completion date
+    "Final Project": {
+        "module_score": 75,
+        "level": 6,
+        "completion_date": "2022-03",
+    },
+}
+
+
+@pytest.fixture(name="timeline")
+def fixture_timeline(local_grades):
+    with patch.dict(local_grades.data, MODULES, clear=True):
+        yield Timeline(local_grades)
+
+
+def test_timeline_skips_rpl_and_undated_modules(timeline):
+    assert len(timeline) == 4
+    assert timeline.semesters == ["2020-10", "2021-03", "2022-03"]
+
+
+def test_semester_averages(timeline):
+    assert timeline.semester_averages() == [
+        {
+            "date": "2020-10",
+            "weighted_average": 70.5,
+            "unweighted_average": 70.5,
+        },
+        {"date": "2021-03", "weighted_average": 70, "unweighted_average": 70},
+        {"date": "2022-03", "weighted_average": 75, "unweighted_average": 75},
+    ]
+
+
+@pytest.mark.parametrize(
+    "month,num_modules,weighted,unweighted",
+    [
+        ("2020-09", 0, 0, 0),
+        ("2020-10", 2, 70.5, 70.5),
+        ("2021-02", 2, 70.5, 70.5),
+        ("2021-03", 3, 70.2, 70.33),
+        ("2030-01", 4, 73.4, 71.5),  # final project counts twice
+    ],
+)
+def test_averages_as_of(timeline, month, num_modules, weighted, unweighted):
+    assert timeline.num_modules_as_of(month) == num_modules
+    assert timeline.weighted_average_as_of(month) == weighted
+    assert timeline.unweighted_average_as_of(month) == unweighted
+
+
+def test_latest_averages_match_grades(local_grades):
+    modules = {k: v for k, v in MODULES.items() if k != "Module 5"}
+    with patch.dict(local_grades.data, modules, clear=True):
+        timeline = Timeline(local_grades)
+        assert (
+            timeline.weighted_average_as_of("2099-12")
+            == local_grades.weighted_average
+        )
+        assert (
+            timeline.unweighted_average_as_of("2099-12")
+            == local_grades.unweighted_average
+        )
@@ -0,0 +1,54 @@
+"""
+Test watch.py
+"""
+# Standard library imports
+from pathlib import Path
+import json
+
+# Third-party library imports
+import pytest
+
+# Local imports
+from ugc.config import ConfigValidationError
+from ugc.diff import GradeTotals
+from ugc.watch import ConfigWatcher
+from tests.conftest import make_student_data
+
+ADS1 = "Algorithms and Data Structures I"
+
+
+@pytest.fixture(name="watcher")
+def fixture_watcher(config_file):
+    return ConfigWatcher(config_file, make_student_data(0))
+
+
+def test_changes_are_noticed_once(config_file, watcher):
+    assert not watcher.has_changed()
+    Path(config_file).write_text(json.dumps(make_student_data(1)), "utf-8")
+    assert watcher.has_changed()
+    assert not watcher.has_changed()
+
+    Path(config_file).unlink()
+    assert watcher.has_changed()
+    with pytest.raises(FileNotFoundError):
+        watcher.reload()
+
+
+def test_reload_patches_the_totals(config_file, watcher):
+    new = make_student_data(0)
+    new[ADS1]["module_score"] = 80
+    Path(config_file).write_text(json.dumps(new), "utf-8")
+    config, result = watcher.reload()
+    assert config.data == new == watcher.data
+    assert [change["module"] for change in result["changes"]] == [ADS1]
+    assert result["delta"]["weighted_average"] == 2.86
+    assert watcher.totals.aggregates() == (
+        GradeTotals.from_data(new).aggregates()
+    )
+
+
+def test_invalid_configs_keep_the_previous_data(config_file, watcher):
+    Path(config_file).write_text("{", "utf-8")
+    with pytest.raises(ConfigValidationError):
+        watcher.reload()
+    assert watcher.data == make_student_data(0)
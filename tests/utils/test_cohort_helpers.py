@@ -0,0 +1,52 @@
+"""
+Test utils/cohort_helpers.py
+"""
+
+# Third-party library imports
+import numpy as np
+import pandas as pd
+
+# Local imports
+from ugc.utils import cohort_helpers
+
+
+def test_get_score_matrix_masks_missing_and_rpl_scores(local_grades):
+    local_grades.data["Discrete Mathematics"]["module_score"] = 75
+    local_grades.data["Web Development"]["module_score"] = -1
+    matrix = cohort_helpers.get_score_matrix(
+        [local_grades],
+        ["Discrete Mathematics", "Web Development", "Not a module"],
+    )
+    assert matrix[0, 0] == 75
+    assert np.isnan(matrix[0, 1:]).all()
+
+
+def test_chunked_correlation_matches_pandas():
+    rng = np.random.default_rng(0)
+    matrix = rng.normal(65, 10, size=(1_000, 4))
+    matrix[:, 1] = 0.8 * matrix[:, 0] + rng.normal(0, 5, size=1_000)
+    matrix[rng.random(matrix.shape) < 0.2] = np.nan
+
+    accumulator = cohort_helpers.CorrelationAccumulator(4)
+    for chunk in np.array_split(matrix, 7):
+        accumulator.update(chunk)
+    expected = pd.DataFrame(matrix).corr().to_numpy()
+    assert np.allclose(accumulator.correlation(), expected)
+
+
+def test_correlation_without_enough_data_is_nan():
+    matrix = np.array([[60.0, 70.0, np.nan], [65.0, 70.0, 80.0]])
+    accumulator = cohort_helpers.CorrelationAccumulator(3)
+    accumulator.update(matrix)
+    result = accumulator.correlation()
+    assert result[0, 0] == 1
+    assert np.isnan(result[0, 1])  # no variance in the second column
+    assert np.isnan(result[0, 2])  # a single common row
+
+
+def test_get_marks_to_next_step():
+    result = cohort_helpers.get_marks_to_next_step(
+        np.array([38.5, 40, 69.99, 75]), [70, 40, 50, 60]
+    )
+    assert np.allclose(result[:3], [1.5, 10, 0.01])
+    assert np.isnan(result[3])
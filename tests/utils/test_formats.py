@@ -0,0 +1,58 @@
+"""
+Test utils/formats.py
+"""
+# Standard library imports
+import json
+
+# Third-party library imports
+import pytest
+
+# Local imports
+from ugc.utils import formats
+
+RECORDS = [
+    {"module_name": "Module 1", "module_score": 80},
+    {"module_name": "Module 2", "final_score": None},
+]
+SUMMARY = {"weighted_average": 80}
+
+
+def test_json_holds_records_and_summary():
+    output = formats.serialize("json", RECORDS, SUMMARY)
+    assert json.loads(output) == {"modules": RECORDS, "weighted_average": 80}
+    assert output.count("\n") == 1
+
+
+def test_ndjson_has_a_line_per_record_then_the_summary():
+    output = formats.serialize("ndjson", RECORDS, SUMMARY)
+    assert [json.loads(line) for line in output.splitlines()] == [
+        *RECORDS,
+        SUMMARY,
+    ]
+    assert formats.serialize("ndjson", []) == ""
+
+
+def test_csv_has_a_row_per_record_then_the_summary():
+    assert formats.serialize("csv", RECORDS, SUMMARY) == (
+        "kind,module_name,module_score,final_score,weighted_average\n"
+        "module,Module 1,80,,\n"
+        "module,Module 2,,,\n"
+        "summary,,,,80\n"
+    )
+
+
+def test_csv_holds_the_summary_without_records():
+    assert formats.serialize("csv", [], SUMMARY) == (
+        "kind,weighted_average\nsummary,80\n"
+    )
+    assert formats.serialize("csv", []) == ""
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError):
+        formats.serialize("xml", RECORDS)
+
+
+def test_print_result(capsys):
+    formats.print_result("ndjson", RECORDS[:1])
+    assert capsys.readouterr().out == json.dumps(RECORDS[0]) + "\n"
@@ -0,0 +1,86 @@
+"""
+Test utils/sketches.py
+"""
+
+# Standard library imports
+import json
+import random
+
+# Third-party library imports
+import pytest
+
+# Local imports
+from ugc.utils.sketches import QuantileSketch
+
+
+def exact_quantile(values, q):
+    ordered = sorted(values)
+    return ordered[max(0, int(q * len(ordered) + 0.5) - 1)]
+
+
+def test_empty_sketch_returns_none():
+    sketch = QuantileSketch()
+    assert len(sketch) == 0
+    assert sketch.quantile(0.5) is None
+
+
+def test_small_sketch_is_exact():
+    sketch = QuantileSketch(seed=1)
+    sketch.extend([40, 10, 30, 20, 50])
+    assert sketch.quantiles([0, 0.2, 0.5, 1]) == [10, 10, 30, 50]
+
+
+@pytest.mark.parametrize("q", [0.5, 0.9, 0.99])
+def test_large_sketch_stays_within_error_bound(q):
+    rng = random.Random(q)
+    values = [rng.uniform(0, 100) for _ in range(20_000)]
+    sketch = QuantileSketch.from_error(0.01, seed=42)
+    sketch.extend(values)
+    estimate = sketch.quantile(q)
+    rank = sum(value <= estimate for value in values) / len(values)
+    assert abs(rank - q) <= 0.01
+    assert sum(len(c) for c in sketch.compactors) < 2_000
+
+
+def test_merged_sketches_match_a_single_sketch():
+    rng = random.Random(0)
+    values = [rng.gauss(65, 10) for _ in range(10_000)]
+    left = QuantileSketch(k=200, seed=1)
+    right = QuantileSketch(k=200, seed=2)
+    left.extend(values[:3_000])
+    right.extend(values[3_000:])
+    merged = left.merge(right)
+    assert len(merged) == len(values)
+    assert merged.quantile(0) == min(values)
+    assert merged.quantile(1) == max(values)
+    for q in (0.5, 0.9, 0.99):
+        rank = sum(v <= merged.quantile(q) for v in values) / len(values)
+        assert abs(rank - q) <= 0.02
+    assert abs(merged.quantile(0.5) - exact_quantile(values, 0.5)) < 1
+
+
+def test_sketch_survives_a_json_round_trip():
+    sketch = QuantileSketch(k=50, seed=3)
+    sketch.extend(range(1_000))
+    restored = QuantileSketch.from_dict(
+        json.loads(json.dumps(sketch.to_dict()))
+    )
+    assert restored.quantiles([0.1, 0.5, 0.9]) == sketch.quantiles(
+        [0.1, 0.5, 0.9]
+    )
+    restored.merge(QuantileSketch(k=50))  # merging an empty sketch is a no-op
+    assert len(restored) == 1_000
+
+
+@pytest.mark.parametrize("k,error", [(4, None), (None, 0), (None, 1.5)])
+def test_invalid_sketch_sizes_raise_ValueError(k, error):
+    with pytest.raises(ValueError):
+        if k is not None:
+            QuantileSketch(k=k)
+        else:
+            QuantileSketch.from_error(error)
+
+
+def test_invalid_quantile_raises_ValueError():
+    with pytest.raises(ValueError):
+        QuantileSketch().quantile(1.5)
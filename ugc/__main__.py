@@ -3,7 +3,7 @@ Allows calling `python -m ugc` from the root of the project.
 """
 
 # Local imports
-from ugc.cli import cli
+from ugc.client import main
 
 if __name__ == "__main__":
-    cli()
+    main()
@@ -0,0 +1,160 @@
+"""
+Time the main stages of the program on the grades of a config file or on
+synthetic grades, so that results can be compared between versions and
+machines.
+"""
+# Standard library imports
+import json
+import math
+import platform
+import random
+import statistics
+import time
+
+# Local imports
+from ugc import __version__
+from ugc.config import Config
+from ugc.grades import Grades
+from ugc.utils import commands_helpers, console, grades_helpers
+
+# Dots per inch at which modules are plotted by default
+DEFAULT_DPIS = (100, 300)
+
+# Chances for a module of each level to be done, then to be in progress
+# when it is not done, in the synthetic grades
+SYNTHETIC_CHANCES = {4: (0.95, 1.0), 5: (0.8, 0.7), 6: (0.3, 0.4)}
+
+# Year in which the modules of each level are completed in the synthetic
+# grades (or the year after)
+SYNTHETIC_YEARS = {4: 2020, 5: 2021, 6: 2022}
+
+
+def get_synthetic_data(seed: int = 0) -> dict:
+    """Return the grades of a fictional student with most modules of level
+    4 and 5 done and some of level 6 done or in progress. The same `seed`
+    always gives the same grades."""
+    rng = random.Random(seed)
+    data = Config().default
+    for values in data.values():
+        level = values["level"]
+        done_chance, in_progress_chance = SYNTHETIC_CHANCES[level]
+        if rng.random() < done_chance:
+            values["midterm_score"] = rng.randint(35, 100)
+            values["final_score"] = rng.randint(35, 100)
+            values["module_score"] = (
+                commands_helpers.get_module_score_rounded_up(values)
+            )
+            year = SYNTHETIC_YEARS[level] + rng.randint(0, 1)
+            month = rng.choice(("03", "10"))
+            values["completion_date"] = f"{year}-{month}"
+        elif rng.random() < in_progress_chance:
+            values["midterm_score"] = rng.randint(35, 100)
+    return data
+
+
+def get_synthetic_config(seed: int = 0) -> Config:
+    """Return a loaded `Config` holding the grades of
+    `get_synthetic_data`."""
+    config = Config(json_str=json.dumps(get_synthetic_data(seed)))
+    config.load()
+    return config
+
+
+def get_percentile(durations: list, percentile: float) -> float:
+    """Return the duration below which `percentile` percent of `durations`
+    fall (nearest-rank method, so it is always one of the durations)."""
+    ordered = sorted(durations)
+    rank = math.ceil(percentile / 100 * len(ordered))
+    return ordered[max(rank, 1) - 1]
+
+
+def time_stage(function, repeat: int, warmup: int = 0) -> list:
+    """Call `function` `warmup` times, then return the duration in seconds
+    of each of the next `repeat` calls."""
+    for _ in range(warmup):
+        function()
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def get_stages(config: Config, dpis=DEFAULT_DPIS) -> list:
+    """Return a list of tuples `(name, function)` for the stages to time on
+    the grades of a loaded `config`. Modules are only plotted if some are
+    done. The output of the commands is rendered but never printed."""
+    # `ugc.commands` runs the benchmarks: import it here to avoid a cycle
+    from ugc import commands
+
+    # Fresh grades, so that no result is read from a cache
+    grades = Grades.from_config(config)
+
+    def render_summary():
+        with console.capture():
+            commands.summarize_all(grades)
+
+    def plot(dpi):
+        with console.capture():
+            commands.plot_modules(grades, api=True, options={"dpi": dpi})
+
+    stages = [
+        ("Config.load", config.load),
+        ("Config.verify", config.verify),
+    ]
+    for name, value in vars(Grades).items():
+        if isinstance(value, property):
+            stages.append(
+                (f"Grades.{name}", lambda name=name: getattr(grades, name))
+            )
+
+    finished_modules = grades_helpers.get_grades_list_as_list_of_dicts(
+        grades.get_list_of_finished_modules()
+    )
+    if finished_modules:
+        stages.append(
+            (
+                "get_modules_done_dataframe",
+                lambda: commands_helpers.get_modules_done_dataframe(
+                    grades, finished_modules
+                ),
+            )
+        )
+    stages.append(("summarize all", render_summary))
+    if finished_modules:
+        for dpi in dpis:
+            stages.append(
+                (f"plot modules (dpi={dpi})", lambda dpi=dpi: plot(dpi))
+            )
+    return stages
+
+
+def run_stages(stages: list, repeat: int, warmup: int = 0) -> list:
+    """Time each stage given by `get_stages` and return a dict per stage
+    with its median, 95th percentile and fastest durations in
+    milliseconds."""
+    records = []
+    for name, function in stages:
+        durations = [
+            duration * 1000
+            for duration in time_stage(function, repeat, warmup)
+        ]
+        records.append(
+            {
+                "stage": name,
+                "median_ms": round(statistics.median(durations), 3),
+                "p95_ms": round(get_percentile(durations, 95), 3),
+                "min_ms": round(min(durations), 3),
+            }
+        )
+    return records
+
+
+def get_environment() -> dict:
+    """Return what the durations depend on besides the grades."""
+    return {
+        "ugc_version": __version__,
+        "python_version": platform.python_version(),
+        "platform": platform.platform(),
+    }
@@ -0,0 +1,139 @@
+"""
+Keep the results of the commands on disk so that they are only computed
+again once the grades they come from change.
+"""
+# Standard library imports
+from pathlib import Path
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+
+# Local imports
+from ugc import __version__
+
+# Environment variable to change the directory of the cache
+CACHE_DIR_ENV = "UGC_CACHE_DIR"
+
+# Size of the cache on disk above which the least recently used results are
+# removed
+DEFAULT_MAX_BYTES = 4 * 1024 * 1024
+
+
+def get_cache_directory() -> str:
+    """Return the directory where results are kept by default."""
+    return os.environ.get(CACHE_DIR_ENV, f"{str(Path.home())}/.ugc-cache")
+
+
+def get_key(*parts) -> str:
+    """Return the key of a result from what it depends on (e.g. the
+    fingerprint of the grades, the name of a command and its options),
+    along with the version of this package. Parts must be serializable as
+    JSON."""
+    content = json.dumps([__version__, *parts], sort_keys=True)
+    return hashlib.blake2b(content.encode(), digest_size=16).hexdigest()
+
+
+class ResultCache:
+    """Results serialized as JSON, one file per key in `directory`, which
+    is only created when the first result is stored.
+
+    Reading a result marks it as recently used. Once the files take more
+    than `max_bytes`, the least recently used ones are removed. Results
+    come back as they were stored, except for tuples which come back as
+    lists.
+
+    Errors of the file system (e.g. a directory that can't be created or
+    written to) are never raised: results are then recomputed each time
+    instead of being kept."""
+
+    def __init__(self, directory, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+
+    def __len__(self) -> int:
+        return len(self._get_paths())
+
+    def _get_path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _get_paths(self) -> list:
+        try:
+            return list(self.directory.glob("*.json"))
+        except OSError:
+            return []
+
+    def get(self, key: str, default=None):
+        """Return the result stored under `key`, or `default` if there is
+        none (or if it can't be read back)."""
+        path = self._get_path(key)
+        try:
+            with open(path, encoding="utf-8") as rfile:
+                result = json.load(rfile)
+        except OSError:
+            return default
+        except ValueError:
+            self._remove(path)
+            return default
+        with contextlib.suppress(OSError):
+            os.utime(path)
+        return result
+
+    def set(self, key: str, result) -> bool:
+        """Store a result under `key`, then evict the least recently used
+        results if the cache grew too large. The file is written under
+        another name first so that readers never see it half written.
+        Return False if the result could not be stored."""
+        temp_path = None
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            descriptor, temp_path = tempfile.mkstemp(
+                dir=self.directory, suffix=".tmp"
+            )
+            with os.fdopen(descriptor, "w", encoding="utf-8") as rfile:
+                json.dump(result, rfile)
+            os.replace(temp_path, self._get_path(key))
+        except OSError:
+            if temp_path is not None:
+                self._remove(Path(temp_path))
+            return False
+        self.evict()
+        return True
+
+    def get_or_compute(self, key: str, compute):
+        """Return the result stored under `key`, calling `compute()` to get
+        it and store it when there is none."""
+        result = self.get(key)
+        if result is None:
+            result = compute()
+            self.set(key, result)
+        return result
+
+    def evict(self) -> int:
+        """Remove the least recently used results until the cache takes at
+        most `max_bytes`. Return the number of results removed."""
+        entries = []
+        for path in self._get_paths():
+            with contextlib.suppress(OSError):
+                stat = path.stat()
+                entries.append((stat.st_mtime_ns, stat.st_size, path))
+        total_size = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_bytes:
+                break
+            self._remove(path)
+            total_size -= size
+            removed += 1
+        return removed
+
+    def clear(self) -> None:
+        """Remove every result."""
+        for path in self._get_paths():
+            self._remove(path)
+
+    @staticmethod
+    def _remove(path: Path) -> None:
+        with contextlib.suppress(OSError):
+            path.unlink()
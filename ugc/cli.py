@@ -1,10 +1,16 @@
 """
 Describes the commands available from the terminal when running this tool.
 """
+
 # pylint: disable=unused-argument
 # Standard library imports
+from datetime import datetime
 from functools import update_wrapper
 from pathlib import Path
+import contextlib
+import os
+import shlex
+import time
 
 # Third-party library imports
 import click
@@ -12,11 +18,23 @@ import click
 # Local imports
 from ugc import __version__
 from ugc import commands
+from ugc.benchmark import DEFAULT_DPIS, get_synthetic_config
+from ugc.cache import ResultCache, get_cache_directory
 from ugc.grades import Grades
-from ugc.config import ConfigValidationError
-from ugc.utils import console
+from ugc.config import Config, ConfigValidationError
+from ugc.utils import commands_helpers, console, formats
+from ugc.watch import ConfigWatcher
+
+# Commands that `ugc batch` can run
+BATCH_COMMANDS = ("summarize", "check", "plot")
 
-pass_grades = click.make_pass_decorator(Grades, ensure=True)
+# Commands that `ugc watch` can run and the one it runs by default
+WATCH_COMMANDS = ("summarize", "plot")
+DEFAULT_WATCH_ARGS = ("summarize", "all")
+
+# Config files whose grades `load_grades` keeps, the least recently used
+# being dropped first
+GRADES_CACHE_SIZE = 8
 
 
 def print_error(context):
@@ -25,6 +43,17 @@ def print_error(context):
     )
 
 
+def pass_grades(f):
+    """Pass the grades given to `cli` as the first parameter of a command,
+    loading them if no other command did so far."""
+
+    @click.pass_context
+    def new_func(ctx, *args, **kwargs):
+        return ctx.invoke(f, get_grades(ctx), *args, **kwargs)
+
+    return update_wrapper(new_func, f)
+
+
 # From https://click.palletsprojects.com/en/8.0.x/commands/#decorating-commands
 # There might be a more elegant way to do this, but it works well...
 # No function with the `run_if_config_exists` decorator will execute if the
@@ -33,9 +62,10 @@ def run_if_config_exists(f):
     @click.pass_context
     def new_func(ctx, *args, **kwargs):
         # invoke command only when attribute `config_exists` is set to True
-        if ctx.obj.config_exists:
-            return ctx.invoke(f, ctx.obj, *args, **kwargs)
-        return print_error(ctx.obj)
+        grades = get_grades(ctx)
+        if grades.config_exists:
+            return ctx.invoke(f, grades, *args, **kwargs)
+        return print_error(grades)
 
     return update_wrapper(new_func, f)
 
@@ -48,6 +78,108 @@ def print_version(context, param, value):
     context.exit()
 
 
+def pagination_options(f):
+    "Add the options of the commands listing modules in tables."
+    f = click.option(
+        "--offset",
+        type=click.IntRange(min=0),
+        default=0,
+        show_default=True,
+        help="Skip this many modules in each table.",
+    )(f)
+    return click.option(
+        "--limit",
+        type=click.IntRange(min=0),
+        default=None,
+        help="List at most this many modules in each table.",
+    )(f)
+
+
+def get_output_format() -> str:
+    "Return the format given to `--format` for the command being run."
+    return click.get_current_context().find_root().params["output_format"]
+
+
+def validate_month(context, param, value):
+    "Check that a month is given as YYYY-MM."
+    if value is None:
+        return value
+    try:
+        return datetime.strptime(value, "%Y-%m").strftime("%Y-%m")
+    except ValueError as error:
+        raise click.BadParameter("expected a month as YYYY-MM.") from error
+
+
+def load_grades(config_path, json_str=None, grades_cache=None) -> Grades:
+    """Return the grades of a config file, or of a JSON string if given.
+
+    With `grades_cache`, the grades of a config file are kept and only
+    loaded again once the file changes. They are kept under the absolute
+    path of the file, as relative paths depend on the working directory of
+    each command. Only the grades of the `GRADES_CACHE_SIZE` files used
+    most recently are kept, ordered from the least recently used."""
+    key = None
+    if grades_cache is not None and json_str is None:
+        try:
+            stat = os.stat(config_path)
+            path = os.path.abspath(config_path)
+            key = (path, stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            pass
+        if key in grades_cache:
+            grades_cache[key] = grades_cache.pop(key)
+            return grades_cache[key]
+    try:
+        grades = Grades(json_str=json_str, config_path=config_path)
+    except ConfigValidationError as error:
+        return Grades(verified=False, error=error)
+    if key is not None:
+        for stale_key in [k for k in grades_cache if k[0] == key[0]]:
+            del grades_cache[stale_key]
+        grades_cache[key] = grades
+        while len(grades_cache) > GRADES_CACHE_SIZE:
+            del grades_cache[next(iter(grades_cache))]
+    return grades
+
+
+class GradesLoader:
+    """Grades given to `cli`, only loaded once a command needs them so that
+    other commands (and help screens) never read the config file.
+
+    `grades_cache` and `result_cache` are those of `load_grades` and
+    `Grades.result_cache`."""
+
+    def __init__(
+        self, config_path, json_str=None, grades_cache=None, result_cache=None
+    ) -> None:
+        self.config_path = config_path
+        self.json_str = json_str
+        self.grades_cache = grades_cache
+        self.result_cache = result_cache
+        self.grades = None
+
+    def load(self) -> Grades:
+        """Return the grades, loading them on the first call."""
+        if self.grades is None:
+            self.grades = load_grades(
+                self.config_path, self.json_str, self.grades_cache
+            )
+            self.grades.result_cache = self.result_cache
+        return self.grades
+
+    def get_config(self) -> Config:
+        """Return the config the grades are loaded from, without loading
+        it."""
+        if self.json_str is not None:
+            return Config(json_str=self.json_str)
+        return Config(config_path=self.config_path)
+
+
+def get_grades(ctx) -> Grades:
+    "Return the grades given to `cli`, see `GradesLoader.load`."
+    return ctx.find_object(GradesLoader).load()
+
+
 @click.group()
 @click.option(
     "-v",
@@ -72,33 +204,75 @@ def print_version(context, param, value):
     default=None,
     help="Load grades data from a JSON string.",
 )
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(formats.FORMATS),
+    default=formats.TEXT,
+    show_default=True,
+    help="Print the results as text or for other programs to read.",
+)
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    default=False,
+    help="Compute the summaries again instead of reading them from the cache.",
+)
 @click.pass_context
-def cli(ctx, config, json_str):
-    try:
-        ctx.obj = Grades(json_str=json_str, config_path=config)
-    except ConfigValidationError as error:
-        ctx.obj = Grades(verified=False, error=error)
+def cli(ctx, config, json_str, output_format, no_cache):
+    # The daemon passes a dict to keep the grades loaded between commands
+    grades_cache = ctx.obj if isinstance(ctx.obj, dict) else None
+    ctx.obj = GradesLoader(
+        config,
+        json_str,
+        grades_cache,
+        None if no_cache else ResultCache(get_cache_directory()),
+    )
 
 
-@cli.group()
-def summarize():
+@cli.group(invoke_without_command=True)
+@click.option(
+    "--as-of",
+    "as_of",
+    type=str,
+    metavar="YYYY-MM",
+    callback=validate_month,
+    help="Show the averages of the modules completed up to a given month.",
+)
+@click.pass_context
+def summarize(ctx, as_of):
     """Print a summary of the progress made so far."""
+    if ctx.invoked_subcommand is not None:
+        if as_of is not None:
+            raise click.UsageError("--as-of cannot be used with a command.")
+        return None
+    if as_of is None:
+        console.print(ctx.get_help())
+        return ctx.exit()
+    grades = get_grades(ctx)
+    if not grades.config_exists:
+        return print_error(grades)
+    return commands.summarize_as_of(grades, as_of, get_output_format())
 
 
 @summarize.command(name="all")
+@pagination_options
 @pass_grades
 @run_if_config_exists
-def all_(ctx, grades):
+def all_(ctx, grades, limit, offset):
     """Output includes modules done as well as those in progress."""
-    commands.summarize_all(grades)
+    commands.summarize_all(
+        grades, output_format=get_output_format(), limit=limit, offset=offset
+    )
 
 
 @summarize.command()
+@pagination_options
 @pass_grades
 @run_if_config_exists
-def done(ctx, grades):
+def done(ctx, grades, limit, offset):
     """Output includes only modules that are done and dusted."""
-    commands.summarize_done(grades)
+    commands.summarize_done(grades, get_output_format(), limit, offset)
 
 
 @summarize.command()
@@ -108,16 +282,105 @@ def done(ctx, grades):
     is_flag=True,
     help="Show the average for modules in progress only.",
 )
+@pagination_options
 @pass_grades
 @run_if_config_exists
-def progress(ctx, grades, avg_progress_only):
+def progress(ctx, grades, avg_progress_only, limit, offset):
     """Output includes only modules that are in progress.
 
     In progress means there is no value provided for `module_score` yet
     for a given module."""
     if avg_progress_only:
-        return commands.summarize_progress_avg_progress_only(grades)
-    return commands.summarize_progress(grades)
+        return commands.summarize_progress_avg_progress_only(
+            grades, get_output_format(), limit, offset
+        )
+    return commands.summarize_progress(
+        grades, get_output_format(), limit, offset
+    )
+
+
+@cli.command()
+@click.option(
+    "-r",
+    "--repeat",
+    type=click.IntRange(min=1),
+    default=10,
+    show_default=True,
+    help="Number of timed runs of each stage.",
+)
+@click.option(
+    "--warmup",
+    type=click.IntRange(min=0),
+    default=2,
+    show_default=True,
+    help="Number of runs of each stage before timing it.",
+)
+@click.option(
+    "-d",
+    "--dpi",
+    "dpis",
+    multiple=True,
+    type=click.IntRange(100, 1000),
+    default=DEFAULT_DPIS,
+    show_default=True,
+    help="Plot modules at this DPI (can be given more than once).",
+)
+@click.option(
+    "--synthetic",
+    is_flag=True,
+    default=False,
+    help="Use generated grades instead of those of the config file.",
+)
+@click.option(
+    "--seed",
+    type=int,
+    default=0,
+    show_default=True,
+    help="Seed of the generated grades with `--synthetic`.",
+)
+@click.pass_context
+def bench(ctx, repeat, warmup, dpis, synthetic, seed):
+    """Time the main stages of ugc and report their median and p95.
+
+    Stages are loading and checking the config file, computing each
+    average, printing a summary and plotting modules."""
+    if synthetic:
+        config = get_synthetic_config(seed)
+    elif not (grades := get_grades(ctx)).config_exists:
+        return print_error(grades)
+    else:
+        config = grades.config
+    output_format = get_output_format()
+    if output_format != formats.TEXT:
+        return commands.bench(config, repeat, warmup, dpis, output_format)
+    with console.status("Timing..."):
+        return commands.bench(config, repeat, warmup, dpis, output_format)
+
+
+@cli.command()
+@click.option(
+    "--socket",
+    "socket_path",
+    type=str,
+    default=None,
+    help="Path of the socket to listen on [default: ~/.ugc-daemon.sock].",
+)
+def daemon(socket_path):
+    """Keep ugc loaded in the background to run commands faster."""
+    commands.daemon(socket_path)
+
+
+@cli.command(name="diff")
+@click.argument("old", type=click.Path(exists=True, dir_okay=False))
+@click.argument("new", type=click.Path(exists=True, dir_okay=False))
+def diff_(old, new):
+    """Compare two config files and the averages they give."""
+    try:
+        old_data = Config(config_path=old).load()
+        new_data = Config(config_path=new).load()
+    except ConfigValidationError as error:
+        return print_error(Grades(verified=False, error=error))
+    return commands.diff(old_data, new_data)
 
 
 @cli.command()
@@ -127,14 +390,13 @@ def progress(ctx, grades, avg_progress_only):
     is_flag=True,
     help="Overwrite the existing config file, if any.",
 )
-@pass_grades
-def generate_sample(grades, force_overwrite):
+@click.pass_obj
+def generate_sample(loader, force_overwrite):
     """Generate a sample grades JSON config file."""
-    if grades.error:
-        print_error(grades)
+    config = loader.get_config()
     if force_overwrite:
-        return commands.generate_sample_overwrite(grades.config)
-    return commands.generate_sample(grades.config)
+        return commands.generate_sample_overwrite(config)
+    return commands.generate_sample(config)
 
 
 @cli.group()
@@ -147,7 +409,7 @@ def check():
 @run_if_config_exists
 def score_accuracy(ctx, grades):
     """Check for rounding errors when averaging module score."""
-    commands.check_score_accuracy(grades)
+    commands.check_score_accuracy(grades, get_output_format())
 
 
 @cli.group()
@@ -169,6 +431,13 @@ def plot():
     type=str,
     help="Change the output file name.",
 )
+@click.option(
+    "-f",
+    "--force-overwrite",
+    is_flag=True,
+    default=False,
+    help="Overwrite the output file without asking, if it exists.",
+)
 @click.option(
     "--long-module-names",
     is_flag=True,
@@ -243,5 +512,145 @@ def plot():
 @run_if_config_exists
 def modules(ctx, grades, **kwargs):
     """Produce a scatter plot showing all individual grades."""
-    with console.status("Working..."):
-        commands.plot_modules(grades=grades, options=kwargs)
+    output_format = get_output_format()
+    if output_format == formats.TEXT:
+        with console.status("Working..."):
+            commands.plot_modules(grades=grades, options=kwargs)
+        return
+
+    # Only the result is printed, without the messages shown along the way
+    console.quiet = True
+    try:
+        result = commands.plot_modules(grades=grades, options=kwargs)
+    finally:
+        console.quiet = False
+    formats.print_result(output_format, [], result)
+
+
+@cli.command()
+@click.argument("script", type=click.File("r", encoding="utf-8"))
+@pass_grades
+@run_if_config_exists
+def batch(ctx, grades, script):
+    """Run the commands listed in a file (- for stdin) on the same grades.
+
+    Each line holds one command as it would be typed after `ugc`, among
+    summarize, check and plot. Blank lines and comments (#) are skipped.
+    With --format json, the results are printed as a single JSON array."""
+    grades.cache = {} if grades.cache is None else grades.cache
+    parent = click.get_current_context().parent
+    collect = contextlib.nullcontext()
+    if get_output_format() == "json":
+        collect = formats.collect_json_results()
+    failed = 0
+    with collect:
+        for line_number, line in enumerate(script, start=1):
+            args = shlex.split(line, comments=True)
+            if not args:
+                continue
+            if get_output_format() == formats.TEXT:
+                console.print(f"[cyan]$ ugc {shlex.join(args)}")
+            if not run_batch_command(parent, args):
+                print_batch_error(f"Line {line_number} failed.")
+                failed += 1
+    if failed:
+        click.get_current_context().exit(1)
+
+
+def run_batch_command(parent, args) -> bool:
+    """Run one command of `ugc batch` as a subcommand of `parent`, the
+    context holding the grades. Return False if it failed to run."""
+    if args[0] not in BATCH_COMMANDS:
+        print_batch_error(f"Error: {args[0]} cannot be run in a batch.")
+        return False
+    command = cli.get_command(parent, args[0])
+    try:
+        with command.make_context(args[0], args[1:], parent=parent) as ctx:
+            command.invoke(ctx)
+    except click.exceptions.Exit:
+        pass
+    except click.ClickException as error:
+        print_batch_error(f"Error: {error.format_message()}")
+        return False
+    except click.Abort:
+        return False
+    return True
+
+
+@cli.command(
+    context_settings={
+        "ignore_unknown_options": True,
+        "allow_interspersed_args": False,
+    }
+)
+@click.option(
+    "--interval",
+    type=click.FloatRange(min=0.1),
+    default=1.0,
+    show_default=True,
+    help="Seconds to wait between checks of the config file.",
+)
+@click.argument("args", nargs=-1, type=click.UNPROCESSED)
+@pass_grades
+@run_if_config_exists
+def watch(ctx, grades, interval, args):
+    """Run a command again each time the config file changes.
+
+    The command is one of summarize (summarize all by default) or plot,
+    along with its options, e.g. `ugc watch plot modules --no-trend`.
+    Plots overwrite the previous one without asking.
+
+    The command runs again on the new grades as a whole: only the changes
+    printed beforehand are derived from the modules that changed."""
+    args = list(args or DEFAULT_WATCH_ARGS)
+    if args[0] not in WATCH_COMMANDS:
+        raise click.UsageError(f"{args[0]} cannot be watched.")
+    if args[0] == "plot":
+        if len(args) < 2 or args[1] not in plot.commands:
+            raise click.UsageError(
+                "plot needs a subcommand to be watched, e.g. plot modules."
+            )
+        # Right after the subcommand, before any `--` or argument
+        args.insert(2, "--force-overwrite")
+    if grades.config.json is not None:
+        raise click.UsageError("--json cannot be watched: use --config.")
+
+    parent = click.get_current_context().parent
+    watcher = ConfigWatcher(
+        grades.config.path, grades.data, grades.degree_rules
+    )
+    grades.cache = {}
+    run_batch_command(parent, args)
+    console.print(f"[blue]Watching {watcher.path} for changes...")
+    try:
+        while True:
+            time.sleep(interval)
+            if not watcher.has_changed():
+                continue
+            try:
+                config, result = watcher.reload()
+            except (ConfigValidationError, FileNotFoundError) as error:
+                print_error(Grades(verified=False, error=error))
+                continue
+
+            # Results derived from the previous grades can't be kept
+            changed = Grades.from_config(config)
+            changed.result_cache = grades.result_cache
+            changed.cache = {}
+            grades = parent.obj.grades = changed
+
+            now = datetime.now().strftime("%H:%M:%S")
+            console.print(f"\n[cyan]Config changed at {now}")
+            commands_helpers.print_diff(result)
+            run_batch_command(parent, args)
+    except KeyboardInterrupt:
+        console.print("[blue]Stopped watching.")
+
+
+def print_batch_error(message: str) -> None:
+    """Print an error of `ugc batch`, away from the results when these are
+    serialized."""
+    if get_output_format() == formats.TEXT:
+        console.print(f"[red]{message}")
+    else:
+        click.echo(message, err=True)
@@ -0,0 +1,103 @@
+"""
+Entry point of the `ugc` command, which hands the command over to the
+daemon started with `ugc daemon` when it is running and runs it in this
+process otherwise.
+
+Only the standard library is imported until the command is known to run
+here, so that forwarding it to the daemon costs as little as possible.
+"""
+# Standard library imports
+from pathlib import Path
+import json
+import os
+import shutil
+import socket
+import sys
+
+# Environment variables to change the socket used and to always run
+# commands in this process
+SOCKET_ENV = "UGC_SOCKET"
+NO_DAEMON_ENV = "UGC_NO_DAEMON"
+
+# Commands always run in this process: the daemon runs one command at a
+# time, so commands that run until interrupted or that may prompt would keep
+# it from serving other commands
+LOCAL_COMMANDS = ("batch", "daemon", "watch")
+
+# Argument standing for the standard input, which only this process can read
+STDIN_ARG = "-"
+
+# Environment variables deciding whether the output is colored, passed to
+# the daemon along with the terminal
+TERMINAL_ENV = (
+    "TERM",
+    "COLORTERM",
+    "NO_COLOR",
+    "FORCE_COLOR",
+    "TTY_COMPATIBLE",
+)
+
+
+def get_socket_path() -> str:
+    """Return the path of the socket the daemon listens on."""
+    return os.environ.get(SOCKET_ENV, f"{str(Path.home())}/.ugc-daemon.sock")
+
+
+def should_forward(args: list, socket_path: str) -> bool:
+    """Return True if a command is to be forwarded to the daemon."""
+    if os.environ.get(NO_DAEMON_ENV) or not os.path.exists(socket_path):
+        return False
+    return not any(arg in (*LOCAL_COMMANDS, STDIN_ARG) for arg in args)
+
+
+def send_request(request: dict, socket_path: str) -> dict:
+    """Send a request to the daemon and return its response, or None if
+    the daemon can't be reached (e.g. the socket was left behind by a daemon
+    that is no longer running)."""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(socket_path)
+            client.sendall(json.dumps(request).encode() + b"\n")
+            client.shutdown(socket.SHUT_WR)
+            with client.makefile("rb") as response:
+                return json.loads(response.readline())
+    except (OSError, ValueError):
+        return None
+
+
+def get_terminal() -> dict:
+    """Return how the output of this process is displayed: whether it is a
+    terminal, its width and the variables of `TERMINAL_ENV` that are set."""
+    return {
+        "is_terminal": sys.stdout.isatty(),
+        "width": shutil.get_terminal_size().columns,
+        "environ": {
+            name: os.environ[name]
+            for name in TERMINAL_ENV
+            if name in os.environ
+        },
+    }
+
+
+def forward(args: list, socket_path: str) -> dict:
+    """Run a command in the daemon and return `{output, exit_code}`, or None
+    if the daemon can't be reached. The output is rendered for the terminal
+    given by `get_terminal`, as if the command ran in this process."""
+    request = {"args": args, "cwd": os.getcwd(), "terminal": get_terminal()}
+    return send_request(request, socket_path)
+
+
+def main(args: list = None) -> None:
+    args = sys.argv[1:] if args is None else list(args)
+    socket_path = get_socket_path()
+    if should_forward(args, socket_path):
+        response = forward(args, socket_path)
+        if response is not None:
+            sys.stdout.write(response["output"])
+            sys.stdout.flush()
+            sys.exit(response["exit_code"])
+
+    # pylint: disable=import-outside-toplevel
+    from ugc.cli import cli
+
+    cli.main(args, prog_name="ugc")
@@ -0,0 +1,406 @@
+"""
+Process the grades of many students at once, one config file per student.
+"""
+# Standard library imports
+from pathlib import Path
+import hashlib
+import json
+import os
+
+# Third-party library imports
+import numpy as np
+
+# Local imports
+from ugc.config import Config, ConfigValidationError
+from ugc.grades import Grades
+from ugc.utils import cohort_helpers, grades_helpers
+from ugc.utils.sketches import QuantileSketch
+
+# Aggregates of `Grades` that can be used as a score column of a cohort.
+# Any other column name is understood as a module name.
+AGGREGATE_COLUMNS = (
+    "weighted_average",
+    "unweighted_average",
+    "weighted_average_in_progress",
+    "unweighted_average_including_in_progress",
+)
+
+# Aggregates stored for each student in a `CohortManifest`
+MANIFEST_COLUMNS = AGGREGATE_COLUMNS + ("total_credits",)
+
+
+class Cohort:
+    """Grades of a group of students.
+
+    `paths` maps a student ID to the path of that student's config file.
+    Students are loaded one at a time when iterating over the cohort so only
+    a single config is ever held in memory."""
+
+    def __init__(self, paths: dict) -> None:
+        self.paths = {
+            student_id: Path(path)
+            for student_id, path in sorted(paths.items())
+        }
+
+    @classmethod
+    def from_directory(cls, directory, pattern: str = "*.json") -> "Cohort":
+        """Build a cohort from every config file found in `directory`, using
+        each file name (without extension) as the student ID."""
+        return cls({path.stem: path for path in Path(directory).glob(pattern)})
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def iter_grades(self):
+        """Yield a tuple `(student_id, grades)` for each student."""
+        for student_id, path in self.paths.items():
+            yield student_id, Grades(config_path=path)
+
+    def iter_chunks(self, chunk_size: int):
+        """Yield lists of up to `chunk_size` tuples `(student_id, grades)`."""
+        chunk = []
+        for student in self.iter_grades():
+            chunk.append(student)
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def iter_score_matrices(self, modules: list = None, chunk_size=10_000):
+        """Yield a tuple `(student_ids, matrix)` for each chunk of students,
+        where `matrix` holds the score of each student (rows) in each of
+        `modules` (columns, all the modules of the degree by default).
+        Missing, unfinished and RPLed modules are set to NaN."""
+        modules = get_module_names() if modules is None else modules
+        for chunk in self.iter_chunks(chunk_size):
+            student_ids = [student_id for student_id, _ in chunk]
+            grades_list = [grades for _, grades in chunk]
+            yield student_ids, cohort_helpers.get_score_matrix(
+                grades_list, modules
+            )
+
+    def module_score_correlation(
+        self, modules: list = None, chunk_size=10_000, min_count: int = 2
+    ) -> tuple:
+        """Return a tuple `(modules, matrix)` where `matrix[i, j]` is the
+        correlation between the scores of the students who completed both
+        `modules[i]` and `modules[j]`. The cohort is processed in chunks of
+        `chunk_size` students. Pairs of modules completed together by fewer
+        than `min_count` students are set to NaN."""
+        modules = get_module_names() if modules is None else modules
+        accumulator = cohort_helpers.CorrelationAccumulator(len(modules))
+        for _, matrix in self.iter_score_matrices(modules, chunk_size):
+            accumulator.update(matrix)
+        return modules, accumulator.correlation(min_count=min_count)
+
+    def required_final_scores(
+        self,
+        target_module_score: float = None,
+        target_average: float = None,
+        target_classification: str = None,
+        chunk_size=10_000,
+    ) -> dict:
+        """Batched `Grades.get_required_final_scores` over the cohort, one
+        vectorized computation per chunk of students. Return a dict mapping
+        each student ID to the required final score of each of their
+        modules in progress (None where the target can't be reached)."""
+        target_average = grades_helpers.get_target_average(
+            target_module_score, target_average, target_classification
+        )
+
+        results = {}
+        for chunk in self.iter_chunks(chunk_size):
+            columns = cohort_helpers.get_in_progress_columns(
+                [grades for _, grades in chunk]
+            )
+            if target_module_score is not None:
+                required = cohort_helpers.get_required_final_scores(
+                    columns["midterm_score"],
+                    columns["midterm_weight"],
+                    columns["final_weight"],
+                    target_module_score,
+                )
+            else:
+                required = (
+                    cohort_helpers.get_required_final_scores_for_average(
+                        columns, target_average
+                    )
+                )
+            for student_id, _ in chunk:
+                results[student_id] = {}
+            for student, module_name, score in zip(
+                columns["student"], columns["module_name"], required
+            ):
+                results[chunk[student][0]][module_name] = (
+                    None if np.isnan(score) else float(score)
+                )
+        return results
+
+    def boundary_sensitivity_report(self, chunk_size=10_000) -> list:
+        """Return one row per student describing how close their weighted
+        average (including modules in progress) is to the next
+        classification boundary and to the next US and UK GPA steps, in
+        marks. `marginal_effects` gives, for each module in progress, how
+        much the average moves for one more mark in that module.
+
+        Rows are ranked from the student closest to the next
+        classification to the furthest away, students who already have
+        the highest classification coming last."""
+        boundaries = list(grades_helpers.CLASSIFICATION_BOUNDARIES.values())
+        rows = []
+        for chunk in self.iter_chunks(chunk_size):
+            columns = cohort_helpers.get_in_progress_columns(
+                [grades for _, grades in chunk]
+            )
+            total_weight = columns["total_weight"]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                averages = np.where(
+                    total_weight > 0,
+                    np.round(columns["total_score"] / total_weight, 2),
+                    0,
+                )
+                effects = columns["weight"] / total_weight[columns["student"]]
+            to_class = cohort_helpers.get_marks_to_next_step(
+                averages, boundaries
+            )
+            to_us_gpa = cohort_helpers.get_marks_to_next_step(
+                averages, grades_helpers.US_GPA_STEPS
+            )
+            to_uk_gpa = cohort_helpers.get_marks_to_next_step(
+                averages, grades_helpers.UK_GPA_STEPS
+            )
+            classifications = cohort_helpers.get_classifications(averages)
+            next_classifications = cohort_helpers.get_classifications(
+                averages + np.nan_to_num(to_class)
+            )
+
+            chunk_rows = [
+                {
+                    "student_id": student_id,
+                    "weighted_average": float(averages[index]),
+                    "classification": classifications[index],
+                    "next_classification": (
+                        None
+                        if np.isnan(to_class[index])
+                        else next_classifications[index]
+                    ),
+                    "marks_to_next_classification": _nan_to_none(
+                        to_class[index]
+                    ),
+                    "marks_to_next_us_gpa": _nan_to_none(to_us_gpa[index]),
+                    "marks_to_next_uk_gpa": _nan_to_none(to_uk_gpa[index]),
+                    "marginal_effects": {},
+                }
+                for index, (student_id, _) in enumerate(chunk)
+            ]
+            for student, module_name, effect in zip(
+                columns["student"], columns["module_name"], effects
+            ):
+                chunk_rows[student]["marginal_effects"][module_name] = float(
+                    effect
+                )
+            rows.extend(chunk_rows)
+
+        rows.sort(
+            key=lambda row: (
+                row["marks_to_next_classification"] is None,
+                row["marks_to_next_classification"] or 0,
+            )
+        )
+        return rows
+
+    def iter_column(self, column: str):
+        """Yield every available value of a score column across the cohort.
+
+        `column` is either one of `AGGREGATE_COLUMNS` or the name of a module,
+        in which case the score of each student who completed it is yielded
+        (RPLed modules have no score and are skipped)."""
+        for _, grades in self.iter_grades():
+            value = get_column_value(grades, column)
+            if value is not None:
+                yield value
+
+    def sketch_column(
+        self, column: str, error: float = 0.01, seed=None
+    ) -> QuantileSketch:
+        """Return a quantile sketch of a score column whose normalized rank
+        error stays below `error`. Sketches of different cohorts can be
+        merged with `QuantileSketch.merge`."""
+        sketch = QuantileSketch.from_error(error, seed=seed)
+        sketch.extend(self.iter_column(column))
+        return sketch
+
+    def score_quantiles(
+        self,
+        column: str,
+        quantiles: tuple = (0.5, 0.9, 0.99),
+        error: float = 0.01,
+        seed=None,
+    ) -> dict:
+        """Return a dict mapping each of `quantiles` to the approximate
+        value of a score column at that quantile (p50, p90 and p99 by
+        default)."""
+        sketch = self.sketch_column(column, error=error, seed=seed)
+        return dict(zip(quantiles, sketch.quantiles(quantiles)))
+
+    def refresh(self, manifest: "CohortManifest") -> dict:
+        """Bring `manifest` up to date with the config files of the cohort.
+
+        Only the students whose file was added, changed or removed since the
+        manifest was last refreshed are loaded again and the cohort totals
+        are patched with the difference. A file is considered unchanged
+        when its modification time and size did not change or, failing
+        that, when its content hash is the same. Return the student IDs
+        found in each of the categories `added`, `changed` and `removed`.
+
+        A file that can't be read or isn't a valid config doesn't stop the
+        refresh: `failed` maps the ID of each such student to the reason.
+        Their entry, if any, is kept as it was and the file is tried again
+        on the next refresh."""
+        changes = {"added": [], "changed": [], "removed": [], "failed": {}}
+
+        for student_id in list(manifest.students):
+            if student_id not in self.paths:
+                manifest.remove_student(student_id)
+                changes["removed"].append(student_id)
+
+        for student_id, path in self.paths.items():
+            entry = manifest.students.get(student_id)
+            try:
+                stat = os.stat(path)
+                if (
+                    entry is not None
+                    and entry["mtime"] == stat.st_mtime
+                    and entry["size"] == stat.st_size
+                ):
+                    continue
+                content = path.read_bytes()
+                sha256 = hashlib.sha256(content).hexdigest()
+                if entry is not None and entry["sha256"] == sha256:
+                    # Touched but not modified: no need to recompute anything
+                    entry.update(mtime=stat.st_mtime, size=stat.st_size)
+                    continue
+                config = Config(json_str=content.decode("utf-8"))
+                config.load()
+            except (OSError, ValueError, ConfigValidationError) as error:
+                changes["failed"][student_id] = str(error)
+                continue
+
+            manifest.set_student(
+                student_id,
+                {
+                    "mtime": stat.st_mtime,
+                    "size": stat.st_size,
+                    "sha256": sha256,
+                    "aggregates": get_aggregates(Grades.from_config(config)),
+                },
+            )
+            changes["added" if entry is None else "changed"].append(student_id)
+
+        return changes
+
+
+class CohortManifest:
+    """Record of the config file of each student in a cohort (modification
+    time, size and content hash) along with the aggregates last computed
+    from it and the cohort totals derived from those aggregates.
+
+    A manifest created without a `path` is only kept in memory and can't be
+    saved. Sums are rounded to 2 decimals like the aggregates they add up,
+    so patching them as students come and go gives the same totals as
+    adding up every student again."""
+
+    def __init__(self, path=None) -> None:
+        self.path = Path(path) if path is not None else None
+        self.students = {}
+        self.totals = {
+            column: {"sum": 0, "count": 0} for column in MANIFEST_COLUMNS
+        }
+
+    @classmethod
+    def load(cls, path) -> "CohortManifest":
+        """Load a manifest from `path` or start a new, empty one if the file
+        does not exist yet."""
+        manifest = cls(path)
+        if manifest.path.exists():
+            with open(manifest.path, encoding="utf-8") as mfile:
+                saved = json.load(mfile)
+            manifest.students = saved["students"]
+            manifest.totals = saved["totals"]
+        return manifest
+
+    def save(self) -> None:
+        if self.path is None:
+            raise ValueError(
+                "Cannot save a manifest created without a path: pass one to "
+                "`CohortManifest` or use `CohortManifest.load`."
+            )
+        with open(self.path, "w", encoding="utf-8") as mfile:
+            json.dump(
+                {"students": self.students, "totals": self.totals}, mfile
+            )
+
+    def mean(self, column: str) -> float:
+        """Return the average of an aggregate over the students who have a
+        value for it, or None if nobody does."""
+        total = self.totals[column]
+        return total["sum"] / total["count"] if total["count"] else None
+
+    def set_student(self, student_id: str, entry: dict) -> None:
+        """Add or replace the entry of a student and patch the totals."""
+        if student_id in self.students:
+            self.remove_student(student_id)
+        self.students[student_id] = entry
+        self._patch_totals(entry["aggregates"], sign=1)
+
+    def remove_student(self, student_id: str) -> None:
+        """Remove the entry of a student and patch the totals."""
+        entry = self.students.pop(student_id)
+        self._patch_totals(entry["aggregates"], sign=-1)
+
+    def _patch_totals(self, aggregates: dict, sign: int) -> None:
+        for column, value in aggregates.items():
+            if value is None:
+                continue
+            total = self.totals[column]
+            total["sum"] = round(total["sum"] + sign * value, 2)
+            total["count"] += sign
+
+
+def _nan_to_none(value: float) -> float:
+    return None if np.isnan(value) else round(float(value), 2)
+
+
+def get_module_names() -> list:
+    """Return the name of every module of the degree, including the
+    alternative name of Computational Mathematics."""
+    return [*Config().default, "Numerical Mathematics"]
+
+
+def get_aggregates(grades: Grades) -> dict:
+    """Return the value of every column of `MANIFEST_COLUMNS` for a single
+    student."""
+    aggregates = {
+        column: get_column_value(grades, column)
+        for column in AGGREGATE_COLUMNS
+    }
+    aggregates["total_credits"] = grades.total_credits
+    return aggregates
+
+
+def get_column_value(grades: Grades, column: str) -> float:
+    """Return the value of a score column for a single student or None when
+    the student has nothing to report for that column."""
+    if column in AGGREGATE_COLUMNS:
+        has_scores = bool(grades.get_module_scores_of_finished_modules())
+        if column.endswith(("_in_progress", "_including_in_progress")):
+            has_scores = has_scores or bool(
+                grades.get_list_of_modules_in_progress()
+            )
+        return getattr(grades, column) if has_scores else None
+
+    module_score = grades.data.get(column, {}).get("module_score")
+    if module_score is None or module_score == -1:
+        return None
+    return module_score
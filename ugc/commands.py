@@ -8,24 +8,59 @@ from pathlib import Path
 import base64
 import io
 import os
-import urllib
+import urllib.parse
 
 # Third-party library imports
-from matplotlib.lines import Line2D
 import click
-import matplotlib.pyplot as plt
-import numpy as np
-import pandas as pd
-
-# Avoid overlap with annotations (auto placement of text)
-from adjustText import adjust_text
 
 # Local imports
+from ugc import benchmark
+from ugc.config import Config
+from ugc.daemon import create_server, warm_up
+from ugc.diff import GradeTotals, diff_configs
 from ugc.grades import Grades
-from ugc.utils import console, commands_helpers, grades_helpers
+from ugc.utils import console, commands_helpers, formats, grades_helpers
+
+
+def bench(
+    config: Config,
+    repeat: int = 10,
+    warmup: int = 2,
+    dpis=benchmark.DEFAULT_DPIS,
+    output_format: str = formats.TEXT,
+) -> dict:
+    """Time the main stages of the program on the grades of a loaded
+    `config` and print the median and 95th percentile of each."""
+    stages = benchmark.get_stages(config, dpis)
+    records = benchmark.run_stages(stages, repeat, warmup)
+    summary = {
+        "repeat": repeat,
+        "warmup": warmup,
+        **benchmark.get_environment(),
+    }
 
+    if output_format != formats.TEXT:
+        formats.print_result(output_format, records, summary)
+        return {"stages": records, **summary}
+
+    commands_helpers.pprint_table(
+        [
+            ("Stage", {"style": "blue", "no_wrap": True}),
+            ("Median", {"justify": "right", "style": "green"}),
+            ("p95", {"justify": "right", "style": "yellow"}),
+            ("Min", {"justify": "right", "style": "cyan"}),
+        ],
+        [tuple(record.values()) for record in records],
+        title=f"Durations in ms — {repeat} runs, {warmup} warm-up runs",
+    )
+    console.print(
+        f"[blue]ugc {summary['ugc_version']}, Python "
+        f"{summary['python_version']} on {summary['platform']}"
+    )
+    return {"stages": records, **summary}
 
-def check_score_accuracy(grades) -> dict:
+
+def check_score_accuracy(grades, output_format: str = formats.TEXT) -> dict:
     expected_dict = {}
     for module, values in grades.data.items():
         conditions = [
@@ -45,14 +80,56 @@ def check_score_accuracy(grades) -> dict:
                 "actual": actual_score,
                 "expected": expected_score,
             }
-            console.print(
-                f"[red]{module}: {actual_score}% actual (expected {expected_score}%)"
-            )
+
+    if output_format != formats.TEXT:
+        formats.print_result(
+            output_format,
+            [
+                {"module_name": module, **scores}
+                for module, scores in expected_dict.items()
+            ],
+            {"accurate": not expected_dict},
+        )
+        return expected_dict
+
+    for module, scores in expected_dict.items():
+        console.print(
+            f"[red]{module}: {scores['actual']}% actual "
+            f"(expected {scores['expected']}%)"
+        )
     if not expected_dict:
         console.print("[green]All module scores are accurate!")
     return expected_dict
 
 
+def daemon(socket_path: str = None) -> dict:
+    """Run the commands forwarded by `ugc` until interrupted."""
+    try:
+        server = create_server(socket_path)
+    except FileExistsError as error:
+        console.print(f"[yellow]{error}")
+        return {"ok": False, "error": str(error)}
+
+    warm_up()
+    console.print(f"[green]Listening on {server.socket_path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        console.print("[blue]Daemon stopped.")
+    finally:
+        server.server_close()
+    return {"ok": True}
+
+
+def diff(old: dict, new: dict, totals: GradeTotals = None) -> dict:
+    """Print the fields that differ between two configs and how the
+    aggregates of the modules done change as a result. `totals` are those
+    of `old` when already known, see `ugc.diff.diff_configs`."""
+    result = diff_configs(old, new, totals)
+    commands_helpers.print_diff(result)
+    return result
+
+
 def generate_sample(config) -> dict:
     """Generate a sample grades JSON config file."""
     if os.path.exists(config.path):
@@ -86,6 +163,15 @@ def plot_modules(grades: Grades, api=False, options: dict = {}) -> dict:
     Args:
         grades (Grades): ugc grades object.
     """
+    # Plotting libraries take a while to import: only do it when plotting
+    from matplotlib.lines import Line2D
+    import matplotlib.pyplot as plt
+    import numpy as np
+    import pandas as pd
+
+    # Avoid overlap with annotations (auto placement of text)
+    from adjustText import adjust_text
+
     # Set the stage by creating a dataframe to be used for plotting
     finished_modules = grades.get_list_of_finished_modules()
 
@@ -110,11 +196,6 @@ def plot_modules(grades: Grades, api=False, options: dict = {}) -> dict:
     # Drop modules with invalid scores
     df = df.replace("N/A", np.NaN).dropna()
 
-    # Get and set the weight for each module in a new column
-    df["Weight"] = df.apply(
-        commands_helpers.dataframe_map_module_to_weight, axis=1
-    )
-
     # Set short module names so the graph is less cluttered
     df["Short name"] = df.apply(
         lambda row: grades.short_names[row["Module name"]], axis=1
@@ -126,7 +207,12 @@ def plot_modules(grades: Grades, api=False, options: dict = {}) -> dict:
     )
 
     # Figure aspect ratio and output quality in dots per inch
-    plt.figure(figsize=(12, 6), dpi=options.get("dpi", 100))
+    # The same figure is cleared and drawn again by each call rather than
+    # creating a new one, e.g. when `ugc watch` plots after every change. Its
+    # dpi is given to `savefig`, which would use the dpi it was created with
+    figure = plt.figure(num=commands_helpers.PLOT_FIGURE, clear=True)
+    figure.set_size_inches(12, 6)
+    figure.set_dpi(options.get("dpi", 100))
 
     # Graph title: if the `title` option is passed, set the title to that and
     # optionally append today's date if the `keep_date_in_title` option is set.
@@ -207,11 +293,22 @@ def plot_modules(grades: Grades, api=False, options: dict = {}) -> dict:
     # Get the current value of the labels
     handles, labels = plt.gca().get_legend_handles_labels()
 
+    # Averages per semester, used to plot multiple lines: calculate those
+    # once and for all from the timeline of modules done
+    semester_averages = grades.get_timeline().semester_averages()
+    semester_dates = pd.to_datetime(
+        [semester["date"] for semester in semester_averages], format="%Y-%m"
+    )
+    weighted_average = [
+        semester["weighted_average"] for semester in semester_averages
+    ]
+    average_over_time = [
+        semester["unweighted_average"] for semester in semester_averages
+    ]
+
     # Will be used for the trend line and to determine whether we can plot
     # the other average lines
-    dates = df.set_index("Completion date", append=False)
-    dates = dates.index.to_julian_date()
-    dates = dates.unique()
+    dates = semester_dates.to_julian_date()
 
     # It's not much of a line with less than 2 different dates...
     if len(dates) < 2:
@@ -219,17 +316,11 @@ def plot_modules(grades: Grades, api=False, options: dict = {}) -> dict:
             "[yellow]Not enough data to plot a line: skipping trend and averages..."
         )
     else:
-        # Used to plot multiple lines, so calculate those once and for all
-        weighted_average = commands_helpers.dataframe_get_weighted_average(
-            df, "Score", "Weight", "Completion date"
-        )
-        average_over_time = df.groupby("Completion date").mean()
-
         if not options.get("no_avgs") and not options.get("no_avg_unweighted"):
             # Plot the unweighted average per semester
             plt.plot(
-                average_over_time.index,
-                average_over_time["Score"],
+                semester_dates,
+                average_over_time,
                 color=colors[3],
                 linestyle="solid",
                 linewidth=1,
@@ -250,7 +341,7 @@ def plot_modules(grades: Grades, api=False, options: dict = {}) -> dict:
         if not options.get("no_avgs") and not options.get("no_avg_weighted"):
             # Plot the weighted average per semester
             plt.plot(
-                weighted_average.index,
+                semester_dates,
                 weighted_average,
                 color=colors[4],
                 linestyle="dashdot",
@@ -271,8 +362,8 @@ def plot_modules(grades: Grades, api=False, options: dict = {}) -> dict:
         if not options.get("no_trend"):
             # Calculate the least squares polynomial fit and plot.
             # https://numpy.org/doc/stable/reference/generated/numpy.polyfit.html
-            x = np.array(average_over_time.index)
-            y = [round(v, 2) for v in np.array(average_over_time["Score"])]
+            x = np.array(semester_dates)
+            y = [round(v, 2) for v in average_over_time]
             z = np.polyfit(dates, y, 1)
             p = np.poly1d(z)
             plt.plot(
@@ -296,11 +387,10 @@ def plot_modules(grades: Grades, api=False, options: dict = {}) -> dict:
 
         if not options.get("no_avgs") and not options.get("no_avg_overall"):
             # Plot an horizontal line showing the weighted average obtained over time
-            x = np.array(weighted_average.index)
-            y = [round(v, 2) for v in np.array(weighted_average)]
+            x = np.array(semester_dates)
             plt.plot(
                 x,
-                [round(weighted_average.mean(), 2)] * len(x),
+                [round(np.mean(weighted_average), 2)] * len(x),
                 linestyle="solid",
                 alpha=0.75,
                 linewidth=1.25,
@@ -370,7 +460,11 @@ def plot_modules(grades: Grades, api=False, options: dict = {}) -> dict:
         filepath = Path(options.get("path", "")) / filename
 
     # Don't check if file already exists when api=True: we won't save to disk
-    if not api and os.path.exists(filepath):
+    if (
+        not api
+        and not options.get("force_overwrite")
+        and os.path.exists(filepath)
+    ):
         err_msg = f"The output destination file already exists: {filepath}"
         console.print(f"[yellow]{err_msg}")
 
@@ -378,16 +472,18 @@ def plot_modules(grades: Grades, api=False, options: dict = {}) -> dict:
             "Would you like to overwrite this file?",
             prompt_suffix=": ",
             show_default=True,
-            err=False,
+            # Keep the prompt out of the result when it is serialized
+            err=console.quiet,
         ):
-            console.print("[blue]Aborting: the existing file was kept intact.")
-            return {}  # just to be consistent with return types
+            err_msg = "Aborting: the existing file was kept intact."
+            console.print(f"[blue]{err_msg}")
+            return {"ok": False, "error": err_msg}
 
     # Separate strategy when the function is called with api=True:
     # return the image as a readable string
     if api:
         buffer = io.BytesIO()
-        plt.savefig(buffer, format="png")
+        plt.savefig(buffer, format="png", dpi=figure.dpi)
         buffer.seek(0)
         image_string = base64.b64encode(buffer.read())
 
@@ -397,53 +493,105 @@ def plot_modules(grades: Grades, api=False, options: dict = {}) -> dict:
 
     # Save the file to disk
     try:
-        plt.savefig(filepath)
+        plt.savefig(filepath, dpi=figure.dpi)
         console.print(f"[green]Plot saved to {filepath}")
 
     except PermissionError:
         err_msg = f"PermissionError: could not save the output to {filepath}"
         console.print(f"[red]{err_msg}")
-    return {}  # just to be consistent with return types
-
+        return {"ok": False, "error": err_msg}
+    return {"ok": True, "path": str(filepath)}
+
+
+def summarize_all(
+    grades: Grades,
+    symbol: str = "=",
+    repeat: int = 80,
+    output_format: str = formats.TEXT,
+    limit: int = None,
+    offset: int = 0,
+) -> dict:
+    """Print a summary of modules done and in progress. `limit` and `offset`
+    apply to each table, see `commands_helpers.pprint_table`."""
+    if output_format != formats.TEXT:
+        done, done_records, done_summary = commands_helpers.get_cached_result(
+            grades, commands_helpers.get_done_result
+        )
+        (
+            progress,
+            progress_records,
+            progress_summary,
+        ) = commands_helpers.get_cached_result(
+            grades, commands_helpers.get_in_progress_result
+        )
+        done_records = commands_helpers.paginate(done_records, limit, offset)
+        progress_records = commands_helpers.paginate(
+            progress_records, limit, offset
+        )
+        formats.print_result(
+            output_format,
+            [
+                *({"status": "done", **record} for record in done_records),
+                *(
+                    {"status": "in progress", **record}
+                    for record in progress_records
+                ),
+            ],
+            {**done_summary, **progress_summary},
+        )
+        return {"done": done, "progress": progress}
 
-def summarize_all(grades: Grades, symbol: str = "=", repeat: int = 80) -> dict:
-    """Print a summary of modules done and in progress."""
     console.print("[cyan]Modules completed")
     console.print(f"[cyan]{symbol * repeat}")
-    summary_done = summarize_done(grades)
+    summary_done = summarize_done(grades, limit=limit, offset=offset)
 
     console.print("\n[cyan]Modules in progress")
     console.print(f"[cyan]{symbol * repeat}")
-    summary_progress = summarize_progress(grades)
+    summary_progress = summarize_progress(grades, limit=limit, offset=offset)
 
     return {"done": summary_done, "progress": summary_progress}
 
 
-def summarize_done(grades) -> dict:
+def summarize_done(
+    grades,
+    output_format: str = formats.TEXT,
+    limit: int = None,
+    offset: int = 0,
+) -> dict:
     """Print a summary of the progress made so far for modules that are done
-    and dusted."""
-    if not (finished_modules := grades.get_list_of_finished_modules()):
+    and dusted. Only `limit` modules are listed after skipping `offset`
+    modules, see `commands_helpers.pprint_table`."""
+    result, records, summary = commands_helpers.get_cached_result(
+        grades, commands_helpers.get_done_result
+    )
+    if output_format != formats.TEXT:
+        records = list(commands_helpers.paginate(records, limit, offset))
+        formats.print_result(output_format, records, summary)
+        return result
+    if not result:
         console.print("[blue]No modules done. Good luck in your journey!")
         return {}
-    modules = grades_helpers.get_grades_list_as_list_of_dicts(finished_modules)
 
-    df = commands_helpers.get_modules_done_dataframe(grades, modules)
-    commands_helpers.pprint_dataframe_done(
-        df, title="Progress made — Modules done"
+    commands_helpers.pprint_table(
+        commands_helpers.DONE_COLUMNS,
+        [tuple(record.values()) for record in records],
+        title="Progress made — Modules done",
+        limit=limit,
+        offset=offset,
     )
 
     # Store all the data we want to print
-    wavg = grades.weighted_average
-    uavg = grades.unweighted_average
-    wects = grades_helpers.get_ects_equivalent_score(wavg)
-    uects = grades_helpers.get_ects_equivalent_score(uavg)
-    wus = grades_helpers.get_us_letter_equivalent_score(wavg)
-    uus = grades_helpers.get_us_letter_equivalent_score(uavg)
-    wclass = grades_helpers.get_classification(wavg)
-    wgpa_us = grades_helpers.get_us_gpa(wavg)
-    wgpa_uk = grades_helpers.get_uk_gpa(wavg)
-    total_credits = grades.total_credits
-    pct_done = grades.get_percentage_degree_done(total_credits)
+    wavg = summary["weighted_average"]
+    uavg = summary["unweighted_average"]
+    wects = summary["weighted_ects"]
+    uects = summary["unweighted_ects"]
+    wus = summary["weighted_us"]
+    uus = summary["unweighted_us"]
+    wclass = summary["weighted_class"]
+    wgpa_us = summary["weighted_gpa_us"]
+    wgpa_uk = summary["weighted_gpa_uk"]
+    total_credits = summary["credits_done"]
+    pct_done = summary["percentage_done"]
 
     console.print(
         f"\n[green]Weighted average: {wavg} (ECTS: {wects}, US: {wus})"
@@ -455,78 +603,133 @@ def summarize_done(grades) -> dict:
     console.print(f"[blue]Classification (weighted): {wclass}")
     console.print(f"[magenta]GPA (weighted): {wgpa_us} US — {wgpa_uk} UK")
 
+    degree_credits = grades.get_degree_rules().total_credits
     console.print(
-        f"[cyan]Total credits done: {total_credits} / 360 ({pct_done}%)"
+        f"[cyan]Total credits done: {total_credits} / {degree_credits} "
+        f"({pct_done}%)"
     )
 
-    return {
-        "modules": modules,
+    return result
+
+
+def summarize_as_of(
+    grades, month: str, output_format: str = formats.TEXT
+) -> dict:
+    """Print the averages of the modules completed up to and including
+    `month` (YYYY-MM)."""
+    timeline = grades.get_timeline()
+    if not (num_modules := timeline.num_modules_as_of(month)):
+        if output_format != formats.TEXT:
+            formats.print_result(output_format, [])
+        else:
+            console.print(f"[blue]No modules done as of {month}.")
+        return {}
+
+    wavg = timeline.weighted_average_as_of(month)
+    uavg = timeline.unweighted_average_as_of(month)
+    wclass = grades_helpers.get_classification(wavg)
+    result = {
+        "as_of": month,
+        "modules_done": num_modules,
         "weighted_average": wavg,
         "unweighted_average": uavg,
-        "weighted_ects": wects,
-        "unweighted_ects": uects,
-        "weighted_us": wus,
-        "unweighted_us": uus,
         "weighted_class": wclass,
-        "weighted_gpa_us": wgpa_us,
-        "weighted_gpa_uk": wgpa_uk,
-        "credits_done": total_credits,
-        "percentage_done": pct_done,
     }
+    if output_format != formats.TEXT:
+        formats.print_result(output_format, [], result)
+        return result
 
+    wects = grades_helpers.get_ects_equivalent_score(wavg)
+    uects = grades_helpers.get_ects_equivalent_score(uavg)
+    wus = grades_helpers.get_us_letter_equivalent_score(wavg)
+    uus = grades_helpers.get_us_letter_equivalent_score(uavg)
 
-def summarize_progress(grades) -> dict:
-    """Print a summary of only the modules that are currently in progress."""
-    if commands_helpers.there_are_no_modules_in_progress(grades):
+    console.print(f"[cyan]Averages as of {month} ({num_modules} modules done)")
+    console.print(
+        f"[green]Weighted average: {wavg} (ECTS: {wects}, US: {wus})"
+    )
+    console.print(
+        f"[yellow]Unweighted average: {uavg} (ECTS: {uects}, US: {uus})"
+    )
+    console.print(f"[blue]Classification (weighted): {wclass}")
+
+    return result
+
+
+def summarize_progress(
+    grades,
+    output_format: str = formats.TEXT,
+    limit: int = None,
+    offset: int = 0,
+) -> dict:
+    """Print a summary of only the modules that are currently in progress.
+    Only `limit` modules are listed after skipping `offset` modules."""
+    result, records, summary = commands_helpers.get_cached_result(
+        grades, commands_helpers.get_in_progress_result
+    )
+    if output_format != formats.TEXT:
+        records = list(commands_helpers.paginate(records, limit, offset))
+        formats.print_result(output_format, records, summary)
+        return result
+    if not result:
+        console.print("[blue]No modules in progress.")
         return {}
 
-    (
-        df_all_scores,
-        in_progress,
-    ) = commands_helpers.get_modules_in_progress_dataframe(grades)
-    commands_helpers.pprint_dataframe_in_progress(
-        df_all_scores, title="Work in progress — Modules with pending grades"
+    columns, rows = commands_helpers.get_modules_in_progress_table(records)
+    commands_helpers.pprint_table(
+        columns,
+        rows,
+        title="Work in progress — Modules with pending grades",
+        limit=limit,
+        offset=offset,
     )
 
-    wavg = grades.weighted_average_in_progress
-    uavg = grades.unweighted_average_including_in_progress
-    commands_helpers.print_weighted_average_in_progress(wavg)
-    commands_helpers.print_unweighted_average_in_progress(uavg)
+    commands_helpers.print_weighted_average_in_progress(
+        result["weighted_average"]
+    )
+    commands_helpers.print_unweighted_average_in_progress(
+        result["unweighted_average"]
+    )
 
-    return {
-        "modules": in_progress,
-        "weighted_average": wavg,
-        "unweighted_average": uavg,
-    }
+    return result
 
 
-def summarize_progress_avg_progress_only(grades) -> dict:
-    if commands_helpers.there_are_no_modules_in_progress(grades):
+def summarize_progress_avg_progress_only(
+    grades,
+    output_format: str = formats.TEXT,
+    limit: int = None,
+    offset: int = 0,
+) -> dict:
+    result, records, summary = commands_helpers.get_cached_result(
+        grades,
+        commands_helpers.get_in_progress_result,
+        only_in_progress=True,
+    )
+    if output_format != formats.TEXT:
+        records = list(commands_helpers.paginate(records, limit, offset))
+        formats.print_result(output_format, records, summary)
+        return result
+    if not result:
+        console.print("[blue]No modules in progress.")
         return {}
 
-    (
-        df_all_scores,
-        in_progress,
-    ) = commands_helpers.get_modules_in_progress_dataframe(grades)
-    commands_helpers.pprint_dataframe_in_progress(
-        df_all_scores, title="Work in progress — Modules with pending grades"
+    columns, rows = commands_helpers.get_modules_in_progress_table(records)
+    commands_helpers.pprint_table(
+        columns,
+        rows,
+        title="Work in progress — Modules with pending grades",
+        limit=limit,
+        offset=offset,
     )
 
-    wavg = grades.weighted_average_in_progress_only
-    uavg = grades.unweighted_average_in_progress_only
-
     # No need to display if there's only one module: there's no average
     # to calculate
-    if len(in_progress) > 1:
+    if len(records) > 1:
         commands_helpers.print_weighted_average_in_progress(
-            wavg, only_in_progress=True
+            result["weighted_average"], only_in_progress=True
         )
         commands_helpers.print_unweighted_average_in_progress(
-            uavg, only_in_progress=True
+            result["unweighted_average"], only_in_progress=True
         )
 
-    return {
-        "modules": in_progress,
-        "weighted_average": wavg,
-        "unweighted_average": uavg,
-    }
+    return result
@@ -4,9 +4,12 @@ Manage the configuration file.
 
 # Standard library imports
 from pathlib import Path
+import hashlib
 import json
 
 # Local imports
+from ugc import __version__
+from ugc.rules import get_default_rules
 from ugc.utils import console
 
 
@@ -63,6 +66,19 @@ class Config:
         except json.decoder.JSONDecodeError as e:
             raise ConfigValidationError(err_msg) from e
 
+    def fingerprint(self, rules=None, salt: str = "") -> str:
+        """Return a digest identifying the grades loaded, regardless of the
+        order of the keys, the formatting of the file and whether missing
+        values are left out or set to null. The version of this package,
+        the degree `rules` (`ugc.rules.DegreeRules`, those of
+        `degree-rules.json` by default) and `salt` are part of the digest,
+        so results computed under other rules or versions don't match.
+
+        The grades are loaded first if they haven't been yet."""
+        if not self.data:
+            self.load()
+        return get_fingerprint(self.data, get_fingerprint_salt(rules, salt))
+
     def verify(self) -> None:
         """Check that the config file contains valid data. One of the
         functions will throw an error if the config is not valid."""
@@ -225,3 +241,37 @@ class Config:
                         f"'{key}'. Got '{value}'."
                     )
         return True
+
+
+def get_fingerprint_salt(rules=None, salt: str = "") -> str:
+    """Return what is added to the data of a fingerprint: the version of
+    this package, the fingerprint of the degree `rules` and `salt`."""
+    rules = get_default_rules() if rules is None else rules
+    return f"{__version__}:{rules.fingerprint()}:{salt}"
+
+
+def get_fingerprint(data: dict, salt: str = "") -> str:
+    """Return a 32-character hex digest of the canonical form of grades
+    data: modules and fields sorted by name, null values left out and
+    numbers compared as floats (70 and 70.0 are the same score)."""
+    canonical = sorted(
+        (
+            module_name,
+            sorted(
+                (field, _get_canonical_value(value))
+                for field, value in values.items()
+                if value is not None
+            ),
+        )
+        for module_name, values in data.items()
+    )
+    digest = hashlib.blake2b(salt.encode(), digest_size=16)
+    digest.update(b"\0")
+    digest.update(repr(canonical).encode())
+    return digest.hexdigest()
+
+
+def _get_canonical_value(value):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return value
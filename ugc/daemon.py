@@ -0,0 +1,123 @@
+"""
+Keep `ugc` loaded in a background process that runs the commands forwarded
+to it by `ugc.client` over a local Unix socket, so that libraries are only
+imported once and config files are only loaded again when they change.
+"""
+# Standard library imports
+import contextlib
+import io
+import json
+import os
+import socketserver
+import sys
+import traceback
+
+# Local imports
+from ugc.client import get_socket_path, send_request
+
+# Libraries imported when the daemon starts rather than by the first
+# command needing them
+WARM_MODULES = ("matplotlib.pyplot", "numpy", "pandas", "adjustText")
+
+
+def warm_up() -> None:
+    """Import the modules used by the commands ahead of time."""
+    # pylint: disable=import-outside-toplevel
+    import importlib
+
+    for name in ("ugc.cli", *WARM_MODULES):
+        importlib.import_module(name)
+
+
+def run_command(
+    args: list, cwd: str, grades_cache: dict, terminal: dict = None
+) -> dict:
+    """Run a command like `ugc` would from `cwd` and return its output,
+    along with its exit code, as `{output, exit_code}`. The output is
+    rendered for `terminal` (see `ugc.client.get_terminal`), as plain text
+    when not given.
+
+    `grades_cache` keeps the grades loaded by previous commands, see
+    `ugc.cli.load_grades`. Unexpected errors are reported in the output
+    instead of stopping the daemon. The standard input is empty, so that
+    commands asking for confirmation are aborted instead of waiting for an
+    answer that can't come."""
+    # pylint: disable=import-outside-toplevel
+    from ugc.cli import cli
+    from ugc.utils import use_console
+
+    options = {}
+    if terminal is not None:
+        # Without a terminal, `FORCE_COLOR` may still turn colors on
+        options = {
+            "force_terminal": terminal["is_terminal"] or None,
+            "width": terminal["width"],
+            "_environ": terminal["environ"],
+        }
+    buffer = io.StringIO()
+    exit_code = 0
+    previous_cwd = os.getcwd()
+    previous_stdin = sys.stdin
+    with contextlib.redirect_stdout(buffer), contextlib.redirect_stderr(
+        buffer
+    ), use_console(**options):
+        try:
+            sys.stdin = io.StringIO()
+            os.chdir(cwd)
+            cli.main(args, prog_name="ugc", obj=grades_cache)
+        except SystemExit as error:
+            exit_code = error.code or 0
+        except Exception:  # pylint: disable=broad-except
+            traceback.print_exc()
+            exit_code = 1
+        finally:
+            sys.stdin = previous_stdin
+            os.chdir(previous_cwd)
+            if "matplotlib.pyplot" in sys.modules:
+                sys.modules["matplotlib.pyplot"].close("all")
+    return {"output": buffer.getvalue(), "exit_code": exit_code}
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    """Answer one request: a JSON line `{args, cwd, terminal}` is read and a
+    JSON line `{output, exit_code}` is written back."""
+
+    def handle(self) -> None:
+        request = json.loads(self.rfile.readline())
+        response = run_command(
+            request["args"],
+            request["cwd"],
+            self.server.grades_cache,
+            request.get("terminal"),
+        )
+        self.wfile.write(json.dumps(response).encode() + b"\n")
+
+
+class DaemonServer(socketserver.UnixStreamServer):
+    """Server answering requests one at a time: commands change the working
+    directory and standard streams of the whole process while they run."""
+
+    def __init__(self, socket_path: str) -> None:
+        self.socket_path = socket_path
+        self.grades_cache = {}
+        super().__init__(socket_path, RequestHandler)
+
+    def server_close(self) -> None:
+        super().server_close()
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(self.socket_path)
+
+
+def create_server(socket_path: str = None) -> DaemonServer:
+    """Return a server listening on `socket_path` (see
+    `ugc.client.get_socket_path`). A socket left behind by a daemon that is
+    no longer running is replaced, but a `FileExistsError` is raised if a
+    daemon is still listening on it."""
+    socket_path = get_socket_path() if socket_path is None else socket_path
+    if os.path.exists(socket_path):
+        if send_request({"args": ["--version"], "cwd": "/"}, socket_path):
+            raise FileExistsError(
+                f"A daemon is already listening on {socket_path}."
+            )
+        os.remove(socket_path)
+    return DaemonServer(socket_path)
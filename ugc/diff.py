@@ -0,0 +1,151 @@
+"""
+Compare two versions of the grades of a student and report the effect of
+the changes on the aggregates.
+"""
+# Standard library imports
+import copy
+
+# Local imports
+from ugc.rules import DegreeRules, get_default_rules
+from ugc.utils import grades_helpers, mathtools
+
+# Aggregates compared by `diff_configs`, along with the classification
+DELTA_COLUMNS = ("weighted_average", "unweighted_average", "total_credits")
+
+
+def get_module_contribution(
+    module_name: str, values: dict, rules: DegreeRules
+) -> tuple:
+    """Return what a single module adds to the totals of a `GradeTotals`:
+    `(weighted_score, weight, score, count, credits)`, following the same
+    rules as `Grades.weighted_average`, `Grades.unweighted_average` and
+    `Grades.total_credits`."""
+    weighted_score = weight = score = count = credits = 0
+    module_score = values.get("module_score")
+    if values.get("level") and grades_helpers.score_is_valid(module_score):
+        if module_score >= 0:
+            weight = rules.weight(module_name, values["level"])
+            weighted_score = module_score * weight
+            score = module_score
+            count = 1
+    if module_score and (module_score == -1 or module_score >= 40):
+        credits = rules.credits(module_name)
+    return weighted_score, weight, score, count, credits
+
+
+class GradeTotals:
+    """Sums from which the aggregates of the modules done are derived.
+
+    Totals are patched one module at a time, so the aggregates after a
+    change only need the old and new values of the modules that changed."""
+
+    def __init__(self, rules: DegreeRules = None) -> None:
+        self.rules = get_default_rules() if rules is None else rules
+        self.weighted_score = 0
+        self.weight = 0
+        self.score = 0
+        self.count = 0
+        self.credits = 0
+
+    @classmethod
+    def from_data(cls, data: dict, rules: DegreeRules = None) -> "GradeTotals":
+        """Return the totals of all the modules of a config."""
+        totals = cls(rules)
+        for module_name, values in data.items():
+            totals.add(module_name, values)
+        return totals
+
+    def add(self, module_name: str, values: dict, sign: int = 1) -> None:
+        """Add the contribution of a module, or remove it with `sign=-1`."""
+        weighted_score, weight, score, count, credits = (
+            get_module_contribution(module_name, values, self.rules)
+        )
+        self.weighted_score += sign * weighted_score
+        self.weight += sign * weight
+        self.score += sign * score
+        self.count += sign * count
+        self.credits += sign * credits
+
+    def update(self, old: dict, new: dict, module_names) -> None:
+        """Replace the contribution of each of `module_names` in the config
+        `old` by its contribution in the config `new`."""
+        for module_name in module_names:
+            self.add(module_name, old.get(module_name, {}), sign=-1)
+            self.add(module_name, new.get(module_name, {}))
+
+    def aggregates(self) -> dict:
+        """Return the aggregates, rounded like those of `Grades`."""
+        weighted_average = (
+            round(self.weighted_score / self.weight, 2) if self.weight else 0
+        )
+        unweighted_average = (
+            mathtools.round_half_up(self.score / self.count, 2)
+            if self.count
+            else 0
+        )
+        return {
+            "weighted_average": weighted_average,
+            "unweighted_average": unweighted_average,
+            "total_credits": self.credits,
+            "classification": grades_helpers.get_classification(
+                weighted_average
+            ),
+        }
+
+
+def get_field_changes(old: dict, new: dict) -> list:
+    """Return a dict `{module, field, old, new}` for each field whose value
+    differs between two configs. Missing fields and modules count as None.
+    Modules that are equal as a whole are skipped without looking at their
+    fields."""
+    changes = []
+    for module_name in [*old, *(m for m in new if m not in old)]:
+        old_values = old.get(module_name, {})
+        new_values = new.get(module_name, {})
+        if old_values == new_values:
+            continue
+        for field in [
+            *old_values,
+            *(f for f in new_values if f not in old_values),
+        ]:
+            if old_values.get(field) != new_values.get(field):
+                changes.append(
+                    {
+                        "module": module_name,
+                        "field": field,
+                        "old": old_values.get(field),
+                        "new": new_values.get(field),
+                    }
+                )
+    return changes
+
+
+def diff_configs(old: dict, new: dict, totals: GradeTotals = None) -> dict:
+    """Compare two configs and return the `changes` (see
+    `get_field_changes`) along with the aggregates `before` and `after` the
+    changes and the `delta` of each of `DELTA_COLUMNS`.
+
+    `totals` are the totals of `old` when already known, e.g. when
+    reviewing many corrections made to the same config: only the modules
+    that changed are then looked at to get the aggregates after the
+    changes."""
+    before = GradeTotals.from_data(old) if totals is None else totals
+    after = copy.copy(before)
+    changes = get_field_changes(old, new)
+    after.update(
+        old, new, dict.fromkeys(change["module"] for change in changes)
+    )
+
+    before_aggregates = before.aggregates()
+    after_aggregates = after.aggregates()
+    return {
+        "changes": changes,
+        "before": before_aggregates,
+        "after": after_aggregates,
+        "delta": {
+            column: round(
+                after_aggregates[column] - before_aggregates[column], 2
+            )
+            for column in DELTA_COLUMNS
+        },
+    }
@@ -0,0 +1,140 @@
+"""
+Export the results of a cohort for downstream analytics.
+"""
+# Standard library imports
+import csv
+
+# Third-party library imports
+import numpy as np
+
+# Local imports
+from ugc.utils import commands_helpers
+
+# One row per student: the aggregates reported by `summarize done`
+STUDENT_COLUMNS = (
+    "student_id",
+    "weighted_average",
+    "unweighted_average",
+    "weighted_ects",
+    "unweighted_ects",
+    "weighted_us",
+    "unweighted_us",
+    "weighted_class",
+    "weighted_gpa_us",
+    "weighted_gpa_uk",
+    "credits_done",
+    "percentage_done",
+)
+
+# One row per finished module of each student
+MODULE_COLUMNS = (
+    "student_id",
+    "module_name",
+    "level",
+    "completion_date",
+    "module_score",
+    "midterm_score",
+    "midterm_weight",
+    "final_score",
+    "final_weight",
+)
+
+# Columns exported as strings in NPZ files, all the others being numeric
+TEXT_COLUMNS = (
+    "student_id",
+    "module_name",
+    "completion_date",
+    "weighted_ects",
+    "unweighted_ects",
+    "weighted_us",
+    "unweighted_us",
+    "weighted_class",
+)
+
+
+def iter_cohort_rows(cohort):
+    """Yield a tuple `(student_row, module_rows)` for each student of a
+    `Cohort`, with rows following `STUDENT_COLUMNS` and `MODULE_COLUMNS`.
+    Missing values are set to None."""
+    for student_id, grades in cohort.iter_grades():
+        summary = commands_helpers.get_summary_done(grades)
+        student_row = (student_id, *(summary[c] for c in STUDENT_COLUMNS[1:]))
+        module_rows = [
+            (
+                student_id,
+                module_name,
+                *(values.get(c) for c in MODULE_COLUMNS[2:]),
+            )
+            for module in grades.get_list_of_finished_modules()
+            for module_name, values in module.items()
+        ]
+        yield student_row, module_rows
+
+
+def export_csv(
+    cohort, students_path, modules_path, chunk_size: int = 1000
+) -> dict:
+    """Write the student aggregates and the module rows of a cohort to two
+    CSV files. Rows are written every `chunk_size` students so memory use
+    does not grow with the size of the cohort. Return the number of rows
+    written to each file."""
+    counts = {"students": 0, "modules": 0}
+    with open(students_path, "w", newline="", encoding="utf-8") as sfile, open(
+        modules_path, "w", newline="", encoding="utf-8"
+    ) as mfile:
+        students_writer = csv.writer(sfile)
+        modules_writer = csv.writer(mfile)
+        students_writer.writerow(STUDENT_COLUMNS)
+        modules_writer.writerow(MODULE_COLUMNS)
+
+        student_rows, module_rows = [], []
+        for student_row, rows in iter_cohort_rows(cohort):
+            student_rows.append(student_row)
+            module_rows.extend(rows)
+            if len(student_rows) >= chunk_size:
+                _flush_csv_rows(
+                    students_writer, student_rows, counts, "students"
+                )
+                _flush_csv_rows(modules_writer, module_rows, counts, "modules")
+        _flush_csv_rows(students_writer, student_rows, counts, "students")
+        _flush_csv_rows(modules_writer, module_rows, counts, "modules")
+    return counts
+
+
+def _flush_csv_rows(writer, rows: list, counts: dict, key: str) -> None:
+    writer.writerows(rows)
+    counts[key] += len(rows)
+    rows.clear()
+
+
+def export_npz(cohort, path) -> dict:
+    """Write the student aggregates and the module rows of a cohort as
+    compressed column arrays in a single NPZ file. Arrays are named
+    `students.<column>` and `modules.<column>`. Numeric columns use NaN for
+    missing values. Return the number of rows in each table."""
+    students = {column: [] for column in STUDENT_COLUMNS}
+    modules = {column: [] for column in MODULE_COLUMNS}
+    for student_row, module_rows in iter_cohort_rows(cohort):
+        for column, value in zip(STUDENT_COLUMNS, student_row):
+            students[column].append(value)
+        for row in module_rows:
+            for column, value in zip(MODULE_COLUMNS, row):
+                modules[column].append(value)
+
+    arrays = {}
+    for table, columns in (("students", students), ("modules", modules)):
+        for column, values in columns.items():
+            arrays[f"{table}.{column}"] = _to_array(column, values)
+    np.savez_compressed(path, **arrays)
+    return {
+        "students": len(students["student_id"]),
+        "modules": len(modules["student_id"]),
+    }
+
+
+def _to_array(column: str, values: list) -> np.ndarray:
+    if column in TEXT_COLUMNS:
+        return np.array(["" if v is None else v for v in values], dtype=str)
+    return np.array(
+        [np.nan if v is None else v for v in values], dtype=np.float64
+    )
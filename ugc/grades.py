@@ -4,7 +4,9 @@ Computer Science at the University of London (calculations are specific
 to this particular degree).
 """
 # Local imports
-from ugc.config import Config
+from ugc.config import Config, get_fingerprint, get_fingerprint_salt
+from ugc.rules import get_default_rules
+from ugc.timeline import Timeline
 from ugc.utils import (
     grades_helpers,
     mathtools,
@@ -12,6 +14,24 @@ from ugc.utils import (
 
 
 class Grades:
+    # A `ugc.regression.FinalScorePredictor` used to estimate the final
+    # score of modules in progress that only have a midterm score. Without
+    # one, the midterm score counts as the score of the module.
+    final_score_predictor = None
+
+    # A `ugc.rules.DegreeRules` giving the weight and credits of each
+    # module. Without one, the rules found in `degree-rules.json` are used.
+    degree_rules = None
+
+    # A dict keeping results derived from the grades, such as their
+    # `Timeline`, while the grades are not expected to change (e.g. when
+    # `ugc batch` runs many commands on them). Nothing is kept when None.
+    cache = None
+
+    # A `ugc.cache.ResultCache` keeping the results of the summaries on
+    # disk between runs. Results are always computed when None.
+    result_cache = None
+
     def __init__(
         self, json_str=None, config_path=None, verified=True, error=None
     ) -> None:
@@ -32,15 +52,38 @@ class Grades:
         # Otherwise, trying to load the config file will unsurprisingly
         # not work...
         try:
-            self.config.load()
+            self.data = self.config.load()
         except FileNotFoundError:
             self.config_exists = False
             return
         self.config_exists = True
-
-        self.data = self.config.load()
         self.short_names = grades_helpers.load_short_module_names()
 
+    @classmethod
+    def from_config(cls, config: Config) -> "Grades":
+        """Return an instance using the data of a `Config` that was already
+        loaded, without reading it again."""
+        grades = cls.__new__(cls)
+        grades.error = None
+        grades.config = config
+        grades.config_exists = True
+        grades.data = config.data
+        grades.short_names = grades_helpers.load_short_module_names()
+        return grades
+
+    @classmethod
+    def from_store(cls, store, student_id: str) -> "Grades":
+        """Return an instance using the modules of a student kept in a
+        `ugc.store.GradeStore`."""
+        return cls.from_config(store.load_config(student_id))
+
+    @classmethod
+    def from_history(cls, history, timestamp=None) -> "Grades":
+        """Return an instance using the modules of a student as they were
+        at `timestamp` (the latest ones when None) according to a
+        `ugc.history.GradeHistory`."""
+        return cls.from_config(history.load_config(timestamp))
+
     @property
     def weighted_average_in_progress_only(self) -> float:
         (
@@ -98,9 +141,11 @@ class Grades:
         modules = self.get_list_of_finished_modules()
         module_scores = self.get_module_scores_of_finished_modules()
         total_weight = grades_helpers.get_total_weight_modules_finished(
-            modules
+            modules, self.degree_rules
+        )
+        total_score = grades_helpers.get_total_score_modules_finished(
+            modules, self.degree_rules
         )
-        total_score = grades_helpers.get_total_score_modules_finished(modules)
 
         return 0 if not module_scores else round(total_score / total_weight, 2)
 
@@ -109,10 +154,10 @@ class Grades:
         modules_finished = []
         modules_finished.extend(self.get_list_of_finished_modules())
         weight_finished = grades_helpers.get_total_weight_modules_finished(
-            modules_finished
+            modules_finished, self.degree_rules
         )
         score_finished = grades_helpers.get_total_score_modules_finished(
-            modules_finished
+            modules_finished, self.degree_rules
         )
 
         (
@@ -133,16 +178,13 @@ class Grades:
     @property
     def total_credits(self) -> int:
         """Get the total number of credits gotten so far as an integer."""
+        rules = self.get_degree_rules()
         total_credits = 0
         for subject_name, details in self.data.items():
             if details.get("module_score"):
                 module_score = details["module_score"]
                 if module_score == -1 or module_score >= 40:
-                    # This won't be -1 but it does not matter
-                    if subject_name.lower() == "final project":
-                        total_credits += 30
-                    else:
-                        total_credits += 15
+                    total_credits += rules.credits(subject_name)
         return total_credits
 
     def _get_unweighted_data_of_modules_in_progress(self) -> tuple:
@@ -150,7 +192,7 @@ class Grades:
         modules_in_progress.extend(self.get_list_of_modules_in_progress())
         score_progress = (
             grades_helpers.get_unweighted_total_score_modules_in_progress(
-                modules_in_progress
+                modules_in_progress, self.final_score_predictor
             )
         )
         return modules_in_progress, score_progress
@@ -229,7 +271,9 @@ class Grades:
         modules = self.get_list_of_modules_in_progress()
         modules_scores = []
         for module in modules:
-            result = grades_helpers.get_score_of_module_in_progress(module)
+            result = grades_helpers.get_score_of_module_in_progress(
+                module, self.final_score_predictor
+            )
             modules_scores.append(result)
 
         return modules_scores
@@ -238,15 +282,83 @@ class Grades:
         modules_in_progress = []
         modules_in_progress.extend(self.get_list_of_modules_in_progress())
         weight_progress = grades_helpers.get_total_weight_modules_in_progress(
-            modules_in_progress
+            modules_in_progress, self.degree_rules
         )
         score_progress = (
             grades_helpers.get_weighted_total_score_modules_in_progress(
-                modules_in_progress
+                modules_in_progress,
+                self.final_score_predictor,
+                self.degree_rules,
             )
         )
         return modules_in_progress, weight_progress, score_progress
 
+    def _get_weighted_score_in_progress(self, module: dict) -> float:
+        return grades_helpers.get_weighted_total_score_modules_in_progress(
+            [module], self.final_score_predictor, self.degree_rules
+        )
+
+    def get_required_final_scores(
+        self,
+        target_module_score: float = None,
+        target_average: float = None,
+        target_classification: str = None,
+    ) -> dict:
+        """Return the minimum final score needed in each module in progress
+        to reach exactly one of these targets:
+
+        - `target_module_score`: a score for the module itself.
+        - `target_average`: a weighted average including the modules in
+          progress, where the other modules in progress count for their
+          current (or predicted) score.
+        - `target_classification`: the lowest weighted average of a
+          classification, e.g. "First Class Honours".
+
+        A value of None means the target can't be reached in that module."""
+        target_average = grades_helpers.get_target_average(
+            target_module_score, target_average, target_classification
+        )
+
+        modules_finished = self.get_list_of_finished_modules()
+        (
+            modules_in_progress,
+            weight_progress,
+            score_progress,
+        ) = self._get_weighted_data_of_modules_in_progress()
+        total_weight = weight_progress + (
+            grades_helpers.get_total_weight_modules_finished(
+                modules_finished, self.degree_rules
+            )
+        )
+        total_score = score_progress + (
+            grades_helpers.get_total_score_modules_finished(
+                modules_finished, self.degree_rules
+            )
+        )
+
+        required_scores = {}
+        for module in modules_in_progress:
+            module_name = list(module.keys())[0]
+            target = target_module_score
+            if target is None:
+                weight = grades_helpers.get_total_weight_modules_in_progress(
+                    [module], self.degree_rules
+                )
+                if not weight:
+                    required_scores[module_name] = None
+                    continue
+                contribution = self._get_weighted_score_in_progress(module)
+                target = (
+                    target_average * total_weight
+                    - (total_score - contribution)
+                ) / weight
+            required_scores[module_name] = (
+                grades_helpers.get_required_final_score(
+                    self.data[module_name], target
+                )
+            )
+        return required_scores
+
     def get_num_of_finished_modules(self) -> int:
         """Return the number of modules completed with a score greater
         than or equal to zero as an integer."""
@@ -288,16 +400,47 @@ class Grades:
             to_run = grades_helpers.get_ects_equivalent_score
         for module in modules:
             module_name = list(module.keys())[0]
-            result = grades_helpers.get_score_of_module_in_progress(module)
+            result = grades_helpers.get_score_of_module_in_progress(
+                module, self.final_score_predictor
+            )
             converted_scores[module_name] = to_run(result)
         return converted_scores
 
-    @staticmethod
-    def get_percentage_degree_done(num_credits: int) -> float:
+    def fingerprint(self) -> str:
+        """Return a digest identifying the grades of this instance, to be
+        used as a key for caches or to spot duplicate requests. See
+        `Config.fingerprint`. The final score predictor, if any, is part of
+        the digest as it changes the results of the modules in progress."""
+        predictor = self.final_score_predictor
+        return get_fingerprint(
+            self.data,
+            get_fingerprint_salt(
+                self.get_degree_rules(),
+                "" if predictor is None else predictor.fingerprint(),
+            ),
+        )
+
+    def get_degree_rules(self):
+        """Return the `ugc.rules.DegreeRules` used by this instance."""
+        if self.degree_rules is None:
+            return get_default_rules()
+        return self.degree_rules
+
+    def get_timeline(self) -> Timeline:
+        """Return the `ugc.timeline.Timeline` of the modules done, built
+        only once when `cache` is set."""
+        if self.cache is None:
+            return Timeline(self)
+        if "timeline" not in self.cache:
+            self.cache["timeline"] = Timeline(self)
+        return self.cache["timeline"]
+
+    def get_percentage_degree_done(self, num_credits: int) -> float:
         """From the total number of credits, return the percentage done
-        out of 360 credits."""
-        if num_credits > 360:
+        out of the credits of the degree (360 credits)."""
+        degree_credits = self.get_degree_rules().total_credits
+        if num_credits > degree_credits:
             return 100  # one could take more modules, still completion is 100%
         if num_credits < 0:
             return -1  # can't be negative! Returns -1 as an error
-        return round(num_credits / 360 * 100, 2)
+        return round(num_credits / degree_credits * 100, 2)
@@ -0,0 +1,207 @@
+"""
+Keep track of every change made to the grades of a student over time.
+"""
+# Standard library imports
+from datetime import datetime, timezone
+from pathlib import Path
+import copy
+import json
+
+# Local imports
+from ugc.config import Config
+
+CHANGES_FILE = "changes.jsonl"
+SNAPSHOTS_FILE = "snapshots.jsonl"
+SNAPSHOTS_INDEX_FILE = "snapshots.index.jsonl"
+
+
+def get_timestamp(timestamp=None) -> str:
+    """Return a timestamp as an ISO 8601 string in UTC, which sorts like
+    the moment it stands for. Use the current time when `timestamp` is None.
+    Strings can hold any ISO 8601 date or time: naive ones, like naive
+    datetimes, are taken to be in UTC."""
+    if timestamp is None:
+        timestamp = datetime.now(timezone.utc)
+    if isinstance(timestamp, str):
+        # `fromisoformat` only reads the "Z" suffix from Python 3.11
+        if timestamp.endswith("Z"):
+            timestamp = timestamp[:-1] + "+00:00"
+        timestamp = datetime.fromisoformat(timestamp)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp.isoformat(timespec="seconds")
+
+
+class GradeHistory:
+    """Append-only log of the changes made to the modules of one student,
+    kept in `directory`.
+
+    Each change sets or removes one field of one module, or removes a whole
+    module, and is appended to `changes.jsonl`. Every `snapshot_every`
+    changes, the whole state is appended to `snapshots.jsonl` and its
+    position is written to a small index. The state at any point in time
+    is rebuilt from the latest snapshot taken before it, replaying only the
+    changes made since then.
+
+    Timestamps can't go back in time: a change or snapshot older than the
+    last one recorded raises a `ValueError`."""
+
+    def __init__(self, directory, snapshot_every: int = 100) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.snapshot_every = snapshot_every
+        self.changes_path = self.directory / CHANGES_FILE
+        self.snapshots_path = self.directory / SNAPSHOTS_FILE
+        self.index_path = self.directory / SNAPSHOTS_INDEX_FILE
+        for path in (self.changes_path, self.snapshots_path, self.index_path):
+            path.touch()
+
+        # One dict per snapshot: `timestamp`, `position` (in the snapshots
+        # file) and `offset` (end of its last change in the changes file)
+        with open(self.index_path, encoding="utf-8") as ifile:
+            self.snapshots = [json.loads(line) for line in ifile]
+        self.state, self.last_timestamp = self._replay(None)
+        self.changes_since_snapshot = self._count_changes_since_snapshot()
+
+    def _count_changes_since_snapshot(self) -> int:
+        offset = self.snapshots[-1]["offset"] if self.snapshots else 0
+        with open(self.changes_path, "rb") as cfile:
+            cfile.seek(offset)
+            return sum(1 for _ in cfile)
+
+    def _check_timestamp(self, timestamp) -> str:
+        timestamp = get_timestamp(timestamp)
+        if self.last_timestamp is not None and timestamp < self.last_timestamp:
+            raise ValueError(
+                f"Cannot record {timestamp} after {self.last_timestamp}."
+            )
+        return timestamp
+
+    def record(
+        self, module_name: str, field: str, value, timestamp=None
+    ) -> None:
+        """Append the change of one field of a module to the log."""
+        self._append(
+            {"module": module_name, "field": field, "value": value}, timestamp
+        )
+
+    def remove(self, module_name: str, field: str = None, timestamp=None):
+        """Append the removal of one field of a module to the log, or of the
+        whole module when `field` is None."""
+        self._append(
+            {"module": module_name, "field": field, "removed": True}, timestamp
+        )
+
+    def _append(self, change: dict, timestamp) -> None:
+        change = {"timestamp": self._check_timestamp(timestamp), **change}
+        with open(self.changes_path, "a", encoding="utf-8") as cfile:
+            cfile.write(json.dumps(change) + "\n")
+        self.last_timestamp = change["timestamp"]
+        apply_change(self.state, change)
+        self.changes_since_snapshot += 1
+        if self.changes_since_snapshot >= self.snapshot_every:
+            self.snapshot(change["timestamp"])
+
+    def record_config(self, data: dict, timestamp=None) -> int:
+        """Record the changes needed to go from the current state to `data`
+        (e.g. the content of a config file), all at the same time. Return
+        the number of changes recorded."""
+        timestamp = self._check_timestamp(timestamp)
+        num_changes = 0
+        for module_name, values in data.items():
+            old_values = self.state.get(module_name, {})
+            for field, value in values.items():
+                if field not in old_values or old_values[field] != value:
+                    self.record(module_name, field, value, timestamp)
+                    num_changes += 1
+            for field in set(old_values) - set(values):
+                self.remove(module_name, field, timestamp)
+                num_changes += 1
+        for module_name in set(self.state) - set(data):
+            self.remove(module_name, timestamp=timestamp)
+            num_changes += 1
+        return num_changes
+
+    def snapshot(self, timestamp=None) -> None:
+        """Save the whole current state so that rebuilding later states
+        does not need to replay the changes made so far."""
+        timestamp = self._check_timestamp(timestamp)
+        entry = {
+            "timestamp": timestamp,
+            "position": self.snapshots_path.stat().st_size,
+            "offset": self.changes_path.stat().st_size,
+        }
+        with open(self.snapshots_path, "a", encoding="utf-8") as sfile:
+            sfile.write(json.dumps({**entry, "state": self.state}) + "\n")
+        with open(self.index_path, "a", encoding="utf-8") as ifile:
+            ifile.write(json.dumps(entry) + "\n")
+        self.snapshots.append(entry)
+        self.last_timestamp = timestamp
+        self.changes_since_snapshot = 0
+
+    def _replay(self, timestamp) -> tuple:
+        """Return the state as of `timestamp` (the latest state when None)
+        along with the timestamp of the last change applied."""
+        state, last_timestamp, offset = {}, None, 0
+        for entry in reversed(self.snapshots):
+            if timestamp is None or entry["timestamp"] <= timestamp:
+                with open(self.snapshots_path, "rb") as sfile:
+                    sfile.seek(entry["position"])
+                    state = json.loads(sfile.readline())["state"]
+                last_timestamp, offset = entry["timestamp"], entry["offset"]
+                break
+        with open(self.changes_path, "rb") as cfile:
+            cfile.seek(offset)
+            for line in cfile:
+                change = json.loads(line)
+                if timestamp is not None and change["timestamp"] > timestamp:
+                    break
+                apply_change(state, change)
+                last_timestamp = change["timestamp"]
+        return state, last_timestamp
+
+    def state_as_of(self, timestamp) -> dict:
+        """Return the modules of the student as they were at `timestamp`,
+        including the changes recorded at that exact time."""
+        return self._replay(get_timestamp(timestamp))[0]
+
+    def iter_changes(self, module_name: str = None, since=None, until=None):
+        """Yield the changes recorded between `since` and `until`
+        (inclusive, both optional), only for `module_name` if given."""
+        since = None if since is None else get_timestamp(since)
+        until = None if until is None else get_timestamp(until)
+        with open(self.changes_path, encoding="utf-8") as cfile:
+            for line in cfile:
+                change = json.loads(line)
+                if until is not None and change["timestamp"] > until:
+                    break
+                if since is not None and change["timestamp"] < since:
+                    continue
+                if module_name is None or change["module"] == module_name:
+                    yield change
+
+    def load_config(self, timestamp=None) -> Config:
+        """Return a verified `Config` containing the modules of the student
+        as of `timestamp` (the latest state when None)."""
+        config = Config()
+        if timestamp is None:
+            config.path = f"{self.directory}@{self.last_timestamp}"
+            config.data = copy.deepcopy(self.state)
+        else:
+            timestamp = get_timestamp(timestamp)
+            config.path = f"{self.directory}@{timestamp}"
+            config.data = self.state_as_of(timestamp)
+        config.verify()
+        return config
+
+
+def apply_change(state: dict, change: dict) -> None:
+    """Apply one change of the log to a state, in place."""
+    if not change.get("removed"):
+        state.setdefault(change["module"], {})[change["field"]] = change[
+            "value"
+        ]
+    elif change["field"] is None:
+        state.pop(change["module"], None)
+    else:
+        state.get(change["module"], {}).pop(change["field"], None)
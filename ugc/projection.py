@@ -0,0 +1,304 @@
+"""
+Project the outcome of the modules in progress, either by simulating the
+scores that are still unknown or by trying out hypothetical scores.
+"""
+# Standard library imports
+from concurrent.futures import ProcessPoolExecutor
+
+# Third-party library imports
+import numpy as np
+
+# Local imports
+from ugc.grades import Grades
+from ugc.utils import cohort_helpers, grades_helpers
+
+# Used when no distribution is given: centered on the score already known
+# for the module (e.g. the midterm score when the final is missing)
+DEFAULT_DISTRIBUTION = {"kind": "normal", "std": 10}
+
+
+def get_projection_inputs(grades: Grades) -> dict:
+    """Return the arrays describing the modules in progress of a student
+    (NaN where a score is unknown) along with the weighted totals of the
+    modules that are done.
+
+    `final_slope` and `final_intercept` are the coefficients used by
+    `Grades.final_score_predictor` to predict a missing final score from
+    the midterm score (NaN when it can't), see `get_final_scores`."""
+    finished = grades.get_list_of_finished_modules()
+    predictor = grades.final_score_predictor
+    columns = {
+        key: []
+        for key in (
+            "module_name",
+            "midterm_score",
+            "midterm_weight",
+            "final_score",
+            "final_weight",
+            "weight",
+            "final_slope",
+            "final_intercept",
+        )
+    }
+    for module in grades.get_list_of_modules_in_progress():
+        module_name = list(module.keys())[0]
+        values = grades.data[module_name]
+        columns["module_name"].append(module_name)
+        for key in ("midterm_score", "final_score"):
+            value = values.get(key)
+            columns[key].append(np.nan if value is None else value)
+        coefficients = None
+        if predictor is not None and values.get("midterm_weight") is not None:
+            coefficients = predictor.coefficients(module_name)
+        slope, intercept = (
+            (np.nan, np.nan) if coefficients is None else coefficients
+        )
+        columns["final_slope"].append(slope)
+        columns["final_intercept"].append(intercept)
+        for key in ("midterm_weight", "final_weight"):
+            columns[key].append(values.get(key) or 0)
+        if coefficients is not None and values.get("final_weight") is None:
+            # Like `grades_helpers.get_predicted_module_score`
+            columns["final_weight"][-1] = 100 - values["midterm_weight"]
+        columns["weight"].append(
+            grades_helpers.get_total_weight_modules_in_progress(
+                [module], grades.degree_rules
+            )
+        )
+    inputs = {
+        key: np.array(values, dtype=np.float64)
+        for key, values in columns.items()
+        if key != "module_name"
+    }
+    inputs["module_name"] = columns["module_name"]
+    inputs["total_score"] = grades_helpers.get_total_score_modules_finished(
+        finished, grades.degree_rules
+    )
+    inputs["total_weight"] = grades_helpers.get_total_weight_modules_finished(
+        finished, grades.degree_rules
+    )
+    return inputs
+
+
+def get_final_scores(inputs: dict, midterm_score, final_score) -> np.ndarray:
+    """Return `final_score` where missing (NaN) final scores are replaced
+    by those predicted from `midterm_score`, if any. Both can have leading
+    dimensions in addition to the modules of `inputs`."""
+    predicted = np.clip(
+        inputs["final_slope"] * midterm_score + inputs["final_intercept"],
+        0,
+        100,
+    )
+    return np.where(np.isnan(final_score), predicted, final_score)
+
+
+def sample_scores(distribution: dict, center, size: tuple, rng) -> np.ndarray:
+    """Draw scores of shape `size` from a distribution, clipped to [0, 100].
+
+    `distribution` is a dict with a `kind` and its parameters:
+
+    - `normal`: `mean` (defaults to `center`) and `std` (defaults to 10).
+    - `uniform`: `low` (defaults to 0) and `high` (defaults to 100).
+    - `triangular`: `low`, `mode` (defaults to `center`) and `high`."""
+    kind = distribution.get("kind", "normal")
+    low = distribution.get("low", 0)
+    high = distribution.get("high", 100)
+    if kind == "normal":
+        scores = rng.normal(
+            distribution.get("mean", center), distribution.get("std", 10), size
+        )
+    elif kind == "uniform":
+        scores = rng.uniform(low, high, size)
+    elif kind == "triangular":
+        mode = np.clip(distribution.get("mode", center), low, high)
+        scores = rng.triangular(low, mode, high, size)
+    else:
+        raise ValueError(f"Unknown distribution: {kind}")
+    return np.clip(scores, 0, 100)
+
+
+def simulate_weighted_averages(
+    inputs: dict, samples: int, distribution: dict, rng
+) -> np.ndarray:
+    """Return `samples` simulated values of the weighted average including
+    the modules in progress, each unknown score being drawn independently.
+    A missing final score is centered on the one predicted, if any."""
+    predicted = get_final_scores(
+        inputs, inputs["midterm_score"], inputs["final_score"]
+    )
+    centers = {
+        "midterm_score": inputs["final_score"],
+        "final_score": np.where(
+            np.isnan(predicted), inputs["midterm_score"], predicted
+        ),
+    }
+    scores = {}
+    for key in ("midterm_score", "final_score"):
+        scores[key] = np.tile(inputs[key], (samples, 1))
+        missing = np.isnan(inputs[key])
+        if missing.any():
+            scores[key][:, missing] = sample_scores(
+                distribution,
+                centers[key][missing],
+                (samples, int(missing.sum())),
+                rng,
+            )
+    module_scores = cohort_helpers.get_module_scores(
+        scores["midterm_score"],
+        inputs["midterm_weight"],
+        scores["final_score"],
+        inputs["final_weight"],
+    )
+    total_weight = inputs["total_weight"] + inputs["weight"].sum()
+    if not total_weight:
+        return np.zeros(samples)
+    total_score = inputs["total_score"] + module_scores @ inputs["weight"]
+    return np.round(total_score / total_weight, 2)
+
+
+def project_classification(
+    grades: Grades,
+    samples: int = 10_000,
+    distribution: dict = None,
+    seed=None,
+) -> dict:
+    """Simulate `samples` outcomes of the modules in progress and return the
+    distribution of the resulting weighted average along with the
+    probability of each classification. Only the modules done and in
+    progress are considered, like in `Grades.weighted_average_in_progress`.
+
+    The same `seed` always gives the same projection."""
+    rng = np.random.default_rng(seed)
+    averages = simulate_weighted_averages(
+        get_projection_inputs(grades),
+        samples,
+        DEFAULT_DISTRIBUTION if distribution is None else distribution,
+        rng,
+    )
+    classifications = cohort_helpers.get_classifications(averages)
+    names = [*grades_helpers.CLASSIFICATION_BOUNDARIES, "Fail"]
+    p5, p50, p95 = np.percentile(averages, [5, 50, 95])
+    return {
+        "samples": samples,
+        "weighted_average": {
+            "mean": float(averages.mean()),
+            "std": float(averages.std()),
+            "p5": float(p5),
+            "p50": float(p50),
+            "p95": float(p95),
+        },
+        "classifications": {
+            name: float(np.mean(classifications == name)) for name in names
+        },
+    }
+
+
+def evaluate_what_if_grid(grades: Grades, scenarios: dict) -> dict:
+    """Evaluate the weighted average including the modules in progress and
+    the classification for every combination of hypothetical scores.
+
+    `scenarios` maps the name of a module in progress to the values to try
+    for its `midterm_score` and/or `final_score`, e.g.
+    `{"Databases Networks and the Web": {"final_score": range(40, 101, 5)}}`.
+    Scores that are not given keep their current value, or the one
+    predicted by `Grades.final_score_predictor` for a missing final score.
+
+    Return the `axes` of the grid as a list of tuples `(module_name, field,
+    values)` along with the arrays `weighted_average` and `classification`,
+    which have one dimension per axis."""
+    inputs = get_projection_inputs(grades)
+    axes = []
+    for module_name, fields in scenarios.items():
+        if module_name not in inputs["module_name"]:
+            raise ValueError(f"Module '{module_name}' is not in progress.")
+        for field, values in fields.items():
+            if field not in ("midterm_score", "final_score"):
+                raise ValueError(f"Cannot try values for '{field}'.")
+            axes.append(
+                (module_name, field, np.asarray(values, dtype=np.float64))
+            )
+
+    grids = np.meshgrid(*(values for *_, values in axes), indexing="ij")
+    shape = grids[0].shape if grids else ()
+    scores = {
+        field: np.broadcast_to(
+            inputs[field], shape + inputs[field].shape
+        ).copy()
+        for field in ("midterm_score", "final_score")
+    }
+    for (module_name, field, _), grid in zip(axes, grids):
+        index = inputs["module_name"].index(module_name)
+        scores[field][..., index] = grid
+    scores["final_score"] = get_final_scores(
+        inputs, scores["midterm_score"], scores["final_score"]
+    )
+
+    module_scores = cohort_helpers.get_scores_of_modules_in_progress(
+        scores["midterm_score"],
+        inputs["midterm_weight"],
+        scores["final_score"],
+        inputs["final_weight"],
+    )
+    total_weight = inputs["total_weight"] + inputs["weight"].sum()
+    total_score = inputs["total_score"] + module_scores @ inputs["weight"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        averages = np.where(
+            total_weight > 0, np.round(total_score / total_weight, 2), 0
+        )
+    return {
+        "axes": axes,
+        "weighted_average": averages,
+        "classification": cohort_helpers.get_classifications(averages),
+    }
+
+
+def get_what_if_rows(grid: dict) -> list:
+    """Flatten the output of `evaluate_what_if_grid` into a list of dicts,
+    one per combination of scores, ready to be turned into a table or a
+    heatmap. Hypothetical scores are keyed by `"<module name> (<field>)"`."""
+    columns = [
+        f"{module_name} ({field})" for module_name, field, _ in grid["axes"]
+    ]
+    rows = []
+    for index in np.ndindex(grid["weighted_average"].shape):
+        row = {
+            column: float(values[i])
+            for column, (*_, values), i in zip(columns, grid["axes"], index)
+        }
+        row["weighted_average"] = float(grid["weighted_average"][index])
+        row["classification"] = grid["classification"][index]
+        rows.append(row)
+    return rows
+
+
+def _project_student(args: tuple) -> dict:
+    path, samples, distribution, seed = args
+    return project_classification(
+        Grades(config_path=path), samples, distribution, seed
+    )
+
+
+def project_cohort(
+    cohort,
+    samples: int = 10_000,
+    distribution: dict = None,
+    seed=None,
+    processes: int = None,
+) -> dict:
+    """Run `project_classification` for each student of a `Cohort` and
+    return the projections by student ID.
+
+    Each student gets its own random stream derived from `seed`, so results
+    are the same whether they are computed in a pool of `processes` worker
+    processes or in this process (the default)."""
+    seeds = np.random.SeedSequence(seed).spawn(len(cohort))
+    tasks = [
+        (path, samples, distribution, student_seed)
+        for path, student_seed in zip(cohort.paths.values(), seeds)
+    ]
+    if processes is None or processes <= 1:
+        projections = map(_project_student, tasks)
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            projections = list(executor.map(_project_student, tasks))
+    return dict(zip(cohort.paths, projections))
@@ -0,0 +1,149 @@
+"""
+Predict the final score of a module in progress from its midterm score,
+using the results of the students who already completed that module.
+"""
+# Standard library imports
+from pathlib import Path
+import hashlib
+import json
+
+# Sufficient statistics kept per module, in this order: number of results,
+# sum of midterm scores, sum of final scores, sum of squared midterm scores
+# and sum of the products of midterm and final scores
+STATISTICS = ("count", "sum_x", "sum_y", "sum_xx", "sum_xy")
+
+
+class FinalScorePredictor:
+    """Least-squares line `final = slope * midterm + intercept`, fitted
+    separately for each module.
+
+    Only the sufficient statistics of each module are kept, so new results
+    can be added (or removed) one at a time and predictors fitted on
+    separate batches of students can be merged, without ever going through
+    the whole history again.
+
+    A module needs at least `min_count` results before predictions are
+    made for it. When all its midterm scores are the same, the average
+    final score is predicted."""
+
+    def __init__(self, min_count: int = 2) -> None:
+        self.min_count = min_count
+        self.statistics = {}
+
+    def __len__(self) -> int:
+        return len(self.statistics)
+
+    def update(
+        self, module_name: str, midterm_score: float, final_score: float
+    ) -> None:
+        """Add the result of one student in a module."""
+        self._patch(module_name, midterm_score, final_score, sign=1)
+
+    def remove(
+        self, module_name: str, midterm_score: float, final_score: float
+    ) -> None:
+        """Remove a result that was added with `update`, e.g. before adding
+        its corrected version. Raise a `ValueError` if no result was added
+        for that module."""
+        if module_name not in self.statistics:
+            raise ValueError(f"No result to remove for module {module_name}.")
+        self._patch(module_name, midterm_score, final_score, sign=-1)
+        if not self.statistics[module_name][0]:
+            del self.statistics[module_name]
+
+    def _patch(self, module_name, midterm_score, final_score, sign) -> None:
+        statistics = self.statistics.setdefault(module_name, [0] * 5)
+        x, y = midterm_score, final_score
+        for index, value in enumerate((1, x, y, x * x, x * y)):
+            statistics[index] += sign * value
+
+    def update_from_grades(self, grades) -> int:
+        """Add the results of every finished module of a student for which
+        both the midterm and the final scores are known. Return the number of
+        results added."""
+        added = 0
+        for module in grades.get_list_of_finished_modules():
+            for module_name, values in module.items():
+                midterm = values.get("midterm_score")
+                final = values.get("final_score")
+                if midterm is None or final is None:
+                    continue
+                self.update(module_name, midterm, final)
+                added += 1
+        return added
+
+    def update_from_cohort(self, cohort) -> int:
+        """Add the results of every student of a `Cohort`. Return the
+        number of results added."""
+        return sum(
+            self.update_from_grades(grades)
+            for _, grades in cohort.iter_grades()
+        )
+
+    def merge(self, other: "FinalScorePredictor") -> None:
+        """Add the results seen by another predictor to this one."""
+        for module_name, statistics in other.statistics.items():
+            own = self.statistics.setdefault(module_name, [0] * 5)
+            for index, value in enumerate(statistics):
+                own[index] += value
+
+    def coefficients(self, module_name: str) -> tuple:
+        """Return `(slope, intercept)` for a module, or None if there are
+        not enough results for it."""
+        statistics = self.statistics.get(module_name)
+        if statistics is None or statistics[0] < self.min_count:
+            return None
+        count, sum_x, sum_y, sum_xx, sum_xy = statistics
+        variance = count * sum_xx - sum_x**2
+        if variance <= 0:
+            return 0, sum_y / count
+        slope = (count * sum_xy - sum_x * sum_y) / variance
+        return slope, (sum_y - slope * sum_x) / count
+
+    def predict(self, module_name: str, midterm_score: float) -> float:
+        """Return the final score predicted for a midterm score, kept
+        within [0, 100], or None if the module can't be predicted yet."""
+        coefficients = self.coefficients(module_name)
+        if coefficients is None:
+            return None
+        slope, intercept = coefficients
+        return min(max(slope * midterm_score + intercept, 0), 100)
+
+    def fingerprint(self) -> str:
+        """Return a digest identifying the results seen so far."""
+        return hashlib.blake2b(
+            repr(sorted(self.to_dict()["modules"].items())).encode()
+            + repr(self.min_count).encode(),
+            digest_size=8,
+        ).hexdigest()
+
+    def to_dict(self) -> dict:
+        return {
+            "min_count": self.min_count,
+            "modules": {
+                module_name: dict(zip(STATISTICS, statistics))
+                for module_name, statistics in self.statistics.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "FinalScorePredictor":
+        predictor = cls(data["min_count"])
+        predictor.statistics = {
+            module_name: [statistics[key] for key in STATISTICS]
+            for module_name, statistics in data["modules"].items()
+        }
+        return predictor
+
+    def save(self, path) -> None:
+        with open(path, "w", encoding="utf-8") as pfile:
+            json.dump(self.to_dict(), pfile)
+
+    @classmethod
+    def load(cls, path) -> "FinalScorePredictor":
+        """Load a predictor saved with `save`, or start a new, empty one if
+        the file does not exist yet."""
+        if not Path(path).exists():
+            return cls()
+        with open(path, encoding="utf-8") as pfile:
+            return cls.from_dict(json.load(pfile))
@@ -0,0 +1,99 @@
+"""
+Load the rules of a degree: how modules are weighted and how many credits
+they are worth.
+"""
+# Standard library imports
+from functools import lru_cache
+from pathlib import Path
+import hashlib
+import json
+
+DEFAULT_RULES_PATH = Path(__file__).parent / "degree-rules.json"
+
+
+class DegreeRules:
+    """Rules of a degree compiled into lookup tables.
+
+    `definition` is a dict as found in `degree-rules.json`:
+
+    - `total_credits`: credits needed to complete the degree.
+    - `level_weights`: weight of the modules of each level in the weighted
+      average.
+    - `module_credits`: credits of a module unless said otherwise.
+    - `modules`: rules specific to some modules (matched regardless of
+      case), i.e. their `credits` and a `multiplier` applied to their
+      weight.
+
+    The rules of a module are looked up by exact name, so they are only
+    matched against the lowercase names of `modules` the first time a name
+    is seen."""
+
+    def __init__(self, definition: dict) -> None:
+        self.name = definition.get("name", "")
+        self._fingerprint = hashlib.blake2b(
+            json.dumps(definition, sort_keys=True).encode(), digest_size=8
+        ).hexdigest()
+        self.total_credits = definition["total_credits"]
+        self.level_weights = {
+            int(level): weight
+            for level, weight in definition["level_weights"].items()
+        }
+        self.module_credits = definition["module_credits"]
+        # Lowercase module name -> (multiplier, credits or None)
+        self.special_modules = {
+            name.lower(): (rules.get("multiplier", 1), rules.get("credits"))
+            for name, rules in definition.get("modules", {}).items()
+        }
+        # Module name -> (multiplier, credits), filled as names are seen
+        self._modules = {}
+
+    @classmethod
+    def from_file(cls, path) -> "DegreeRules":
+        with open(path, encoding="UTF-8") as rfile:
+            return cls(json.load(rfile))
+
+    def fingerprint(self) -> str:
+        """Return a digest identifying the rules in fingerprints: two sets
+        of rules with the same definition give the same results."""
+        return self._fingerprint
+
+    def _get_module(self, module_name: str) -> tuple:
+        try:
+            return self._modules[module_name]
+        except KeyError:
+            multiplier, credits = self.special_modules.get(
+                module_name.lower(), (1, None)
+            )
+            rules = (
+                multiplier,
+                self.module_credits if credits is None else credits,
+            )
+            self._modules[module_name] = rules
+            return rules
+
+    def multiplier(self, module_name: str) -> int:
+        """Return the factor applied to the weight of a module."""
+        return self._get_module(module_name)[0]
+
+    def credits(self, module_name: str) -> int:
+        """Return the number of credits a module is worth."""
+        return self._get_module(module_name)[1]
+
+    def level_weight(self, level: int) -> int:
+        """Return the weight of the modules of a level, 0 for a level that
+        is not part of the degree."""
+        if not isinstance(level, int):
+            return 0
+        return self.level_weights.get(level, 0)
+
+    def weight(self, module_name: str, level: int) -> int:
+        """Return the weight of a module of a given level in the weighted
+        average."""
+        return self.level_weight(level) * self._get_module(module_name)[0]
+
+
+@lru_cache(maxsize=None)
+def get_default_rules() -> DegreeRules:
+    """Return the rules of the degree found in `degree-rules.json`, loaded
+    only once."""
+    return DegreeRules.from_file(DEFAULT_RULES_PATH)
@@ -0,0 +1,201 @@
+"""
+Store the grades of many students in a local SQLite database.
+"""
+# Standard library imports
+import sqlite3
+
+# Local imports
+from ugc.config import Config
+from ugc.rules import DegreeRules, get_default_rules
+from ugc.utils import mathtools
+
+MODULE_FIELDS = (
+    "level",
+    "completion_date",
+    "final_score",
+    "final_weight",
+    "midterm_score",
+    "midterm_weight",
+    "module_score",
+)
+
+# Scores are NUMERIC so that integers come back as integers, like they were
+# written in the config file. The primary key doubles as the index on
+# `student_id` used for point lookups.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS modules (
+    student_id TEXT NOT NULL,
+    module_name TEXT NOT NULL,
+    level INTEGER,
+    completion_date TEXT,
+    final_score NUMERIC,
+    final_weight INTEGER,
+    midterm_score NUMERIC,
+    midterm_weight INTEGER,
+    module_score NUMERIC,
+    PRIMARY KEY (student_id, module_name)
+);
+CREATE INDEX IF NOT EXISTS idx_modules_level ON modules (level);
+CREATE INDEX IF NOT EXISTS idx_modules_module_name ON modules (module_name);
+CREATE INDEX IF NOT EXISTS idx_modules_completion_date
+    ON modules (completion_date);
+"""
+
+
+# Modules counted in the averages of finished modules
+FINISHED_SQL = "module_score IS NOT NULL AND module_score BETWEEN 0 AND 100"
+
+
+def get_weight_sql(rules: DegreeRules) -> str:
+    """Return an SQL expression giving the weight of a module in the
+    weighted average, following the degree `rules` like
+    `Grades.weighted_average`."""
+    levels = " ".join(
+        f"WHEN {int(level)} THEN {weight}"
+        for level, weight in rules.level_weights.items()
+    )
+    multipliers = " ".join(
+        f"WHEN {_quote(name)} THEN {multiplier}"
+        for name, (multiplier, _) in rules.special_modules.items()
+    )
+    weight_sql = f"(CASE level {levels} ELSE 0 END)"
+    if multipliers:
+        weight_sql += f" * (CASE lower(module_name) {multipliers} ELSE 1 END)"
+    return f"({weight_sql})"
+
+
+def _quote(text: str) -> str:
+    return "'" + text.replace("'", "''") + "'"
+
+
+class GradeStore:
+    """Local SQLite database holding the modules of each student, indexed by
+    student ID, level, module name and completion date.
+
+    Use `":memory:"` as the path for a throwaway database. Weighted averages
+    follow the degree `rules` (those of `degree-rules.json` by default)."""
+
+    def __init__(self, path=":memory:", rules: DegreeRules = None) -> None:
+        self.path = str(path)
+        self.weight_sql = get_weight_sql(
+            get_default_rules() if rules is None else rules
+        )
+        self.connection = sqlite3.connect(self.path)
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self) -> "GradeStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def import_config(self, student_id: str, config: Config) -> int:
+        """Replace the modules of a student with those found in `config`,
+        loading it first if needed. Return the number of modules stored."""
+        data = config.data if config.data else config.load()
+        rows = [
+            (student_id, module, *(values.get(f) for f in MODULE_FIELDS))
+            for module, values in data.items()
+        ]
+        with self.connection:
+            self.connection.execute(
+                "DELETE FROM modules WHERE student_id = ?", (student_id,)
+            )
+            self.connection.executemany(
+                "INSERT INTO modules VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+        return len(rows)
+
+    def import_cohort(self, cohort) -> int:
+        """Import the config file of every student of a `Cohort`. Return the
+        number of students imported."""
+        for student_id, path in cohort.paths.items():
+            self.import_config(student_id, Config(config_path=str(path)))
+        return len(cohort)
+
+    def student_ids(self) -> list:
+        cursor = self.connection.execute(
+            "SELECT DISTINCT student_id FROM modules ORDER BY student_id"
+        )
+        return [student_id for (student_id,) in cursor]
+
+    def get_module(self, student_id: str, module_name: str) -> dict:
+        """Return the values of a single module of a student, or None if
+        it's not in the store."""
+        row = self.connection.execute(
+            f"SELECT {', '.join(MODULE_FIELDS)} FROM modules "
+            "WHERE student_id = ? AND module_name = ?",
+            (student_id, module_name),
+        ).fetchone()
+        return None if row is None else dict(zip(MODULE_FIELDS, row))
+
+    def load_config(self, student_id: str) -> Config:
+        """Return a verified `Config` containing the modules of a student,
+        as if they had been loaded from a config file."""
+        cursor = self.connection.execute(
+            f"SELECT module_name, {', '.join(MODULE_FIELDS)} FROM modules "
+            "WHERE student_id = ? ORDER BY rowid",
+            (student_id,),
+        )
+        config = Config()
+        config.path = f"{self.path}#{student_id}"
+        config.data = {
+            module: dict(zip(MODULE_FIELDS, values))
+            for module, *values in cursor
+        }
+        config.verify()
+        return config
+
+    def weighted_averages(self, **filters) -> dict:
+        """Return the weighted average of the finished modules of each
+        student, computed by SQLite. See `_where` for the filters."""
+        where, params = self._where(filters)
+        cursor = self.connection.execute(
+            f"SELECT student_id, SUM(module_score * {self.weight_sql}), "
+            f"SUM({self.weight_sql}) FROM modules WHERE {FINISHED_SQL}{where} "
+            "GROUP BY student_id ORDER BY student_id",
+            params,
+        )
+        return {
+            student_id: round(total_score / total_weight, 2)
+            for student_id, total_score, total_weight in cursor
+            if total_weight
+        }
+
+    def unweighted_averages(self, **filters) -> dict:
+        """Return the unweighted average of the finished modules of each
+        student, computed by SQLite. See `_where` for the filters."""
+        where, params = self._where(filters)
+        cursor = self.connection.execute(
+            "SELECT student_id, AVG(module_score) FROM modules "
+            f"WHERE {FINISHED_SQL}{where} "
+            "GROUP BY student_id ORDER BY student_id",
+            params,
+        )
+        return {
+            student_id: mathtools.round_half_up(avg, 2)
+            for student_id, avg in cursor
+        }
+
+    @staticmethod
+    def _where(filters: dict) -> tuple:
+        """Turn keyword filters into an SQL condition and its parameters.
+
+        Supported filters: `student_id`, `level`, `module_name`,
+        `completed_from` and `completed_to` (inclusive, as YYYY-MM)."""
+        columns = {
+            "student_id": "student_id = ?",
+            "level": "level = ?",
+            "module_name": "module_name = ?",
+            "completed_from": "completion_date >= ?",
+            "completed_to": "completion_date <= ?",
+        }
+        unknown = set(filters) - set(columns)
+        if unknown:
+            raise ValueError(f"Unknown filters: {', '.join(sorted(unknown))}")
+        conditions = [columns[key] for key in filters]
+        where = "".join(f" AND {condition}" for condition in conditions)
+        return where, tuple(filters.values())
@@ -0,0 +1,103 @@
+"""
+Follow the averages of the modules done over time.
+"""
+# Standard library imports
+from bisect import bisect_right
+
+# Local imports
+from ugc.utils import mathtools
+
+
+class Timeline:
+    """Modules done, sorted once by completion date, along with the prefix
+    sums of their weighted scores, weights and scores.
+
+    Building a timeline takes O(n) after sorting. The average of any
+    semester or the cumulative average as of the end of a semester is then
+    a difference of prefix sums, in O(1). Averages as of an arbitrary month
+    also need a binary search over the semesters.
+
+    RPLed modules and modules without a completion date are left out."""
+
+    def __init__(self, grades) -> None:
+        rules = grades.get_degree_rules()
+        modules = []
+        for module in grades.get_list_of_finished_modules():
+            for name, values in module.items():
+                score = values["module_score"]
+                date = values.get("completion_date")
+                if score < 0 or not date:
+                    continue
+                weight = rules.weight(name, values.get("level"))
+                modules.append((date, name, score, weight))
+        modules.sort()
+        self.modules = modules
+
+        # One entry per semester (YYYY-MM) with the position in the prefix
+        # sums right after its last module
+        self.semesters = []
+        self._ends = []
+        self._weighted_scores = [0]
+        self._weights = [0]
+        self._scores = [0]
+        for date, _, score, weight in modules:
+            self._weighted_scores.append(
+                self._weighted_scores[-1] + score * weight
+            )
+            self._weights.append(self._weights[-1] + weight)
+            self._scores.append(self._scores[-1] + score)
+            if self.semesters and self.semesters[-1] == date:
+                self._ends[-1] += 1
+            else:
+                self.semesters.append(date)
+                self._ends.append(len(self._scores) - 1)
+
+    def __len__(self) -> int:
+        return len(self.modules)
+
+    def semester_averages(self) -> list:
+        """Return a dict per semester with its `date` (YYYY-MM) and the
+        weighted and unweighted averages of the modules completed during
+        that semester only, unrounded."""
+        averages = []
+        start = 0
+        for date, end in zip(self.semesters, self._ends):
+            weight = self._weights[end] - self._weights[start]
+            weighted = (
+                self._weighted_scores[end] - self._weighted_scores[start]
+            )
+            unweighted = self._scores[end] - self._scores[start]
+            averages.append(
+                {
+                    "date": date,
+                    "weighted_average": weighted / weight if weight else 0,
+                    "unweighted_average": unweighted / (end - start),
+                }
+            )
+            start = end
+        return averages
+
+    def _end_as_of(self, month: str) -> int:
+        index = bisect_right(self.semesters, month)
+        return self._ends[index - 1] if index else 0
+
+    def weighted_average_as_of(self, month: str) -> float:
+        """Return the weighted average of the modules completed up to and
+        including `month` (YYYY-MM), rounded like `Grades.weighted_average`."""
+        end = self._end_as_of(month)
+        weight = self._weights[end]
+        return round(self._weighted_scores[end] / weight, 2) if weight else 0
+
+    def unweighted_average_as_of(self, month: str) -> float:
+        """Return the unweighted average of the modules completed up to and
+        including `month` (YYYY-MM), rounded like
+        `Grades.unweighted_average`."""
+        end = self._end_as_of(month)
+        if not end:
+            return 0
+        return mathtools.round_half_up(self._scores[end] / end, 2)
+
+    def num_modules_as_of(self, month: str) -> int:
+        """Return the number of modules completed up to and including
+        `month` (YYYY-MM)."""
+        return self._end_as_of(month)
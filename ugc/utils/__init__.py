@@ -1,3 +1,21 @@
+# Standard library imports
+from contextlib import contextmanager
+
+# Third-party library imports
 from rich.console import Console
 
 console = Console()
+
+
+@contextmanager
+def use_console(**options):
+    """Render the output of `console` as a `Console` created with `options`
+    would (e.g. at another width) until the end of the block. Modules keep
+    using the object they imported."""
+    previous = dict(vars(console))
+    vars(console).update(vars(Console(**options)))
+    try:
+        yield console
+    finally:
+        vars(console).clear()
+        vars(console).update(previous)
@@ -0,0 +1,234 @@
+"""
+Vectorized counterparts of `grades_helpers` to compute statistics over the
+students of a cohort or over many simulated outcomes at once.
+"""
+# Third-party library imports
+import numpy as np
+
+# Local imports
+from ugc.utils import grades_helpers
+
+# Scores are shifted by this value before being accumulated: it doesn't
+# change the correlation but keeps the sums small enough to avoid losing
+# precision on large cohorts
+SCORE_SHIFT = 50
+
+
+def get_module_scores(
+    midterm_score, midterm_weight, final_score, final_weight
+) -> np.ndarray:
+    """Vectorized `grades_helpers.get_module_score` for modules whose
+    midterm and final scores are both known."""
+    module_scores = (
+        midterm_score * midterm_weight / 100 + final_score * final_weight / 100
+    )
+    return np.where(
+        (midterm_score < 35) | (final_score < 35), 39, module_scores
+    )
+
+
+def get_scores_of_modules_in_progress(
+    midterm_score, midterm_weight, final_score, final_weight
+) -> np.ndarray:
+    """Vectorized `grades_helpers.get_score_of_module_in_progress`, where a
+    missing score is NaN: the module score when both scores are known,
+    otherwise the one score that is known."""
+    module_scores = get_module_scores(
+        midterm_score, midterm_weight, final_score, final_weight
+    )
+    return np.where(
+        np.isnan(midterm_score),
+        final_score,
+        np.where(np.isnan(final_score), midterm_score, module_scores),
+    )
+
+
+def get_classifications(averages) -> np.ndarray:
+    """Vectorized `grades_helpers.get_classification`."""
+    boundaries = sorted(
+        grades_helpers.CLASSIFICATION_BOUNDARIES.items(),
+        key=lambda item: item[1],
+    )
+    names = np.array(["Fail", *(name for name, _ in boundaries)], dtype=object)
+    indices = np.searchsorted(
+        [boundary for _, boundary in boundaries], averages, side="right"
+    )
+    # Keep the shape of `averages`, including for a single value
+    return names[np.atleast_1d(indices)].reshape(np.shape(averages))
+
+
+def get_marks_to_next_step(averages, steps) -> np.ndarray:
+    """Return how many marks each of `averages` is from the lowest of
+    `steps` above it, or NaN if it already reached the highest step."""
+    steps = np.sort(np.asarray(steps, dtype=np.float64))
+    indices = np.searchsorted(steps, averages, side="right")
+    next_steps = np.append(steps, np.nan)[indices]
+    return next_steps - averages
+
+
+def get_score_matrix(grades_list: list, modules: list) -> np.ndarray:
+    """Return a (students × modules) matrix of module scores where modules
+    that were not taken, are not finished or were RPLed are set to NaN."""
+    matrix = np.full((len(grades_list), len(modules)), np.nan)
+    for row, grades in enumerate(grades_list):
+        for column, module in enumerate(modules):
+            score = grades.data.get(module, {}).get("module_score")
+            if score is not None and score >= 0:
+                matrix[row, column] = score
+    return matrix
+
+
+def get_in_progress_columns(grades_list: list) -> dict:
+    """Return the modules in progress of a list of students as columns.
+
+    Row `i` describes one module in progress of the student at index
+    `student[i]` of `grades_list`: its name, midterm score (NaN if missing),
+    weights, weight in the weighted average (`weight`) and current weighted
+    score (`contribution`). The totals used by
+    `Grades.weighted_average_in_progress` are given per student in
+    `total_score` and `total_weight`."""
+    columns = {
+        key: []
+        for key in (
+            "student",
+            "module_name",
+            "midterm_score",
+            "midterm_weight",
+            "final_weight",
+            "weight",
+            "contribution",
+        )
+    }
+    total_score = np.zeros(len(grades_list))
+    total_weight = np.zeros(len(grades_list))
+    for index, grades in enumerate(grades_list):
+        finished = grades.get_list_of_finished_modules()
+        in_progress = grades.get_list_of_modules_in_progress()
+        rules = grades.degree_rules
+        predictor = grades.final_score_predictor
+        total_score[index] = grades_helpers.get_total_score_modules_finished(
+            finished, rules
+        ) + grades_helpers.get_weighted_total_score_modules_in_progress(
+            in_progress, predictor, rules
+        )
+        total_weight[index] = grades_helpers.get_total_weight_modules_finished(
+            finished, rules
+        ) + grades_helpers.get_total_weight_modules_in_progress(
+            in_progress, rules
+        )
+        for module in in_progress:
+            module_name = list(module.keys())[0]
+            values = grades.data[module_name]
+            columns["student"].append(index)
+            columns["module_name"].append(module_name)
+            for key in ("midterm_score", "midterm_weight", "final_weight"):
+                value = values.get(key)
+                columns[key].append(np.nan if value is None else value)
+            columns["weight"].append(
+                grades_helpers.get_total_weight_modules_in_progress(
+                    [module], rules
+                )
+            )
+            columns["contribution"].append(
+                grades_helpers.get_weighted_total_score_modules_in_progress(
+                    [module], predictor, rules
+                )
+            )
+
+    result = {
+        key: np.array(values, dtype=int if key == "student" else None)
+        for key, values in columns.items()
+    }
+    result["module_name"] = np.array(columns["module_name"], dtype=object)
+    result["total_score"] = total_score
+    result["total_weight"] = total_weight
+    return result
+
+
+def get_required_final_scores(
+    midterm_score, midterm_weight, final_weight, target
+) -> np.ndarray:
+    """Vectorized `grades_helpers.get_required_final_score`: NaN replaces
+    None where a target can't be reached."""
+    midterm_score = np.asarray(midterm_score, dtype=np.float64)
+    target = np.broadcast_to(
+        np.asarray(target, dtype=np.float64), midterm_score.shape
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        required = np.maximum(
+            (target - midterm_score * midterm_weight / 100)
+            * 100
+            / final_weight,
+            35,
+        )
+    unreachable = (
+        np.isnan(midterm_score)
+        | np.isnan(midterm_weight)
+        | ~(np.asarray(final_weight) > 0)
+        | (midterm_score < 35)
+        | (required > 100)
+    )
+    required = np.where(unreachable, np.nan, required)
+    return np.where(target <= 39, 0, required)
+
+
+def get_required_final_scores_for_average(
+    columns: dict, target_average: float
+) -> np.ndarray:
+    """Return the minimum final score needed in each module in progress
+    described by `columns` (see `get_in_progress_columns`) for its student
+    to get a weighted average of `target_average`, all the other modules
+    in progress counting for their current score."""
+    student = columns["student"]
+    weight = columns["weight"].astype(np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        target = (
+            target_average * columns["total_weight"][student]
+            - (columns["total_score"][student] - columns["contribution"])
+        ) / weight
+    required = get_required_final_scores(
+        columns["midterm_score"],
+        columns["midterm_weight"],
+        columns["final_weight"],
+        target,
+    )
+    return np.where(weight > 0, required, np.nan)
+
+
+class CorrelationAccumulator:
+    """Pearson correlation between the columns of a matrix that is fed one
+    chunk of rows at a time.
+
+    NaN values are masked out: the correlation between two columns only
+    uses the rows where both have a value (pairwise complete observations),
+    so memory use depends on the number of columns only."""
+
+    def __init__(self, num_columns: int) -> None:
+        shape = (num_columns, num_columns)
+        self.count = np.zeros(shape)
+        self.sum = np.zeros(shape)
+        self.sum_squares = np.zeros(shape)
+        self.sum_products = np.zeros(shape)
+
+    def update(self, matrix: np.ndarray) -> None:
+        """Add a (rows × columns) chunk to the statistics."""
+        mask = (~np.isnan(matrix)).astype(np.float64)
+        values = np.where(mask > 0, matrix - SCORE_SHIFT, 0)
+        # Entry [i, j] only sums rows where both columns i and j are set
+        self.count += mask.T @ mask
+        self.sum += values.T @ mask
+        self.sum_squares += (values**2).T @ mask
+        self.sum_products += values.T @ values
+
+    def correlation(self, min_count: int = 2) -> np.ndarray:
+        """Return the (columns × columns) correlation matrix. Pairs with
+        fewer than `min_count` common rows or without any variance are set
+        to NaN."""
+        n = self.count
+        covariance = n * self.sum_products - self.sum * self.sum.T
+        variance = n * self.sum_squares - self.sum**2
+        denominator = np.sqrt(np.clip(variance * variance.T, 0, None))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            result = covariance / denominator
+        result[(n < min_count) | (denominator == 0)] = np.nan
+        return np.clip(result, -1, 1)
@@ -1,29 +1,87 @@
 # Standard library imports
 from datetime import datetime
 from pathlib import Path
+from typing import TYPE_CHECKING
 import calendar
+import collections.abc
+import itertools
 import json
 import shutil
 
 # Third-party library imports
+from rich import box
+from rich.cells import cell_len
+from rich.segment import Segment, Segments
 from rich.table import Table
-import pandas as pd
 
 # Local imports
+from ugc.cache import get_key
 from ugc.grades import Grades
 from ugc.utils import console, grades_helpers, mathtools
 
+# pandas takes a while to import: only do it in the functions that need it
+if TYPE_CHECKING:
+    import pandas as pd
+
 
 def get_module_score_rounded_up(module) -> float:
     module_score = grades_helpers.get_module_score(module)
     return mathtools.round_half_up(module_score)
 
 
-def there_are_no_modules_in_progress(grades) -> bool:
-    if grades.get_list_of_modules_in_progress():
-        return False
-    console.print("[blue]No modules in progress.")
-    return True
+def print_diff(result: dict) -> None:
+    """Print the result of `ugc.diff.diff_configs`."""
+    if not result["changes"]:
+        console.print("[green]No differences found.")
+        return
+
+    console.print("[blue]Changes:")
+    for change in result["changes"]:
+        console.print(
+            f"{change['module']} ({change['field']}): "
+            f"{change['old']} -> {change['new']}"
+        )
+
+    before, after, delta = result["before"], result["after"], result["delta"]
+    for column, label in (
+        ("weighted_average", "Weighted average"),
+        ("unweighted_average", "Unweighted average"),
+        ("total_credits", "Total credits"),
+    ):
+        console.print(
+            f"[green]{label}: {before[column]} -> {after[column]} "
+            f"({delta[column]:+})"
+        )
+    if before["classification"] != after["classification"]:
+        console.print(
+            f"[green]Classification: {before['classification']} -> "
+            f"{after['classification']}"
+        )
+    else:
+        console.print(
+            f"[green]Classification: {after['classification']} (unchanged)"
+        )
+
+
+def get_summary_done(grades) -> dict:
+    """Return the aggregates reported about the modules that are done, as
+    printed by `commands.summarize_done`."""
+    wavg = grades.weighted_average
+    uavg = grades.unweighted_average
+    total_credits = grades.total_credits
+    return {
+        "weighted_average": wavg,
+        "unweighted_average": uavg,
+        "weighted_ects": grades_helpers.get_ects_equivalent_score(wavg),
+        "unweighted_ects": grades_helpers.get_ects_equivalent_score(uavg),
+        "weighted_us": grades_helpers.get_us_letter_equivalent_score(wavg),
+        "unweighted_us": grades_helpers.get_us_letter_equivalent_score(uavg),
+        "weighted_class": grades_helpers.get_classification(wavg),
+        "weighted_gpa_us": grades_helpers.get_us_gpa(wavg),
+        "weighted_gpa_uk": grades_helpers.get_uk_gpa(wavg),
+        "credits_done": total_credits,
+        "percentage_done": grades.get_percentage_degree_done(total_credits),
+    }
 
 
 def print_modules_in_progress(pretty_printer, grades):
@@ -88,46 +146,284 @@ def get_template() -> dict:
         return json.load(template_file)
 
 
-def pprint_dataframe_done(dataframe: pd.DataFrame, title: str) -> None:
-    table = Table(
-        title=title,
-        row_styles=["dim", ""],
-        highlight=True,
+# Columns of the table printed by `summarize done`
+DONE_COLUMNS = (
+    ("Completion date", {"style": "blue", "no_wrap": True}),
+    ("Level", {"style": "magenta"}),
+    ("Module name", {"style": "cyan"}),
+    ("Score", {"justify": "right", "style": "dark_green"}),
+    ("ECTS", {"justify": "right", "style": "chartreuse4"}),
+    ("US", {"justify": "right", "style": "orange4"}),
+)
+
+# Rows of a table rendered at once by `pprint_table`, so that memory use
+# doesn't grow with the number of rows
+TABLE_CHUNK_ROWS = 1000
+
+# Name of the figure drawn by `commands.plot_modules`
+PLOT_FIGURE = "ugc-modules"
+
+# Keys of the records of modules done, one per column of `DONE_COLUMNS`
+DONE_KEYS = (
+    "completion_date",
+    "level",
+    "module_name",
+    "module_score",
+    "ECTS",
+    "US",
+)
+
+# Columns of the table printed by `summarize progress`: the scores are only
+# shown when at least one module in progress has one
+IN_PROGRESS_COLUMNS = (
+    ("Module name", "module_name", {"style": "blue", "no_wrap": True}),
+    ("Level", "level", {"style": "magenta"}),
+    ("Midterm", "midterm_score", {"style": "cyan"}),
+    ("Final", "final_score", {"style": "cyan"}),
+    ("ECTS", "ECTS", {"justify": "right", "style": "chartreuse4"}),
+    ("US", "US", {"justify": "right", "style": "orange4"}),
+)
+
+
+def paginate(rows, limit: int = None, offset: int = 0):
+    """Return an iterator over `rows` that skips the first `offset` rows and
+    stops after `limit` rows (never when None)."""
+    stop = None if limit is None else offset + limit
+    return itertools.islice(rows, offset, stop)
+
+
+def iter_chunks(rows, size: int):
+    """Yield lists of up to `size` rows until `rows` is exhausted."""
+    rows = iter(rows)
+    while chunk := list(itertools.islice(rows, size)):
+        yield chunk
+
+
+def pprint_table(
+    columns: list, rows, title: str, limit: int = None, offset: int = 0
+) -> None:
+    """Print rows of values as a table. `columns` is a list of tuples
+    `(header, options)` where `options` are passed to `Table.add_column`.
+    Missing values are left empty and RPLed scores (-1) show as N/A.
+
+    `rows` can be any iterable (e.g. a generator) and only `limit` rows
+    are printed after skipping `offset` rows. They are rendered
+    `TABLE_CHUNK_ROWS` at a time, so only one chunk is rendered at once.
+    Columns are as wide as needed by every row when `rows` is a sequence
+    (e.g. a list). Otherwise, only the first chunk is measured and longer
+    values of the following chunks are cut with an ellipsis. When the
+    output is not a terminal, rows are printed as tab-separated values
+    instead."""
+    chunks = iter_chunks(paginate(rows, limit, offset), TABLE_CHUNK_ROWS)
+    if not console.is_terminal:
+        # Lines are written as they are, without going through the markup,
+        # highlighting, wrapping and cropping of `console.print`
+        plain = {"crop": False, "soft_wrap": True}
+        header = "\t".join(header for header, _ in columns)
+        console.print(Segments([Segment(f"{title}\n{header}\n")]), **plain)
+        for chunk in chunks:
+            lines = "".join(
+                "\t".join(format_cell(value) for value in row) + "\n"
+                for row in chunk
+            )
+            console.print(Segments([Segment(lines)]), **plain)
+        return
+
+    first = next(chunks, [])
+    cells = [[format_cell(value) for value in row] for row in first]
+    following = next(chunks, None)
+    if following is None:
+        console.print(get_table(columns, cells, title=title))
+        return
+
+    # The chunks are printed as a single table without a border in between
+    if isinstance(rows, collections.abc.Sequence):
+        widths = get_widths(columns, paginate(rows, limit, offset))
+    else:
+        widths = get_widths(columns, first)
+    options = {"widths": widths, "box": box.SIMPLE_HEAVY, "show_edge": False}
+    console.print(get_table(columns, cells, title=title, **options))
+    for chunk in itertools.chain([following], chunks):
+        cells = [[format_cell(value) for value in row] for row in chunk]
+        console.print(get_table(columns, cells, show_header=False, **options))
+
+
+def get_widths(columns: list, rows) -> list:
+    """Return the width needed by each column of `pprint_table` to fit its
+    header and the formatted values of `rows`."""
+    widths = [cell_len(header) for header, _ in columns]
+    for row in rows:
+        widths = [
+            max(width, cell_len(format_cell(value)))
+            for width, value in zip(widths, row)
+        ]
+    return widths
+
+
+def get_table(columns: list, cells: list, widths: list = None, **kwargs):
+    """Return a `Table` of formatted `cells` (see `pprint_table`), with
+    columns of fixed `widths` if given, where longer cells are cut with an
+    ellipsis. Other keyword arguments are passed to `Table`."""
+    table = Table(row_styles=["dim", ""], highlight=True, **kwargs)
+    for index, (header, options) in enumerate(columns):
+        if widths is not None:
+            options = {
+                **options,
+                "width": widths[index],
+                "no_wrap": True,
+                "overflow": "ellipsis",
+            }
+        table.add_column(header, **options)
+    for row in cells:
+        table.add_row(*row)
+    return table
+
+
+def format_cell(value) -> str:
+    if value is None:
+        return ""
+    if value == -1:
+        return "N/A"
+    return str(value)
+
+
+def get_modules_done_rows(grades: Grades, finished_modules: list) -> list:
+    """Return the rows of the `summarize done` table (see `DONE_COLUMNS`)
+    for modules given as by `get_grades_list_as_list_of_dicts`, sorted
+    chronologically, then by level and finally by module name. Modules
+    without a completion date come last."""
+    ects = grades.get_module_scores_of_finished_modules_for_system(
+        system="ECTS"
+    )
+    us = grades.get_module_scores_of_finished_modules_for_system(system="US")
+    rows = [
+        (
+            module.get("completion_date"),
+            module["level"],
+            module["module_name"],
+            module["module_score"],
+            ects[module["module_name"]],
+            us[module["module_name"]],
+        )
+        for module in finished_modules
+    ]
+    return sorted(
+        rows, key=lambda row: (row[0] is None, row[0] or "", *row[1:3])
+    )
+
+
+def get_modules_in_progress_records(grades: Grades) -> tuple:
+    """Return a tuple `(records, in_progress)`: a dict per module in
+    progress with the keys of `IN_PROGRESS_COLUMNS`, sorted by level, then
+    by module name, along with the modules in progress as given by
+    `get_grades_list_as_list_of_dicts`."""
+    in_progress = grades.get_list_of_modules_in_progress()
+    in_progress = grades_helpers.get_grades_list_as_list_of_dicts(in_progress)
+    ects = grades.get_scores_of_modules_in_progress_for_system(system="ECTS")
+    us = grades.get_scores_of_modules_in_progress_for_system(system="US")
+    records = [
+        {
+            key: {
+                **module,
+                "ECTS": ects[module["module_name"]],
+                "US": us[module["module_name"]],
+            }.get(key)
+            for _, key, _ in IN_PROGRESS_COLUMNS
+        }
+        for module in in_progress
+    ]
+    records.sort(key=lambda record: (record["level"], record["module_name"]))
+    return records, in_progress
+
+
+def get_modules_in_progress_table(records: list) -> tuple:
+    """Return a tuple `(columns, rows)` describing the `summarize progress`
+    table of records given by `get_modules_in_progress_records`."""
+    columns = [
+        (header, key, options)
+        for header, key, options in IN_PROGRESS_COLUMNS
+        if key not in ("midterm_score", "final_score")
+        or any(record[key] is not None for record in records)
+    ]
+    rows = [tuple(record[key] for _, key, _ in columns) for record in records]
+    return [(header, options) for header, _, options in columns], rows
+
+
+def get_cached_result(grades: Grades, compute, **options):
+    """Return `compute(grades, **options)`, kept in `grades.result_cache`
+    if there is one. Results are keyed by the fingerprint of the grades,
+    the name of `compute` and `options`, along with the data exactly as it
+    was loaded: the fingerprint doesn't tell 70 from 70.0 or a null field
+    from a missing one, which records show as they are."""
+    if grades.result_cache is None:
+        return compute(grades, **options)
+    key = get_key(
+        grades.fingerprint(),
+        json.dumps(grades.data),
+        compute.__name__,
+        options,
     )
-    table.add_column("Completion date", style="blue", no_wrap=True)
-    table.add_column("Level", style="magenta")
-    table.add_column("Module name", style="cyan")
-    table.add_column("Score", justify="right", style="dark_green")
-    table.add_column("ECTS", justify="right", style="chartreuse4")
-    table.add_column("US", justify="right", style="orange4")
-
-    content = list(dataframe.itertuples(index=False, name=None))
-    for row in content:
-        table.add_row(*(str(x) for x in row))
-    console.print(table)
-
-
-def pprint_dataframe_in_progress(dataframe: pd.DataFrame, title: str) -> None:
-    table = Table(
-        title=title,
-        row_styles=["dim", ""],
-        highlight=True,
+    return grades.result_cache.get_or_compute(
+        key, lambda: compute(grades, **options)
     )
-    table.add_column("Module name", style="blue", no_wrap=True)
-    table.add_column("Level", style="magenta")
-    table.add_column("Midterm", style="cyan")
-    table.add_column("ECTS", justify="right", style="chartreuse4")
-    table.add_column("US", justify="right", style="orange4")
 
-    content = list(dataframe.itertuples(index=False))
-    for row in content:
-        table.add_row(*(str(x) for x in row))
-    console.print(table)
+
+def get_done_result(grades: Grades) -> tuple:
+    """Return a tuple `(result, records, summary)` for the modules done: the
+    result returned by `commands.summarize_done`, a dict per row of its
+    table (see `DONE_KEYS`) and the aggregates of `get_summary_done`. All
+    are empty when no modules are done."""
+    if not (finished_modules := grades.get_list_of_finished_modules()):
+        return {}, [], {}
+    modules = grades_helpers.get_grades_list_as_list_of_dicts(finished_modules)
+    rows = get_modules_done_rows(grades, modules)
+    summary = get_summary_done(grades)
+    records = [dict(zip(DONE_KEYS, row)) for row in rows]
+    return {"modules": modules, **summary}, records, summary
+
+
+def get_in_progress_result(grades: Grades, only_in_progress=False) -> tuple:
+    """Return a tuple `(result, records, summary)` for the modules in
+    progress: the result returned by `commands.summarize_progress`, the
+    records of `get_modules_in_progress_records` and the averages named
+    after the `Grades` properties giving them. Averages are those of the
+    modules in progress alone with `only_in_progress`. All are empty when
+    no modules are in progress."""
+    records, in_progress = get_modules_in_progress_records(grades)
+    if not in_progress:
+        return {}, [], {}
+    if only_in_progress:
+        summary = {
+            "weighted_average_in_progress_only": (
+                grades.weighted_average_in_progress_only
+            ),
+            "unweighted_average_in_progress_only": (
+                grades.unweighted_average_in_progress_only
+            ),
+        }
+    else:
+        summary = {
+            "weighted_average_in_progress": (
+                grades.weighted_average_in_progress
+            ),
+            "unweighted_average_including_in_progress": (
+                grades.unweighted_average_including_in_progress
+            ),
+        }
+    wavg, uavg = summary.values()
+    result = {
+        "modules": in_progress,
+        "weighted_average": wavg,
+        "unweighted_average": uavg,
+    }
+    return result, records, summary
 
 
 def get_modules_done_dataframe(
     grades: Grades, finished_modules: list
-) -> pd.DataFrame:
+) -> "pd.DataFrame":
+    import pandas as pd
+
     df_modules_taken = pd.DataFrame(finished_modules)
 
     # Drop unwanted columns (will take too much horizontal space). These
@@ -195,99 +491,6 @@ def get_modules_done_dataframe(
     return df_all_scores
 
 
-def get_modules_in_progress_dataframe(grades: Grades) -> tuple:
-    in_progress = grades.get_list_of_modules_in_progress()
-    in_progress = grades_helpers.get_grades_list_as_list_of_dicts(in_progress)
-
-    df_in_progress = pd.DataFrame(in_progress)
-
-    series_name = df_in_progress.pop("module_name")
-    series_level = df_in_progress.pop("level")
-    df_in_progress = pd.concat(
-        [series_name, series_level, df_in_progress], axis=1
-    )
-
-    # Get grades in ECTS and US systems and put them into a DataFrame
-    ects = grades.get_scores_of_modules_in_progress_for_system(system="ECTS")
-    us = grades.get_scores_of_modules_in_progress_for_system(system="US")
-    data = {
-        "module_name": list(ects),
-        "ECTS": list(ects.values()),
-        "US": list(us.values()),
-    }
-    df_letter_scores = pd.DataFrame(data)
-
-    # Merge DataFrames by module name to display all scores at once
-    df_all_scores = pd.merge(
-        df_in_progress, df_letter_scores, on="module_name", how="outer"
-    )
-
-    # Replace RPL modules (assigned a value of -1) with 'N/A'
-    df_all_scores = df_all_scores.replace(-1, "N/A")
-
-    # Sort by level, then by module name
-    df_all_scores = df_all_scores.sort_values(by=["level", "module_name"])
-
-    # Rename columns by iterating since we don't know which will be will there
-    columns = df_all_scores.columns
-    renamed = {"module_name": "Module name", "level": "Level"}
-    for column in columns:
-        if column == "midterm_score":
-            renamed.update({"midterm_score": "Midterm"})
-            df_all_scores = df_all_scores.drop(["midterm_weight"], axis=1)
-        elif column == "final_score":
-            renamed.update({"final_score": "Final"})
-            df_all_scores = df_all_scores.drop(["final_weight"], axis=1)
-    df_all_scores.rename(columns=renamed, inplace=True)
-
-    return df_all_scores, in_progress
-
-
-def dataframe_map_module_to_weight(row) -> int:
-    """
-    Return the weight of a given module from a dataframe row based on the
-    module level and the module name (since the final project is worth more).
-
-    Args:
-        row (dataframe row): A row from a dataframe containing at least two
-                             columns, `Level` and `Module name`.
-
-    Returns:
-        int: Integer value corresponding to the weight of a module.
-    """
-    if row["Level"] == 4:
-        return 1
-    if row["Level"] == 5:
-        return 3
-    if row["Level"] == 6 and row["Module name"] != "Final Project":
-        return 5
-    return 10  # final project is worth twice as much as any other L6
-
-
-def dataframe_get_weighted_average(df, data_col, weight_col, by_col) -> float:
-    """
-    Calculate the weighted average in a dataframe from a numerical column
-    and an integer column (weight) where the results are grouped by the column
-    `by_col`.
-
-    Args:
-        df (DataFrame): Pandas dataframe, used to temporarily store new columns.
-        data_col (number): int or float column from a dataframe.
-        weight_col (number): int or float column from a dataframe.
-        by_col ([type]): A dataframe column from which weights should be grouped.
-
-    Returns:
-        float: Weighted average calculated from `data_col` and `weight_col`
-               and grouped by `by_col`.
-    """
-    df["_data_times_weight"] = df[data_col] * df[weight_col]
-    df["_weight_where_notnull"] = df[weight_col] * pd.notnull(df[data_col])
-    g = df.groupby(by_col)
-    result = g["_data_times_weight"].sum() / g["_weight_where_notnull"].sum()
-    del df["_data_times_weight"], df["_weight_where_notnull"]
-    return result
-
-
 def dataframe_parse_datetime_as_month_year(row) -> str:
     """
     Take in a dataframe row, get a timestamp from a column and return a
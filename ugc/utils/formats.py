@@ -0,0 +1,84 @@
+"""
+Serialize the results of the commands for other programs to read, instead
+of printing them as tables and colored text.
+"""
+# Standard library imports
+from contextlib import contextmanager
+import csv
+import io
+import json
+
+# Third-party library imports
+import click
+
+# Output meant to be read by people, printed with `ugc.utils.console`
+TEXT = "text"
+
+# Formats accepted by the `--format` option
+FORMATS = (TEXT, "json", "ndjson", "csv")
+
+# Key of `click.Context.meta` under which `collect_json_results` keeps the
+# results printed as JSON
+RESULTS_META_KEY = "ugc.results"
+
+
+def serialize(output_format: str, records: list, summary: dict = None) -> str:
+    """Return the result of a command made of `records` (a dict per module)
+    and of a `summary` (a dict of aggregates) as:
+
+    - json: a single object `{"modules": records, **summary}`.
+    - ndjson: an object per line for each record, then one for the summary.
+    - csv: a header, a row per record, then a row holding the summary.
+      The first column, `kind`, tells them apart (`module` or `summary`)
+      and the other columns are those of the records, then those of the
+      summary, each row leaving the others empty."""
+    summary = summary or {}
+    if output_format == "json":
+        return json.dumps(get_json_result(records, summary)) + "\n"
+    if output_format == "ndjson":
+        lines = [*records, summary] if summary else records
+        return "".join(json.dumps(line) + "\n" for line in lines)
+    if output_format == "csv":
+        rows = [{"kind": "module", **record} for record in records]
+        if summary:
+            rows.append({"kind": "summary", **summary})
+        fieldnames = list(dict.fromkeys(key for row in rows for key in row))
+        buffer = io.StringIO()
+        writer = csv.DictWriter(
+            buffer, fieldnames=fieldnames, lineterminator="\n"
+        )
+        if rows:
+            writer.writeheader()
+        writer.writerows(rows)
+        return buffer.getvalue()
+    raise ValueError(f"Unknown output format: {output_format}")
+
+
+def get_json_result(records: list, summary: dict = None) -> dict:
+    """Return the object printed for a result in the json format."""
+    return {"modules": records, **(summary or {})}
+
+
+def print_result(output_format: str, records: list, summary: dict = None):
+    """Print the result of a command as given by `serialize`, without any
+    styling, or keep it for `collect_json_results` in the json format."""
+    ctx = click.get_current_context(silent=True)
+    results = None if ctx is None else ctx.meta.get(RESULTS_META_KEY)
+    if output_format == "json" and results is not None:
+        results.append(get_json_result(records, summary))
+        return
+    click.echo(serialize(output_format, records, summary), nl=False)
+
+
+@contextmanager
+def collect_json_results():
+    """Keep the results printed in the json format by the commands run in
+    the block (e.g. by `ugc batch`), then print them as a single JSON
+    array so that the output stays a valid JSON document."""
+    meta = click.get_current_context().meta
+    meta[RESULTS_META_KEY] = results = []
+    try:
+        yield results
+    finally:
+        del meta[RESULTS_META_KEY]
+        click.echo(json.dumps(results))
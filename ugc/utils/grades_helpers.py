@@ -2,6 +2,21 @@
 from pathlib import Path
 import json
 
+# Local imports
+from ugc.rules import get_default_rules
+
+# Lowest weighted average of each classification, see `get_classification`
+CLASSIFICATION_BOUNDARIES = {
+    "First Class Honours": 70,
+    "Second Class Honours [Upper Division]": 60,
+    "Second Class Honours [Lower Division]": 50,
+    "Third Class Honours": 40,
+}
+
+# Lowest average of each step of `get_us_gpa` and `get_uk_gpa`
+US_GPA_STEPS = (60, 63, 67, 70, 73, 77, 80, 83, 87, 90, 93)
+UK_GPA_STEPS = (35, 40, 45, 50, 55, 60, 65, 70)
+
 
 def get_module_score(module) -> float:
     try:
@@ -22,11 +37,53 @@ def get_module_score(module) -> float:
         return -1
 
 
+def get_required_final_score(module: dict, target: float) -> float:
+    """Return the minimum `final_score` needed for `module` to get a module
+    score of at least `target` given its midterm score, or None if it can't
+    be done with a final score of at most 100.
+
+    A midterm or final score below 35 is an automatic fail with a module
+    score of 39 (see `get_module_score`): any target up to 39 is reached
+    whatever the final score and higher targets need at least 35 in both."""
+    if target <= 39:
+        return 0
+    midterm_score = module.get("midterm_score")
+    midterm_weight = module.get("midterm_weight")
+    final_weight = module.get("final_weight")
+    if (
+        midterm_score is None
+        or midterm_weight is None
+        or not final_weight
+        or midterm_score < 35
+    ):
+        return None
+    required = (
+        (target - midterm_score * midterm_weight / 100) * 100 / final_weight
+    )
+    required = max(required, 35)
+    return required if required <= 100 else None
+
+
+def get_target_average(
+    target_module_score: float = None,
+    target_average: float = None,
+    target_classification: str = None,
+) -> float:
+    """Check that exactly one target is given to a required score solver
+    and return the weighted average it stands for (None when the target is
+    a module score)."""
+    targets = (target_module_score, target_average, target_classification)
+    if sum(target is not None for target in targets) != 1:
+        raise ValueError("Exactly one target should be given.")
+    if target_classification is not None:
+        return CLASSIFICATION_BOUNDARIES[target_classification]
+    return target_average
+
+
 def get_weight_of(level: int) -> int:
-    """Return the weight of a given `level`. The ratio is 1:3:5 for
-    modules of L4:L5:L6 respectively."""
-    levels = {4: 1, 5: 3, 6: 5}
-    return levels[level] if isinstance(level, int) and level in levels else 0
+    """Return the weight of a given `level` according to the degree rules.
+    The ratio is 1:3:5 for modules of L4:L5:L6 respectively."""
+    return get_default_rules().level_weight(level)
 
 
 def score_is_valid(module_score: float) -> bool:
@@ -91,95 +148,113 @@ def get_ects_equivalent_score(score: float) -> str:
     return "E/F"
 
 
-def get_score_of_module_in_progress(module: dict) -> float:
+def get_predicted_module_score(
+    module_name: str, values: dict, predictor=None
+) -> float:
+    """Return the module score expected once the final score predicted from
+    the midterm score is known, or None without a prediction.
+
+    `predictor` is a `ugc.regression.FinalScorePredictor`. When the final
+    weight is missing, the final counts for what the midterm does not."""
+    if predictor is None or values.get("midterm_weight") is None:
+        return None
+    final_score = predictor.predict(module_name, values["midterm_score"])
+    if final_score is None:
+        return None
+    return get_module_score(
+        {
+            "midterm_score": values["midterm_score"],
+            "midterm_weight": values["midterm_weight"],
+            "final_score": final_score,
+            "final_weight": values.get(
+                "final_weight", 100 - values["midterm_weight"]
+            ),
+        }
+    )
+
+
+def get_score_of_module_in_progress(module: dict, predictor=None) -> float:
     result = -1
-    for values in module.values():
+    for name, values in module.items():
         if values.get("final_score") and values.get("midterm_score"):
             result = get_module_score(values)
         elif values.get("final_score"):
             result = values["final_score"]
         elif values.get("midterm_score"):
-            result = values["midterm_score"]
+            predicted = get_predicted_module_score(name, values, predictor)
+            result = (
+                values["midterm_score"] if predicted is None else predicted
+            )
     return result
 
 
-def get_total_weight_modules_finished(modules: list) -> float:
-    levels = []
-    final_project = False
+def get_total_weight_modules_finished(modules: list, rules=None) -> float:
+    rules = get_default_rules() if rules is None else rules
+    total_weight = 0
     for module in modules:
         for name, value in module.items():
-            if name.lower() == "final project":
-                final_project = True
-            level = value.get("level")
             module_score = value.get("module_score")
             if "module_score" in value and module_score >= 0:
-                levels.append(get_weight_of(level))
-    total_weight = sum(levels)
-
-    if final_project:
-        total_weight += 5
+                total_weight += rules.weight(name, value.get("level"))
     return total_weight
 
 
-def get_total_score_modules_finished(modules: list) -> float:
+def get_total_score_modules_finished(modules: list, rules=None) -> float:
+    rules = get_default_rules() if rules is None else rules
     total = 0
     for module in modules:
         for key, values in module.items():
             module_score = values.get("module_score")
-            level = get_weight_of(values.get("level"))
-            extra = 2 if key.lower() == "final project" else 1
             if not ("module_score" in values and module_score >= 0):
                 continue
             try:
-                total += module_score * level * extra
+                total += module_score * rules.weight(key, values.get("level"))
             except TypeError:
                 pass
     return total
 
 
-def get_total_weight_modules_in_progress(modules: list) -> float:
-    levels = []
-    final_project = False
+def get_total_weight_modules_in_progress(modules: list, rules=None) -> float:
+    rules = get_default_rules() if rules is None else rules
+    total_weight = 0
     for module in modules:
         for name, value in module.items():
-            if name.lower() == "final project":
-                final_project = True
-            level = value.get("level")
-            levels.append(get_weight_of(level))
-    total_weight = sum(levels)
-
-    if final_project:
-        total_weight += 5
+            total_weight += rules.weight(name, value.get("level"))
     return total_weight
 
 
-def get_weighted_total_score_modules_in_progress(modules: list) -> float:
+def get_weighted_total_score_modules_in_progress(
+    modules: list, predictor=None, rules=None
+) -> float:
+    rules = get_default_rules() if rules is None else rules
     total = 0
     for module in modules:
         for key, values in module.items():
             final = values.get("final_score")
             midterm = values.get("midterm_score")
-            level = get_weight_of(values.get("level"))
-            extra = 2 if key.lower() == "final project" else 1
+            weight = rules.weight(key, values.get("level"))
             if final is not None and midterm is not None:
                 module_score = get_module_score(values)
             elif final is not None:
                 module_score = final
             elif midterm is not None:
-                module_score = midterm
+                predicted = get_predicted_module_score(key, values, predictor)
+                module_score = midterm if predicted is None else predicted
             else:
                 module_score = -1
             try:
-                total += module_score * level * extra
+                total += module_score * weight
             except TypeError:
                 pass
     return total
 
 
-def get_unweighted_total_score_modules_in_progress(modules: list) -> float:
+def get_unweighted_total_score_modules_in_progress(
+    modules: list, predictor=None
+) -> float:
     total = 0
     for module in modules:
-        for values in module.values():
+        for key, values in module.items():
             final = values.get("final_score")
             midterm = values.get("midterm_score")
             if final is not None and midterm is not None:
@@ -187,7 +262,8 @@ def get_unweighted_total_score_modules_in_progress(modules: list) -> float:
             elif final is not None:
                 module_score = final
             elif midterm is not None:
-                module_score = midterm
+                predicted = get_predicted_module_score(key, values, predictor)
+                module_score = midterm if predicted is None else predicted
             else:
                 module_score = -1
             try:
@@ -0,0 +1,161 @@
+"""
+Compact and mergeable summaries of streams of scores.
+"""
+# Standard library imports
+import math
+import random
+
+
+class QuantileSketch:
+    """KLL-style quantile sketch.
+
+    Scores are added one at a time and only a bounded number of them is kept
+    in memory: whenever a level of the sketch is full, half of its (sorted)
+    items are discarded and the other half is promoted to the next level,
+    where each item stands for twice as many scores. Two sketches built on
+    different workers can be merged into one.
+
+    The normalized rank error is roughly `1.7 / k`, so `k=200` reports a
+    percentile within about one percentile point of the exact value."""
+
+    def __init__(self, k: int = 200, seed=None) -> None:
+        if k < 8:
+            raise ValueError("The sketch size `k` should be at least 8.")
+        self.k = k
+        self.count = 0
+        self.min = None
+        self.max = None
+        self.compactors = [[]]
+        self._rng = random.Random(seed)
+        self._size = 0
+        self._max_size = self._capacity(0)
+
+    @classmethod
+    def from_error(cls, error: float, seed=None) -> "QuantileSketch":
+        """Return a sketch sized so its normalized rank error stays below
+        `error` (e.g. 0.01 for one percentile point)."""
+        if not 0 < error < 1:
+            raise ValueError("The error bound should be between 0 and 1.")
+        return cls(k=max(8, math.ceil(1.7 / error)), seed=seed)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _capacity(self, height: int) -> int:
+        depth = len(self.compactors) - height - 1
+        return math.ceil(self.k * (2 / 3) ** depth) + 1
+
+    def _grow(self) -> None:
+        self.compactors.append([])
+        self._max_size = sum(
+            self._capacity(height) for height in range(len(self.compactors))
+        )
+
+    def _compress(self) -> None:
+        for height, compactor in enumerate(self.compactors):
+            if len(compactor) < self._capacity(height):
+                continue
+            if height + 1 == len(self.compactors):
+                self._grow()
+            compactor.sort()
+            # Keep either the odd or the even items so the sketch stays
+            # unbiased, leaving the last one behind if there's an odd count
+            offset = self._rng.randint(0, 1)
+            end = len(compactor) - len(compactor) % 2
+            self.compactors[height + 1].extend(compactor[offset:end:2])
+            del compactor[:end]
+            self._size = sum(len(c) for c in self.compactors)
+            if self._size < self._max_size:
+                break
+
+    def add(self, value: float) -> None:
+        """Add a single score to the sketch."""
+        self.compactors[0].append(value)
+        self.count += 1
+        self._size += 1
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        if self._size >= self._max_size:
+            self._compress()
+
+    def extend(self, values) -> None:
+        """Add every score from an iterable to the sketch."""
+        for value in values:
+            self.add(value)
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """Fold the content of `other` into this sketch and return it."""
+        while len(self.compactors) < len(other.compactors):
+            self._grow()
+        for height, compactor in enumerate(other.compactors):
+            self.compactors[height].extend(compactor)
+        self.count += other.count
+        if other.count:
+            self.min = (
+                other.min if self.min is None else min(self.min, other.min)
+            )
+            self.max = (
+                other.max if self.max is None else max(self.max, other.max)
+            )
+        self._size = sum(len(c) for c in self.compactors)
+        while self._size >= self._max_size:
+            self._compress()
+        return self
+
+    def quantile(self, q: float) -> float:
+        """Return the approximate value below which a fraction `q` of the
+        scores falls. Return None when the sketch is empty."""
+        return self.quantiles([q])[0]
+
+    def quantiles(self, qs) -> list:
+        """Return the approximate quantile of each fraction in `qs`."""
+        if any(not 0 <= q <= 1 for q in qs):
+            raise ValueError("Quantiles should be between 0 and 1.")
+        if not self.count:
+            return [None] * len(qs)
+
+        weighted = sorted(
+            (item, 2**height)
+            for height, compactor in enumerate(self.compactors)
+            for item in compactor
+        )
+        total = sum(weight for _, weight in weighted)
+        results = []
+        for q in qs:
+            if q == 0:
+                results.append(self.min)
+                continue
+            if q == 1:
+                results.append(self.max)
+                continue
+            cumulative = 0
+            for item, weight in weighted:
+                cumulative += weight
+                if cumulative >= q * total:
+                    results.append(item)
+                    break
+        return results
+
+    def to_dict(self) -> dict:
+        """Return a JSON-serializable representation of the sketch so it
+        can be shipped to another worker and merged there."""
+        return {
+            "k": self.k,
+            "count": self.count,
+            "min": self.min,
+            "max": self.max,
+            "compactors": [list(c) for c in self.compactors],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict, seed=None) -> "QuantileSketch":
+        """Rebuild a sketch from the output of `to_dict`."""
+        sketch = cls(k=data["k"], seed=seed)
+        while len(sketch.compactors) < len(data["compactors"]):
+            sketch._grow()
+        sketch.compactors = [list(c) for c in data["compactors"]]
+        sketch.count = data["count"]
+        sketch.min = data["min"]
+        sketch.max = data["max"]
+        sketch._size = sum(len(c) for c in sketch.compactors)
+        return sketch
@@ -0,0 +1,58 @@
+"""
+Follow the changes made to a config file while it is being edited.
+"""
+# Standard library imports
+import os
+
+# Local imports
+from ugc.config import Config
+from ugc.diff import GradeTotals, diff_configs
+from ugc.rules import DegreeRules
+
+
+class ConfigWatcher:
+    """Config file polled for changes, along with the data last loaded from
+    it and the `GradeTotals` of that data.
+
+    The file is only read again when its modification time or size change,
+    and the totals are only patched for the modules that changed. These
+    totals only give the changes returned by `reload`: commands run on the
+    new config still compute their results from all the modules."""
+
+    def __init__(self, path, data: dict, rules: DegreeRules = None) -> None:
+        self.path = path
+        self.data = data
+        self.totals = GradeTotals.from_data(data, rules)
+        self.signature = self._get_signature()
+
+    def _get_signature(self) -> tuple:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def has_changed(self) -> bool:
+        """Return True if the file changed since the last call (or since
+        the watcher was created)."""
+        signature = self._get_signature()
+        if signature == self.signature:
+            return False
+        self.signature = signature
+        return True
+
+    def reload(self) -> tuple:
+        """Load the file again and return a tuple `(config, result)` where
+        `result` compares the data loaded with the previous data, as given
+        by `diff_configs`. Errors raised by `Config.load` are left to the
+        caller, in which case the previous data is kept."""
+        config = Config(config_path=self.path)
+        config.load()
+        result = diff_configs(self.data, config.data, self.totals)
+        self.totals.update(
+            self.data,
+            config.data,
+            dict.fromkeys(change["module"] for change in result["changes"]),
+        )
+        self.data = config.data
+        return config, result